@@ -0,0 +1,6 @@
+"""
+Headless benchmarks for the editor's hot paths.
+
+Run from the plugin folder with `python -m benchmarks.run_benchmarks`; see that module
+for the options and the JSON it writes.
+"""
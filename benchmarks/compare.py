@@ -0,0 +1,77 @@
+"""
+Compare two benchmark result files written by run_benchmarks.
+
+    python -m benchmarks.compare baseline.json current.json [--tolerance 0.15]
+
+Cases are matched by name and compared on their median. Exits with status 1 when any
+case got slower than the tolerance allows or is missing from the current run, so it can
+gate a CI job.
+"""
+import argparse
+import json
+import sys
+
+DEFAULT_TOLERANCE = 0.15
+# Differences below this many milliseconds are timer noise, whatever the ratio.
+NOISE_FLOOR_MS = 0.05
+
+
+def load_results(path):
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def compare_results(baseline, current, tolerance=DEFAULT_TOLERANCE):
+    """
+    Return one row per baseline case.
+
+    Each row is a dict with the case name, both medians, their ratio and a status of
+    "regressed", "improved", "ok" or "missing". A missing case was not run this time;
+    its current median and ratio are None. Cases new in `current` are not reported.
+    """
+    rows = []
+    new_cases = current.get("results", {})
+    for name, old in sorted(baseline.get("results", {}).items()):
+        case = new_cases.get(name)
+        if case is None:
+            rows.append({"case": name, "baseline": old["median"], "current": None, "ratio": None, "status": "missing"})
+            continue
+        before, after = old["median"], case["median"]
+        ratio = after / before if before else 1.0
+        status = "ok"
+        if abs(after - before) > NOISE_FLOOR_MS:
+            if ratio > 1.0 + tolerance:
+                status = "regressed"
+            elif ratio < 1.0 - tolerance:
+                status = "improved"
+        rows.append({"case": name, "baseline": before, "current": after, "ratio": ratio, "status": status})
+    return rows
+
+
+def format_rows(rows):
+    width = max([len(row["case"]) for row in rows] + [4])
+    lines = [f"{'case':<{width}}  {'baseline':>10}  {'current':>10}  {'ratio':>6}  status"]
+    for row in rows:
+        if row["current"] is None:
+            current, ratio = f"{'-':>10}", f"{'-':>6}"
+        else:
+            current, ratio = f"{row['current']:>10.3f}", f"{row['ratio']:>6.2f}"
+        lines.append(f"{row['case']:<{width}}  {row['baseline']:>10.3f}  {current}  {ratio}  {row['status']}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files.")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed slowdown as a fraction of the baseline median (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    rows = compare_results(load_results(args.baseline), load_results(args.current), args.tolerance)
+    print(format_rows(rows))
+    return 1 if any(row["status"] in ("regressed", "missing") for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
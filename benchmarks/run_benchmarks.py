@@ -0,0 +1,420 @@
+"""
+Headless benchmarks for the editor's hot paths.
+
+    python -m benchmarks.run_benchmarks [--sizes 1000 10000 50000] [--repeat 5]
+                                        [--output results.json] [--baseline old.json]
+
+Runs under the offscreen Qt platform with nuke_standin providing `nuke` and
+`nukescripts`, on synthetic scripts of each size. Every case is run once to warm
+up, then timed `--repeat` times. Results are written as JSON keyed by "<case>/<lines>"
+with min/median/mean/max in milliseconds, plus the environment they were measured in.
+With `--baseline` the run is compared against an earlier result file and the exit
+status is 1 if any case regressed (see benchmarks.compare).
+
+Qt's test mode is enabled, so settings and caches live in a scratch location and the
+user's own settings never influence the numbers.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for _path in (os.path.join(PROJECT_ROOT, "third_party"), PROJECT_ROOT):
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+from PySide2.QtCore import QEvent, QStandardPaths
+from PySide2.QtGui import QTextCursor
+from PySide2.QtWidgets import QApplication
+
+import nuke_standin
+
+DEFAULT_SIZES = (1000, 10000, 50000)
+DEFAULT_REPEAT = 5
+SCHEMA_VERSION = 1
+# (name, text before the word, word) typed at the end of the document, one prefix at a time.
+COMPLETION_PROBES = (
+    ("identifier", "", "build_node_"),
+    ("nuke_attr", "nuke.", "createNode"),
+    ("node_name", 'nuke.createNode("', "ColorCorrect"),
+)
+GHOST_PROBES = (
+    ("identifier", "", "build_node_"),
+    ("nuke_attr", "nuke.", "createNode"),
+)
+PREFIX_LENGTHS = (1, 2, 4, 8)
+OUTPUT_ERROR_EVERY = 200
+OUTPUT_WARNING_EVERY = 50
+
+
+def process_events():
+    QApplication.processEvents()
+
+
+def dispose(widget):
+    """Delete `widget` now rather than whenever the (never started) event loop gets to it."""
+    widget.setParent(None)
+    widget.deleteLater()
+    QApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+
+
+def measure(run, repeat, setup=None, warmup=1):
+    """Time `run()` in milliseconds; `setup()` runs before each call, outside the timing."""
+    samples = []
+    for iteration in range(warmup + repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        run()
+        elapsed = (time.perf_counter() - start) * 1000.0
+        if iteration >= warmup:
+            samples.append(elapsed)
+    return samples
+
+
+def summarize(samples, **extra):
+    result = {
+        "unit": "ms",
+        "runs": len(samples),
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.fmean(samples),
+        "max": max(samples),
+    }
+    if extra:
+        result["extra"] = extra
+    return result
+
+
+class EditorBench:
+    """Shared fixtures for one synthetic script: a fully highlighted editor and its text."""
+
+    def __init__(self, text, modules):
+        self.text = text
+        self._probe_start = None
+        self.editor = modules["CodeEditor"]()
+        self.editor.resize(1000, 800)
+        self.editor.show()
+        self.editor.set_document_text(text)
+        self.settle()
+
+    def settle(self):
+        """Let debounce timers and the lazy highlighter's catch-up finish."""
+        highlighter = self.editor.highlighter
+        process_events()
+        while highlighter.is_lazy():
+            process_events()
+        self.editor.completer.hide_popup()
+        self.editor.clear_ghost_text()
+
+    def type_probe(self, text):
+        """Replace the probe line at the end of the document with `text`, cursor at its end."""
+        self.clear_probe()
+        cursor = self.editor.textCursor()
+        cursor.movePosition(QTextCursor.End)
+        self._probe_start = cursor.position()
+        cursor.insertText("\n" + text)
+        self.editor.setTextCursor(cursor)
+
+    def clear_probe(self):
+        if self._probe_start is None:
+            return
+        cursor = self.editor.textCursor()
+        cursor.setPosition(self._probe_start)
+        cursor.movePosition(QTextCursor.End, QTextCursor.KeepAnchor)
+        cursor.removeSelectedText()
+        self._probe_start = None
+        self.settle()
+
+    def close(self):
+        self.clear_probe()
+        dispose(self.editor)
+
+
+def bench_highlighter(text, repeat, modules):
+    from PySide2.QtGui import QTextDocument
+
+    document = QTextDocument()
+    document.setPlainText(text)
+    highlighter = modules["PygmentsHighlighter"](document)
+    results = {
+        "highlight.pygments": summarize(measure(highlighter.rehighlight, repeat, setup=process_events)),
+    }
+    highlighter.set_light_mode(True, rehighlight=False)
+    results["highlight.light"] = summarize(measure(highlighter.rehighlight, repeat, setup=process_events))
+    highlighter.setDocument(None)
+    return results
+
+
+def bench_completer(bench, repeat):
+    results = {}
+    completer = bench.editor.completer
+    for name, context, word in COMPLETION_PROBES:
+        for length in PREFIX_LENGTHS:
+            prefix = word[:length]
+            # Each run types the probe again, so it pays for a real keystroke (symbol table update included).
+            # Ranked on the calling thread, so each sample covers collection, ranking and the popup.
+            samples = measure(
+                lambda: completer._update_completions_now(synchronous=True),
+                repeat,
+                setup=lambda line=context + prefix: bench.type_probe(line),
+            )
+            results[f"completer.{name}.prefix{length}"] = summarize(samples, items=completer.model.rowCount())
+            completer.hide_popup()
+    bench.clear_probe()
+    return results
+
+
+def bench_ghost_text(bench, repeat):
+    results = {}
+    editor = bench.editor
+    for name, context, word in GHOST_PROBES:
+        for length in PREFIX_LENGTHS:
+            prefix = word[:length]
+            samples = measure(
+                editor.update_ghost_text,
+                repeat,
+                setup=lambda line=context + prefix: bench.type_probe(line),
+            )
+            results[f"ghost_text.{name}.prefix{length}"] = summarize(samples, suggested=bool(editor.ghost_text))
+            editor.clear_ghost_text()
+    bench.clear_probe()
+    return results
+
+
+def bench_folding(bench, repeat):
+    editor = bench.editor
+    foldable = [line for line in range(editor.blockCount()) if editor.is_foldable_line(line)]
+    if not foldable:
+        return {}
+    results = {}
+    for name, line in (("first", foldable[0]), ("middle", foldable[len(foldable) // 2]), ("last", foldable[-1])):
+        def fold_and_unfold(line=line):
+            editor.toggle_fold(line)
+            editor.toggle_fold(line)
+        results[f"fold.toggle.{name}"] = summarize(measure(fold_and_unfold, repeat, setup=process_events))
+    return results
+
+
+def bench_brackets(bench, repeat, lookup_table_line):
+    editor = bench.editor
+    brackets = {'(': ')', ')': '(', '[': ']', ']': '[', '{': '}', '}': '{'}
+    text = bench.text
+    cases = {"near": text.find("nuke.nodes.")}
+    table = text.find(lookup_table_line)
+    if table >= 0:
+        cases["far"] = table + len(lookup_table_line) - 1
+    results = {}
+    for name, position in cases.items():
+        if position < 0:
+            continue
+        position = text.find("(", position) if name == "near" else position
+        bracket = text[position]
+        match = editor.find_matching_bracket(position, bracket, brackets)
+        samples = measure(lambda: editor.find_matching_bracket(position, bracket, brackets), repeat)
+        results[f"brackets.match.{name}"] = summarize(samples, span_lines=text.count("\n", position, max(match, position)))
+    return results
+
+
+def bench_output(text, repeat, modules):
+    lines = [line for line in text.splitlines() if line.strip()]
+    messages = []
+    for index, line in enumerate(lines):
+        if index and index % OUTPUT_ERROR_EVERY == 0:
+            messages.append((f'Traceback (most recent call last):\n  File "bench.py", line {index}, in <module>\n{line}\nNameError: bench', "ERROR"))
+        elif index and index % OUTPUT_WARNING_EVERY == 0:
+            messages.append((line, "WARNING"))
+        else:
+            messages.append((line, "OUTPUT"))
+
+    widgets = []
+
+    def new_widget():
+        for widget in widgets:
+            dispose(widget)
+        widgets[:] = [modules["OutputWidget"]()]
+
+    def append_all():
+        append_output = widgets[0].append_output
+        for message, level in messages:
+            append_output(message, level)
+
+    samples = measure(append_all, repeat, setup=new_widget)
+    for widget in widgets:
+        dispose(widget)
+    median = statistics.median(samples)
+    return {
+        "output.append": summarize(
+            samples,
+            messages=len(messages),
+            messages_per_second=round(len(messages) / (median / 1000.0)) if median else None,
+        )
+    }
+
+
+def bench_header_tree(bench, repeat, modules):
+    from PySide2.QtWidgets import QTabWidget, QTreeWidget, QWidget
+
+    class HeaderTreeHost(modules["WorkspaceOpsMixin"], QWidget):
+        def __init__(self, editor):
+            super().__init__()
+            self.header_tree = QTreeWidget()
+            self.tab_widget = QTabWidget()
+            self.tab_widget.addTab(editor, "bench.py")
+
+    editor = bench.editor
+    host = HeaderTreeHost(editor)
+    samples = measure(host._do_update_header_tree, repeat, setup=process_events)
+    result = {"header_tree.update": summarize(samples, top_level_items=host.header_tree.topLevelItemCount())}
+    # Hand the editor back before the host and its tab widget go away.
+    editor.setParent(None)
+    dispose(host)
+    return result
+
+
+def load_editor_modules():
+    """Import the editor once the stand-in `nuke` is installed; returns the classes under test."""
+    from editor.code_editor import CodeEditor, PygmentsHighlighter
+    from editor.output import OutputWidget
+    from editor.window.workspace_ops import WorkspaceOpsMixin
+    return {
+        "CodeEditor": CodeEditor,
+        "PygmentsHighlighter": PygmentsHighlighter,
+        "OutputWidget": OutputWidget,
+        "WorkspaceOpsMixin": WorkspaceOpsMixin,
+    }
+
+
+def force_features_on():
+    """Benchmark every feature regardless of what the default settings enable."""
+    from editor.core import get_settings
+
+    settings = get_settings()
+    settings.ENABLE_COMPLETER = True
+    settings.ENABLE_COMPLETION_POPUP = True
+    settings.ENABLE_INLINE_GHOSTING = True
+    settings.ENABLE_CODE_FOLDING = True
+
+
+def environment_info(nuke_info):
+    import PySide2
+    from PySide2 import QtCore
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+            capture_output=True, text=True, timeout=10,
+        ).stdout.strip()
+    except Exception:
+        commit = ""
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "pyside2": PySide2.__version__,
+        "qt": QtCore.qVersion(),
+        "qpa_platform": os.environ.get("QT_QPA_PLATFORM", ""),
+        "git_commit": commit,
+        "nuke": nuke_info,
+    }
+
+
+def run(sizes, repeat, seed=0, nuke_profile="none", script_nodes=0, log=print):
+    QStandardPaths.setTestModeEnabled(True)
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+
+    from benchmarks.synthetic import LOOKUP_TABLE_LINE, synthetic_script
+
+    nuke_info = nuke_standin.install(profile=nuke_profile, script_nodes=script_nodes)
+    modules = load_editor_modules()
+    force_features_on()
+
+    results = {}
+    for size in sizes:
+        text = synthetic_script(size, seed=seed)
+        log(f"{size} lines: highlighter")
+        size_results = bench_highlighter(text, repeat, modules)
+        log(f"{size} lines: output")
+        size_results.update(bench_output(text, repeat, modules))
+
+        bench = EditorBench(text, modules)
+        try:
+            for name, case in (
+                ("completer", lambda: bench_completer(bench, repeat)),
+                ("ghost text", lambda: bench_ghost_text(bench, repeat)),
+                ("folding", lambda: bench_folding(bench, repeat)),
+                ("brackets", lambda: bench_brackets(bench, repeat, LOOKUP_TABLE_LINE)),
+                ("header tree", lambda: bench_header_tree(bench, repeat, modules)),
+            ):
+                log(f"{size} lines: {name}")
+                size_results.update(case())
+            large_file_mode = bench.editor.large_file_mode
+        finally:
+            bench.close()
+
+        for name, result in size_results.items():
+            result.setdefault("extra", {})["large_file_mode"] = large_file_mode
+            results[f"{name}/{size}"] = result
+
+    app.processEvents()
+    return {
+        "schema": SCHEMA_VERSION,
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "config": {"sizes": list(sizes), "repeat": repeat, "seed": seed},
+        "environment": environment_info(nuke_info),
+        "results": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the headless editor benchmarks.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                        help="synthetic script sizes in lines (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT,
+                        help="timed runs per case after one warm-up run (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the synthetic scripts")
+    parser.add_argument("--nuke-profile", default="none", choices=sorted(nuke_standin.LATENCY_PROFILES),
+                        help="latency profile of the stand-in nuke module (default: %(default)s)")
+    parser.add_argument("--script-nodes", type=int, default=0,
+                        help="populate the stand-in Nuke script with this many nodes")
+    parser.add_argument("--output", help="write the JSON results here instead of stdout")
+    parser.add_argument("--baseline", help="compare against an earlier result file")
+    parser.add_argument("--tolerance", type=float, default=None,
+                        help="allowed slowdown when comparing, as a fraction of the baseline")
+    args = parser.parse_args(argv)
+
+    report = run(
+        args.sizes, max(1, args.repeat), seed=args.seed, nuke_profile=args.nuke_profile,
+        script_nodes=args.script_nodes, log=lambda message: print(message, file=sys.stderr),
+    )
+    data = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(data + "\n")
+    else:
+        print(data)
+
+    if args.baseline:
+        from benchmarks.compare import DEFAULT_TOLERANCE, compare_results, format_rows, load_results
+
+        tolerance = DEFAULT_TOLERANCE if args.tolerance is None else args.tolerance
+        rows = compare_results(load_results(args.baseline), report, tolerance)
+        print(format_rows(rows), file=sys.stderr)
+        if any(row["status"] == "regressed" for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""
+Deterministic synthetic Nuke scripts for the benchmarks.
+
+The scripts mix what the editor sees in real pipeline code: imports, classes with
+docstrings, node-building functions full of nested calls, comments, f-strings and one
+long dictionary literal in the middle for the far bracket-matching case. The output
+always parses, so the header tree benchmark measures a full AST walk.
+"""
+import random
+
+NODE_CLASSES = (
+    "Blur", "Grade", "Merge2", "Transform", "Read", "Write", "ColorCorrect", "Roto",
+    "Defocus", "Shuffle2", "Crop", "Reformat", "Dot", "Switch", "TimeOffset",
+)
+KNOBS = ("size", "mix", "gain", "gamma", "translate", "rotate", "which", "channels")
+
+HEADER = '''"""Synthetic compositing tools used by the editor benchmarks."""
+import os
+import re
+import json
+
+import nuke
+import nukescripts
+
+'''
+
+# Marker of the opening bracket used by the far bracket-matching case.
+LOOKUP_TABLE_LINE = "LOOKUP_TABLE = {"
+
+
+def _class_unit(index, rng):
+    node_class = rng.choice(NODE_CLASSES)
+    knob = rng.choice(KNOBS)
+    return f'''class Tool{index}(object):
+    """Wraps a {node_class} node and keeps its {knob} knob in sync."""
+
+    def __init__(self, name="tool_{index}", parent=None):
+        self.name = name
+        self.parent = parent
+        self.node = None  # Created lazily by build()
+
+    def build(self, value={rng.randint(1, 99)}):
+        self.node = nuke.createNode("{node_class}", "name {{}}".format(self.name), False)
+        self.node["{knob}"].setValue(value * ({rng.random():.3f} + len(self.name)))
+        return self.node
+
+    def describe(self):
+        knobs = {{k: self.node[k].value() for k in ("{knob}", "label") if k in self.node.knobs()}}
+        return f"{{self.name}} ({{self.node.Class() if self.node else '?'}}): {{json.dumps(knobs)}}"
+
+'''
+
+
+def _function_unit(index, rng):
+    first, second = rng.sample(NODE_CLASSES, 2)
+    return f'''def build_node_{index}(source=None, offset={rng.randint(0, 500)}):
+    # Chain a {first} into a {second} and position it next to the source.
+    upstream = source or nuke.selectedNode()
+    first = nuke.nodes.{first}(inputs=[upstream], label="step {index}")
+    second = nuke.nodes.{second}(inputs=[first])
+    for position, node in enumerate((first, second)):
+        node.setXYpos(int(upstream.xpos() + offset), int(upstream.ypos() + (position + 1) * 40))
+    if not re.match(r"^[A-Za-z_]\\w*$", second.name()):
+        raise ValueError("bad node name: %s" % second.name())
+    return [first, second]
+
+'''
+
+
+def _lookup_table(entries, rng):
+    lines = [LOOKUP_TABLE_LINE]
+    for index in range(entries):
+        lines.append(f'    "{rng.choice(NODE_CLASSES)}_{index}": ({rng.random():.4f}, [{index}, {index * 2}], {{"knob": "{rng.choice(KNOBS)}"}}),')
+    lines.append("}")
+    return "\n".join(lines) + "\n\n"
+
+
+def synthetic_script(line_count, seed=0):
+    """Return a script of exactly `line_count` lines; the same arguments give the same text."""
+    rng = random.Random(seed)
+    units = [HEADER]
+    used = HEADER.count("\n")
+    table_at = line_count // 2
+    table_entries = max(10, line_count // 20)
+    index = 0
+    while True:
+        if used >= table_at and table_entries:
+            unit = _lookup_table(table_entries, rng)
+            table_entries = 0
+        elif index % 2:
+            unit = _class_unit(index, rng)
+        else:
+            unit = _function_unit(index, rng)
+        lines = unit.count("\n")
+        if used + lines > line_count - 1:
+            break
+        units.append(unit)
+        used += lines
+        index += 1
+
+    # Pad with comments so every size has exactly the requested number of lines.
+    units.extend(f"# padding {n}\n" for n in range(line_count - 1 - used))
+    units.append("# end of synthetic script")
+    return "".join(units)
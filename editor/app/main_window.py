@@ -22,8 +22,9 @@ import editor.ui.dialogs.new_nuke_project
 import editor.ui.dialogs.searchDialogs
 import editor.settings.github_utils
 import editor.ui.toolbars.main_toolbar
-from editor.core import PathFromOS, CodeEditorSettings, write_python_file
+from editor.core import PathFromOS, get_settings, write_python_file
 from editor.code_editor import CodeEditor
+from editor.keymap import get_keymap
 from PySide2.QtWidgets import QTextEdit, QMainWindow, QPushButton, QHBoxLayout, QWidget, QApplication
 from PySide2.QtCore import Qt, QRect, QSize, QTimer
 from PySide2.QtGui import QColor, QTextCharFormat, QFont
@@ -47,6 +48,7 @@ importlib.reload(editor.ui.dialogs.searchDialogs)
 importlib.reload(editor.settings.github_utils)
 importlib.reload(editor.ui.toolbars.main_toolbar)
 from editor.code_editor import PygmentsHighlighter
+from editor.recovery import journal_writer
 from editor.ui.toolbars.main_toolbar import MainToolbar
 
 class EditorApp(QMainWindow, FileOpsMixin, RunOpsMixin, TabOpsMixin, LayoutOpsMixin, MenuOpsMixin, WorkspaceOpsMixin):
@@ -76,7 +78,7 @@ class EditorApp(QMainWindow, FileOpsMixin, RunOpsMixin, TabOpsMixin, LayoutOpsMi
 
         # Load settings
         self._update_startup_progress(4, "Loading settings...")
-        self.settings = CodeEditorSettings()
+        self.settings = get_settings()
         # self.setWindowFlags(Qt.WindowStaysOnTopHint)
 
         # Window title and initial properties
@@ -194,7 +196,7 @@ class EditorApp(QMainWindow, FileOpsMixin, RunOpsMixin, TabOpsMixin, LayoutOpsMi
         # If we can't (or shouldn't) resume a project, start with no editor tabs.
         # CustomTabWidget will show its welcome screen instead.
         if last_project_loaded:
-            self.add_new_tab("untitled.py", initial_content=CodeEditorSettings().temp_codes)
+            self.add_new_tab("untitled.py", initial_content=get_settings().temp_codes)
         else:
             try:
                 if hasattr(self.tab_widget, "check_and_show_welcome"):
@@ -203,15 +205,22 @@ class EditorApp(QMainWindow, FileOpsMixin, RunOpsMixin, TabOpsMixin, LayoutOpsMi
                 pass
         self.create_bottom_tabs() # Conolse / Output Widgets
         # Define dynamic shortcuts from settings
-        run_shortcut = QShortcut(QKeySequence(self.settings.get_shortcut("Execute Selected or All")), self)
+        run_shortcut = QShortcut(get_keymap().key_sequence("Execute Selected or All"), self)
         run_shortcut.activated.connect(self.run_code)
         # Replace shortcut
-        self.replace_shortcut = QShortcut(QKeySequence(self.settings.get_shortcut("Replace")), self)
+        self.replace_shortcut = QShortcut(get_keymap().key_sequence("Replace"), self)
         self.replace_shortcut.activated.connect(lambda: self.show_search_dialog(show_replace=True))
 
         self._autosave_timer = QTimer(self)
         self._autosave_timer.timeout.connect(self._on_autosave_timeout)
         self.apply_runtime_settings()
+        app = QApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.stop_background_writers)
+        journal_writer().failed.connect(self._on_journal_write_failed)
+
+        # Reopen unsaved work if a previous session crashed
+        QTimer.singleShot(0, self.offer_crash_recovery)
 
     def _open_project_default_file(self, project_dir):
         if not project_dir:
@@ -238,7 +247,7 @@ class EditorApp(QMainWindow, FileOpsMixin, RunOpsMixin, TabOpsMixin, LayoutOpsMi
                 print(f"[Startup] Progress callback failed: {exc}", file=sys.stderr)
 
     def apply_runtime_settings(self):
-        self.settings = CodeEditorSettings()
+        self.settings = get_settings()
         self._apply_editor_runtime_settings()
         self._configure_autosave_timer()
 
@@ -254,7 +263,7 @@ class EditorApp(QMainWindow, FileOpsMixin, RunOpsMixin, TabOpsMixin, LayoutOpsMi
                     editor = tab_widget.widget(i)
                     if not isinstance(editor, CodeEditor):
                         continue
-                    editor.settings = CodeEditorSettings()
+                    editor.settings = get_settings()
                     editor.ctrl_wheel_enabled = editor.settings.ctrlWheel
                     editor.setFont(QFont(editor.settings.main_default_font, editor.settings.main_font_size))
                     editor.apply_tab_settings()
@@ -275,13 +284,10 @@ class EditorApp(QMainWindow, FileOpsMixin, RunOpsMixin, TabOpsMixin, LayoutOpsMi
             self._autosave_timer.start(minutes * 60 * 1000)
 
     def _on_autosave_timeout(self):
+        # Unsaved edits are already journaled as they happen; auto-save only writes out
+        # the edits still batched in memory. Journals compact themselves once they grow.
         try:
-            self.settings = CodeEditorSettings()
-            self._configure_autosave_timer()
-        except Exception:
-            pass
-        try:
-            self.autosave_all_modified_files()
+            self.flush_recovery_journals()
         except Exception:
             pass
 
@@ -908,18 +914,21 @@ class EditorApp(QMainWindow, FileOpsMixin, RunOpsMixin, TabOpsMixin, LayoutOpsMi
         if response is None:
             event.accept()
             if event.isAccepted():
+                self.stop_background_writers()
                 self.deleteLater()
             return
 
         # Kaydedilmemiş dosyalar varsa soruları soralım
         if response == QMessageBox.Save:
-            self.save_all_files()
+            self.save_all_files(blocking=True)
             event.accept()
         elif response == QMessageBox.Discard:
+            self.discard_recovery_journals()
             event.accept()  # Exit without saving
         elif response == QMessageBox.Cancel:
             event.ignore()  # Çıkışı iptal et
         if event.isAccepted():
+            self.stop_background_writers()
             self.deleteLater()
 
     def file_exit(self):
@@ -933,9 +942,10 @@ class EditorApp(QMainWindow, FileOpsMixin, RunOpsMixin, TabOpsMixin, LayoutOpsMi
 
         # Kaydedilmemiş dosyalar varsa kullanıcıya soralım
         if response == QMessageBox.Save:
-            self.save_all_files()
+            self.save_all_files(blocking=True)
             self.close()
         elif response == QMessageBox.Discard:
+            self.discard_recovery_journals()
             self.close()  # Kaydetmeden çık
         elif response == QMessageBox.Cancel:
             pass  # İptal edildi, hiçbir şey yapma
@@ -1,19 +1,29 @@
 import importlib
+import itertools
 import json
+import keyword
 import os
 import re
-from PySide2.QtCore import QRect, QPoint
+import threading
+import time
+from functools import partial
+from PySide2.QtCore import QRect, QPoint, QPointF, QLineF, QTimer
 from PySide2.QtCore import QRegExp
-from PySide2.QtCore import QSize
+from PySide2.QtCore import QSize, QThread, Signal, QEvent
 from PySide2.QtGui import QColor, QTextCharFormat, QSyntaxHighlighter, QPen
-from PySide2.QtGui import QFont, QPalette, QTextOption
+from PySide2.QtGui import QFont, QPalette, QTextOption, QTextBlockUserData
 from PySide2.QtGui import QPainter, QTextFormat, QFontDatabase, QTextBlockFormat, QFontMetrics
 from PySide2.QtWidgets import *
 import editor.completer
 import editor.inline_ghosting
-from editor.core import CodeEditorSettings
+from editor.core import get_settings, settings_notifier
 import editor.settings.settings_ui
 from editor.completer import Completer
+from editor.fold_index import FoldIndex
+from editor.symbol_table import SymbolTable
+from editor.multi_cursor import MultiCursor
+from editor.line_ops import dedent_lines, indent_lines, move_lines, remap_line_position, toggle_comment_lines
+from editor.keymap import get_keymap
 from PySide2.QtCore import Qt
 from PySide2.QtGui import QTextCursor
 from editor.inline_ghosting import InlineGhosting
@@ -25,135 +35,308 @@ importlib.reload(editor.settings.settings_ui)
 
 from pygments.style import Style
 from pygments.token import Keyword, Name, Comment, String, Error, Number, Operator, Text, Generic, Literal, Punctuation
+from pygments.token import _TokenType
 from pygments.lexers import PythonLexer
 from pygments.formatters import HtmlFormatter
 
+_BRACKET_CHARS = frozenset("[]{}().")
+_OPEN_BRACKETS = "([{"
+_BRACKET_PAIRS = {'(': ')', ')': '(', '[': ']', ']': '[', '{': '}', '}': '{'}
+_TRIPLE_QUOTES = ('"""', "'''")
+
+# Documents with at least this many lines are highlighted viewport-first, the rest in idle slices.
+LAZY_HIGHLIGHT_MIN_LINES = 3000
+LAZY_HIGHLIGHT_CHUNK = 200
+LAZY_HIGHLIGHT_SLICE_MS = 8
+# Keyboard commands handled by CodeEditor.keyPressEvent, in priority order:
+# command -> (method name, whether the key event is accepted).
+EDITOR_COMMAND_HANDLERS = {
+    "Execute Selected or All": ("execute_selected_or_all_code", True),
+    "Execute All Code": ("run_all_code", True),
+    "Execute Current Line": ("execute_current_line", True),
+    "Comment Toggle": ("toggle_comment", True),
+    "Duplicate Line": ("duplicate_line", True),
+    "Delete Line": ("delete_line", True),
+    "Move Line Up": ("move_line_up", True),
+    "Move Line Down": ("move_line_down", True),
+    "Smart Home": ("smart_home", False),
+    "Smart End": ("smart_end", False),
+    "Show Whitespace": ("toggle_show_whitespace", False),
+}
+EDITOR_COMMANDS = tuple(EDITOR_COMMAND_HANDLERS)
+# Occurrence highlighting is limited to the viewport plus a margin and capped.
+OCCURRENCE_DEBOUNCE_MS = 80
+OCCURRENCE_MARGIN_LINES = 60
+OCCURRENCE_HIGHLIGHT_LIMIT = 300
+# Lightweight highlighting for large-file mode: comments, strings, numbers and keywords only.
+_LIGHT_TOKEN_RE = re.compile(
+    r"(?P<comment>#.*)"
+    r"|(?P<triple>\"\"\"|\'\'\')"
+    r"|(?P<string>\"(?:[^\"\\]|\\.)*\"?|\'(?:[^\'\\]|\\.)*\'?)"
+    r"|(?P<number>\b\d[\d_]*(?:\.\d*)?(?:[eE][+-]?\d+)?j?\b)"
+    r"|(?P<keyword>\b(?:" + "|".join(keyword.kwlist) + r")\b)"
+    r"|(?P<bracket>[()\[\]{}])"
+)
+_LIGHT_QUOTE_STATES = {'"""': 1, "'''": 2}
+_LIGHT_QUOTES = {1: '"""', 2: "'''"}
+_LIGHT_PROVISIONAL = 4
+# Block state for lines the lazy highlighter has not reached yet.
+_PENDING_STATE = -2
+
+
 class CodeEditor(InlineGhosting):
     def __init__(self, editor_window=None, *args):
         super().__init__(*args)
         self.editor_window = editor_window  
-        self.font_size = CodeEditorSettings().main_font_size  
-        self.ctrl_wheel_enabled = CodeEditorSettings().ctrlWheel  
+        self.font_size = get_settings().main_font_size  
+        self.ctrl_wheel_enabled = get_settings().ctrlWheel  
         self.show_whitespace = False  
-        self.extra_cursors = []  
-        self.settings = CodeEditorSettings()  
+        self.extra_cursors = MultiCursor(self.document())
+        self.large_file_mode = False
+        self._streaming = False
+        self._top_banner = None
+        self._column_anchor = None
+        self.settings = get_settings()  
         self.folded_blocks = set()  
+        self._render_cache = None
+        self.fold_index = FoldIndex()
+        self.fold_index.rebuild([""])
+        self.symbol_table = SymbolTable()
+        self.symbol_table.rebuild([""])
+        self._indexed_block_count = 1
+        self._indexed_revision = self.document().revision()
+        self.document().contentsChange.connect(self._update_line_indices)
         self.setup_fonts()
         self.set_background_color()
         self.completer = Completer(self)  
         self.setWordWrapMode(QTextOption.NoWrap)
-        self.set_line_spacing(CodeEditorSettings().line_spacing_size)
+        self.set_line_spacing(get_settings().line_spacing_size)
         self.line_number_area = LineNumberArea(self)
         self.blockCountChanged.connect(self.update_line_number_area_width)
         self.updateRequest.connect(self.update_line_number_area)
-        self.cursorPositionChanged.connect(self.highlight_current_line)
-        self.cursorPositionChanged.connect(self.highlight_current_word)
-        self.cursorPositionChanged.connect(self.highlight_matching_brackets)
-        self.cursorPositionChanged.connect(self.update_cursor_position)
-        self.blockCountChanged.connect(self.update_line_and_character_count)
-        self.textChanged.connect(self.update_line_and_character_count)
-        self.cursorPositionChanged.connect(self.update_line_and_character_count)
+        # Cursor and text changes are coalesced and applied once per event-loop pass.
+        self._updates_pending = False
+        self._defer_selection_refresh = False
+        self._update_timer = QTimer(self)
+        self._update_timer.setSingleShot(True)
+        self._update_timer.timeout.connect(self._flush_updates)
+        self.cursorPositionChanged.connect(self._schedule_updates)
+        self.textChanged.connect(self._schedule_updates)
         self.textChanged.connect(self.handle_text_change)
         self.update_line_number_area_width(0)
         self.highlighter = PygmentsHighlighter(self.document())  
+        self.blockCountChanged.connect(self._update_large_file_mode)
         self._line_selection = None
         self._clicked_line_selection = None
         self._word_selections = []
         self._bracket_selections = []
+        settings_notifier().settings_changed.connect(self._on_settings_changed)
+        self.verticalScrollBar().valueChanged.connect(self._highlight_visible_blocks)
+        self._occurrence_timer = QTimer(self)
+        self._occurrence_timer.setSingleShot(True)
+        self._occurrence_timer.setInterval(OCCURRENCE_DEBOUNCE_MS)
+        self._occurrence_timer.timeout.connect(self._update_occurrences)
+        self.verticalScrollBar().valueChanged.connect(self._schedule_occurrences)
+        self.occurrence_markers = OccurrenceMarkerBar(self.verticalScrollBar())
+        self._occurrence_scan_key = None
+        self._occurrence_generation = 0
+        self._occurrence_worker = occurrence_worker()
+        self._occurrence_worker.scanned.connect(self._on_occurrences_scanned)
+        # Bound to the id, not to self: the editor is gone by the time this runs.
+        self.destroyed.connect(partial(self._occurrence_worker.discard, id(self)))
+
+    def _on_settings_changed(self):
+        self.settings = get_settings()
+        self._render_cache = None
+
+    def _schedule_updates(self):
+        if not self._updates_pending:
+            self._updates_pending = True
+            self._update_timer.start(0)
+
+    def _flush_updates(self):
+        """Recompute cursor-derived highlights and the status bar once for all queued changes."""
+        self._updates_pending = False
+        self._defer_selection_refresh = True
+        try:
+            self.highlight_current_line()
+            self.highlight_current_word()
+            self.highlight_matching_brackets()
+        finally:
+            self._defer_selection_refresh = False
+        self._refresh_extra_selections()
+        self.update_line_and_character_count()
+
+    def changeEvent(self, event):
+        if event.type() == QEvent.FontChange:
+            self._render_cache = None
+        super().changeEvent(event)
+
+    def render_cache(self):
+        """Pens, fonts and metrics for the paint handlers; rebuilt after a font or settings change."""
+        if self._render_cache is None:
+            self._render_cache = EditorRenderCache(self)
+        return self._render_cache
+
+    def _update_line_indices(self, position, chars_removed, chars_added):
+        """Rescan the lines touched by an edit for the fold index and the symbol table."""
+        document = self.document()
+        revision = document.revision()
+        if chars_added == chars_removed and revision == self._indexed_revision:
+            # The highlighter reports format-only changes like this; the text is the same.
+            return
+        self._indexed_revision = revision
+        block_count = document.blockCount()
+        first_block = document.findBlock(position)
+        last_block = document.findBlock(position + chars_added)
+        if not last_block.isValid():
+            last_block = document.lastBlock()
+        first = first_block.blockNumber()
+        last = last_block.blockNumber()
+        delta = block_count - self._indexed_block_count
+        self._indexed_block_count = block_count
+        old_count = last - first + 1 - delta
+        texts = self._block_texts(first_block, last)
+        self.symbol_table.update_lines(first, old_count, texts)
+        if not self.fold_index.update_lines(first, old_count, texts):
+            return
+        if delta and self.folded_blocks:
+            # Keep folds attached to their header lines when lines are inserted or removed.
+            old_end = last - delta
+            self.folded_blocks = {
+                line + delta if line > old_end else line
+                for line in self.folded_blocks
+                if line > old_end or line < first
+            }
 
-    def matches_shortcut(self, event, shortcut_str):
-        """
-        Check if a QKeyEvent matches a shortcut string.
+    def _block_texts(self, block, last):
+        texts = []
+        while block.isValid() and block.blockNumber() <= last:
+            texts.append(block.text())
+            block = block.next()
+        return texts
 
-        Args:
-            event: QKeyEvent to check
-            shortcut_str: Shortcut string like "Ctrl+D", "Alt+Up", "Ctrl+Shift+Enter"
+    def _exceeds_large_file_threshold(self, line_count, char_count):
+        settings = get_settings()
+        return line_count > settings.large_file_line_threshold or char_count > settings.large_file_byte_threshold
 
-        Returns:
-            bool: True if event matches the shortcut
+    def _update_large_file_mode(self, *_args):
+        document = self.document()
+        self.set_large_file_mode(
+            self._exceeds_large_file_threshold(document.blockCount(), document.characterCount())
+        )
+
+    def set_large_file_mode(self, enabled, rehighlight=True):
         """
-        if not shortcut_str:
-            return False
+        Switch cheaper strategies on or off: the lightweight lexer, no ghost text and
+        no whole-document occurrence scan.
+        """
+        enabled = bool(enabled)
+        if enabled == self.large_file_mode:
+            return
+        self.large_file_mode = enabled
+        self.highlighter.set_light_mode(enabled, rehighlight=rehighlight)
+        if enabled:
+            self.clear_ghost_text()
+            self.occurrence_markers.set_lines((), 0)
+        self._schedule_updates()
+
+    def set_document_text(self, text):
+        """
+        Replace the whole document. Large files are highlighted viewport-first and
+        the remaining blocks are caught up in short idle-time slices.
+        """
+        line_count = text.count("\n") + 1
+        # Character count is close enough to the byte size for the threshold check.
+        self.set_large_file_mode(self._exceeds_large_file_threshold(line_count, len(text)), rehighlight=False)
+        if line_count > LAZY_HIGHLIGHT_MIN_LINES:
+            line_height = max(1, self.fontMetrics().lineSpacing())
+            self.highlighter.begin_lazy(self.viewport().height() // line_height + 1)
+        self.setPlainText(text)
+        self.highlighter.start_catch_up()
+
+    def begin_document_stream(self, byte_size):
+        """
+        Prepare an empty document for text that arrives in chunks (see file_loader).
 
-        
-        parts = shortcut_str.split('+')
-        expected_modifiers = Qt.NoModifier
-        expected_key = None
-
-        for part in parts:
-            part = part.strip()
-            if part == "Ctrl":
-                expected_modifiers |= Qt.ControlModifier
-            elif part == "Shift":
-                expected_modifiers |= Qt.ShiftModifier
-            elif part == "Alt":
-                expected_modifiers |= Qt.AltModifier
-            elif part == "Meta":
-                expected_modifiers |= Qt.MetaModifier
-            else:
-                
-                key_map = {
-                    "Enter": Qt.Key_Return,
-                    "Return": Qt.Key_Return,
-                    "Up": Qt.Key_Up,
-                    "Down": Qt.Key_Down,
-                    "Left": Qt.Key_Left,
-                    "Right": Qt.Key_Right,
-                    "Home": Qt.Key_Home,
-                    "End": Qt.Key_End,
-                    "Tab": Qt.Key_Tab,
-                    "Backspace": Qt.Key_Backspace,
-                    "Delete": Qt.Key_Delete,
-                    "Escape": Qt.Key_Escape,
-                    "Space": Qt.Key_Space,
-                    "/": Qt.Key_Slash,
-                    "+": Qt.Key_Plus,
-                    "-": Qt.Key_Minus,
-                    "*": Qt.Key_Asterisk,
-                    "0": Qt.Key_0,
-                    "F5": Qt.Key_F5,
-                }
-
-                if part in key_map:
-                    expected_key = key_map[part]
-                elif len(part) == 1:
-                    
-                    expected_key = ord(part.upper())
-
-        if expected_key is None:
-            return False
+        The editor stays read-only and outside the undo history until
+        `end_document_stream`, and everything past the viewport is highlighted lazily.
+        """
+        self._streaming = True
+        self.set_large_file_mode(self._exceeds_large_file_threshold(0, byte_size), rehighlight=False)
+        self.setReadOnly(True)
+        self.setUndoRedoEnabled(False)
+        line_height = max(1, self.fontMetrics().lineSpacing())
+        self.highlighter.begin_lazy(self.viewport().height() // line_height + 1)
+
+    def append_document_stream(self, text):
+        cursor = QTextCursor(self.document())
+        cursor.movePosition(QTextCursor.End)
+        cursor.insertText(text)
+        # A partially loaded file must never look like it has unsaved changes.
+        self.document().setModified(False)
 
-        
-        return event.key() == expected_key and event.modifiers() == expected_modifiers
+    def end_document_stream(self):
+        if not self._streaming:
+            return
+        self._streaming = False
+        self.setUndoRedoEnabled(True)
+        self.setReadOnly(False)
+        self.document().setModified(False)
+        self._update_large_file_mode()
+        self.highlighter.start_catch_up()
+
+    def is_loading(self):
+        return self._streaming
+
+    def set_top_banner(self, banner):
+        """Show `banner` above the text area, or remove the current one when None."""
+        self._top_banner = banner
+        if banner is not None:
+            banner.show()
+        self.update_line_number_area_width(0)
+        self._layout_margin_widgets()
+
+    def _top_banner_height(self):
+        return self._top_banner.sizeHint().height() if self._top_banner is not None else 0
+
+    def _layout_margin_widgets(self):
+        cr = self.contentsRect()
+        top = self._top_banner_height()
+        self.line_number_area.setGeometry(QRect(cr.left(), cr.top() + top, self.line_number_area_width(), cr.height() - top))
+        if self._top_banner is not None:
+            self._top_banner.setGeometry(QRect(cr.left(), cr.top(), cr.width(), top))
+
+    def visible_block_range(self):
+        """Return the (first, last) block numbers currently painted in the viewport."""
+        block = self.firstVisibleBlock()
+        first = last = block.blockNumber()
+        height = self.viewport().height()
+        top = self.blockBoundingGeometry(block).translated(self.contentOffset()).top()
+        while block.isValid() and top <= height:
+            if block.isVisible():
+                last = block.blockNumber()
+            top += self.blockBoundingRect(block).height()
+            block = block.next()
+        return first, last
+
+    def _highlight_visible_blocks(self, *_args):
+        if self.highlighter.is_lazy():
+            first, last = self.visible_block_range()
+            self.highlighter.highlight_range(first, last)
 
     def _indent_unit(self):
-        settings = CodeEditorSettings()
+        settings = get_settings()
         if settings.use_spaces_for_tabs:
             return " " * int(settings.tab_size)
         return "\t"
 
-    def _remove_indent_from_line(self, cursor):
-        settings = CodeEditorSettings()
-        cursor.movePosition(QTextCursor.StartOfBlock)
-        if not settings.use_spaces_for_tabs:
-            cursor.movePosition(QTextCursor.Right, QTextCursor.KeepAnchor, 1)
-            if cursor.selectedText() == "\t":
-                cursor.removeSelectedText()
-                return
-            cursor.clearSelection()
-        line_text = cursor.block().text()
-        leading_spaces = len(line_text) - len(line_text.lstrip(" "))
-        if leading_spaces > 0:
-            spaces_to_remove = min(int(settings.tab_size), leading_spaces)
-            cursor.movePosition(QTextCursor.Right, QTextCursor.KeepAnchor, spaces_to_remove)
-            cursor.removeSelectedText()
-
     def handle_text_change(self):
         """Trigger completion on each text change while typing."""
         self.completer.update_completions()
 
         
-        if CodeEditorSettings().ENABLE_INLINE_GHOSTING:
+        if get_settings().ENABLE_INLINE_GHOSTING and not self.large_file_mode:
             self.update_ghost_text()  
         else:
             self.ghost_text = ""  
@@ -164,21 +347,21 @@ class CodeEditor(InlineGhosting):
         
         palette = self.palette()
         
-        palette.setColor(QPalette.Base, CodeEditorSettings().code_background_color)
+        palette.setColor(QPalette.Base, get_settings().code_background_color)
         
         self.setPalette(palette)
 
     def setup_fonts(self):
         
 
-        default_font = CodeEditorSettings().main_default_font  
-        default_font_size = CodeEditorSettings().main_font_size  
+        default_font = get_settings().main_default_font  
+        default_font_size = get_settings().main_font_size  
 
         self.setFont(QFont(default_font, default_font_size))  
         self.apply_tab_settings()
 
     def apply_tab_settings(self):
-        settings = CodeEditorSettings()
+        settings = get_settings()
         tab_size = max(1, int(settings.tab_size))
         metrics = QFontMetrics(self.font())
         self.setTabStopDistance(metrics.horizontalAdvance(" ") * tab_size)
@@ -244,78 +427,28 @@ class CodeEditor(InlineGhosting):
 
         
         
-        if self.matches_shortcut(event, self.settings.get_shortcut("Execute Selected or All")):
-            self.execute_selected_or_all_code()
-            event.accept()
-            return
-
-        
-        elif self.matches_shortcut(event, self.settings.get_shortcut("Execute All Code")):
-            self.run_all_code()
-            event.accept()
-            return
-
-        
-        elif self.matches_shortcut(event, self.settings.get_shortcut("Execute Current Line")):
-            self.execute_current_line()
-            event.accept()
-            return
-
-        
-        elif self.matches_shortcut(event, self.settings.get_shortcut("Comment Toggle")):
-            self.toggle_comment()
-            event.accept()
-            return
-
-        
-        elif self.matches_shortcut(event, self.settings.get_shortcut("Duplicate Line")):
-            self.duplicate_line()
-            event.accept()
-            return
-
-        
-        elif self.matches_shortcut(event, self.settings.get_shortcut("Delete Line")):
-            self.delete_line()
-            event.accept()
-            return
-
-        
-        elif self.matches_shortcut(event, self.settings.get_shortcut("Move Line Up")):
-            self.move_line_up()
-            event.accept()
-            return
-
-        
-        elif self.matches_shortcut(event, self.settings.get_shortcut("Move Line Down")):
-            self.move_line_down()
-            event.accept()
-            return
-
-        
-        elif self.matches_shortcut(event, self.settings.get_shortcut("Smart Home")):
-            self.smart_home()
-            return
-
-        
-        elif self.matches_shortcut(event, self.settings.get_shortcut("Smart End")):
-            self.smart_end()
+        command = get_keymap().command_for_event(event, EDITOR_COMMANDS)
+        if command is not None:
+            method_name, accept = EDITOR_COMMAND_HANDLERS[command]
+            getattr(self, method_name)()
+            if accept:
+                event.accept()
             return
 
         
-        elif self.matches_shortcut(event, self.settings.get_shortcut("Show Whitespace")):
-            self.toggle_show_whitespace()
+        if event.key() == Qt.Key_Backspace and self.extra_cursors:
+            self._edit_with_extra_cursors(event, self.apply_backspace_to_extra_cursors)
             return
 
         
-        elif event.key() == Qt.Key_Backspace and self.extra_cursors:
-            super().keyPressEvent(event)
-            self.apply_backspace_to_extra_cursors()
+        elif event.key() == Qt.Key_Delete and self.extra_cursors:
+            self._edit_with_extra_cursors(event, self.apply_delete_to_extra_cursors)
             return
 
-        
-        elif event.key() == Qt.Key_Delete and self.extra_cursors:
-            super().keyPressEvent(event)
-            self.apply_delete_to_extra_cursors()
+        elif event.key() == Qt.Key_Escape and self.extra_cursors:
+            self.extra_cursors.clear()
+            self._refresh_extra_selections()
+            self.viewport().update()
             return
 
         
@@ -370,7 +503,7 @@ class CodeEditor(InlineGhosting):
             if self.completer.completion_popup.popup().isVisible():
                 self.completer.hide_popup()
             
-            if CodeEditorSettings().ENABLE_INLINE_GHOSTING and hasattr(self, 'ghost_text') and self.ghost_text:
+            if get_settings().ENABLE_INLINE_GHOSTING and hasattr(self, 'ghost_text') and self.ghost_text:
                 
                 if hasattr(self, "accept_ghost_text"):
                     self.accept_ghost_text(cursor)
@@ -378,42 +511,14 @@ class CodeEditor(InlineGhosting):
                     cursor.insertText(self.ghost_text)
                     self.ghost_text = ""
                     self.viewport().update()
+            elif cursor.hasSelection() and "\u2029" in cursor.selectedText():
+                self.indent_selected_lines()
             else:
                 cursor.insertText(self._indent_unit())
 
         
         elif event.key() == Qt.Key_Backtab:
-            cursor.beginEditBlock()
-
-            
-            if cursor.hasSelection():
-                
-                start_pos = cursor.selectionStart()
-                end_pos = cursor.selectionEnd()
-
-                
-                cursor.setPosition(start_pos)
-                start_block = cursor.block()
-
-                cursor.setPosition(end_pos)
-                end_block = cursor.block()
-
-                block = start_block
-                while block.isValid():
-                    cursor.setPosition(block.position())
-                    self._remove_indent_from_line(cursor)
-
-                    
-                    if block == end_block:
-                        break
-
-                    block = block.next()
-            else:
-                
-                block = cursor.block()
-                self._remove_indent_from_line(cursor)
-
-            cursor.endEditBlock()
+            self.dedent_selected_lines()
 
         elif event.key() == Qt.Key_Return:
             block = cursor.block()
@@ -422,33 +527,47 @@ class CodeEditor(InlineGhosting):
 
             if text.strip().endswith(':'):
                 indentation += self._indent_unit()
+            cursor.beginEditBlock()
             super().keyPressEvent(event)
             cursor.insertText(indentation)
 
             
             if self.extra_cursors:
                 self.apply_to_extra_cursors('\n' + indentation)
+            cursor.endEditBlock()
 
         else:
             
             if self.extra_cursors and len(event.text()) == 1 and event.text().isprintable():
-                
-                super().keyPressEvent(event)
-                
-                self.apply_to_extra_cursors(event.text())
+                self._edit_with_extra_cursors(event, lambda: self.apply_to_extra_cursors(event.text()))
             else:
                 super().keyPressEvent(event)
 
+    def _edit_with_extra_cursors(self, event, apply_to_extra):
+        """Run the normal key handling and the extra-cursor edit as one undo step."""
+        edit = self.textCursor()
+        edit.beginEditBlock()
+        try:
+            super().keyPressEvent(event)
+            apply_to_extra()
+        finally:
+            edit.endEditBlock()
+
     def update_line_and_character_count(self):
         """Update the total number of characters in the status bar, along with cursor position."""
         cursor = self.textCursor()
         line = cursor.blockNumber() + 1
         column = cursor.columnNumber() + 1
-        total_characters = len(self.toPlainText())
+        # characterCount() includes the final paragraph separator.
+        total_characters = self.document().characterCount() - 1
+
+        message = f"{line}:{column} | Characters: {total_characters}"
+        if self.large_file_mode:
+            message += " | Large file mode"
 
         main_window = self.get_main_window()
         if main_window:
-            main_window.status_bar.showMessage(f"{line}:{column} | Characters: {total_characters}")
+            main_window.status_bar.showMessage(message)
 
     def execute_selected_or_all_code(self):
         """
@@ -518,50 +637,93 @@ class CodeEditor(InlineGhosting):
 
         self.setTextCursor(original_cursor)
 
+    def _selected_block_range(self, cursor):
+        """First and last block touched by the selection (a selection ending at column 0 excludes that line)."""
+        document = self.document()
+        first = document.findBlock(cursor.selectionStart())
+        last = document.findBlock(cursor.selectionEnd())
+        if cursor.hasSelection() and last != first and cursor.selectionEnd() == last.position():
+            last = last.previous()
+        return first, last
+
+    def _block_range_cursor(self, first, last):
+        cursor = QTextCursor(self.document())
+        cursor.setPosition(first.position())
+        cursor.setPosition(last.position() + last.length() - 1, QTextCursor.KeepAnchor)
+        return cursor
+
+    def _replace_lines(self, first, last, transform, line_shift=0):
+        """
+        Replace blocks first..last with `transform(lines)` in a single edit.
+
+        The selection is restored afterwards. Lines that keep their number get their
+        columns shifted by the change in line length. `line_shift` moves the selection
+        by whole lines for move operations. Extra cursors inside the range are put back
+        on their line the same way; the document keeps the others up to date.
+        """
+        document = self.document()
+        main = self.textCursor()
+        first_number = first.blockNumber()
+        last_number = last.blockNumber()
+
+        def line_mark(position):
+            block = document.findBlock(position)
+            return block.blockNumber(), position - block.position()
+
+        marks = [line_mark(main.anchor()), line_mark(main.position())]
+        extra_marks = [
+            (cursor, line_mark(cursor.anchor()), line_mark(cursor.position()))
+            for cursor in self.extra_cursors
+        ]
+
+        edit = self._block_range_cursor(first, last)
+        old_lines = edit.selectedText().split("\u2029")
+        new_lines = transform(old_lines)
+        if new_lines == old_lines:
+            return
+        edit.insertText("\n".join(new_lines))
+
+        positions = []
+        for line, column in marks:
+            if not line_shift and first_number <= line <= last_number:
+                _index, column = remap_line_position(line - first_number, column, old_lines, new_lines)
+            block = document.findBlockByNumber(line + line_shift)
+            positions.append(block.position() + min(column, block.length() - 1))
+        main.setPosition(positions[0])
+        main.setPosition(positions[1], QTextCursor.KeepAnchor)
+
+        for cursor, *cursor_marks in extra_marks:
+            # Qt moved cursors inside the replaced range to its start; outside it, they are right.
+            positions = [cursor.anchor(), cursor.position()]
+            for i, (line, column) in enumerate(cursor_marks):
+                if first_number <= line <= last_number:
+                    index, column = remap_line_position(
+                        line - first_number, column, old_lines, new_lines, line_shift
+                    )
+                    block = document.findBlockByNumber(first_number + index)
+                    positions[i] = block.position() + min(column, block.length() - 1)
+            cursor.setPosition(positions[0])
+            cursor.setPosition(positions[1], QTextCursor.KeepAnchor)
+        self.setTextCursor(main)
+
     def toggle_comment(self):
         """
         Toggle comment on selected lines or current line.
         Ctrl+/ shortcut.
         """
-        cursor = self.textCursor()
-        cursor.beginEditBlock()
-
-        
-        start = cursor.selectionStart()
-        end = cursor.selectionEnd()
-
-        
-        cursor.setPosition(start)
-        start_block = cursor.blockNumber()
-
-        
-        cursor.setPosition(end)
-        end_block = cursor.blockNumber()
+        first, last = self._selected_block_range(self.textCursor())
+        self._replace_lines(first, last, toggle_comment_lines)
 
-        
-        cursor.setPosition(start)
-        for block_num in range(start_block, end_block + 1):
-            cursor.movePosition(QTextCursor.StartOfBlock)
-            line_text = cursor.block().text()
-
-            
-            stripped = line_text.lstrip()
-            if stripped.startswith('#'):
-                
-                indent = len(line_text) - len(stripped)
-                cursor.movePosition(QTextCursor.Right, QTextCursor.MoveAnchor, indent)
-                cursor.deleteChar()  
-                
-                if cursor.block().text()[indent:indent+1] == ' ':
-                    cursor.deleteChar()
-            else:
-                
-                cursor.insertText('# ')
-
-            
-            cursor.movePosition(QTextCursor.NextBlock)
+    def indent_selected_lines(self):
+        first, last = self._selected_block_range(self.textCursor())
+        self._replace_lines(first, last, lambda lines: indent_lines(lines, self._indent_unit()))
 
-        cursor.endEditBlock()
+    def dedent_selected_lines(self):
+        settings = get_settings()
+        first, last = self._selected_block_range(self.textCursor())
+        self._replace_lines(
+            first, last, lambda lines: dedent_lines(lines, settings.tab_size, settings.use_spaces_for_tabs)
+        )
 
     def duplicate_line(self):
         """
@@ -615,77 +777,25 @@ class CodeEditor(InlineGhosting):
 
     def move_line_up(self):
         """
-        Move current line up.
+        Move current line (or the selected lines) up.
         Alt+Up shortcut.
         """
-        cursor = self.textCursor()
-        cursor.beginEditBlock()
-
-        
-        if cursor.blockNumber() == 0:
-            cursor.endEditBlock()
+        first, last = self._selected_block_range(self.textCursor())
+        above = first.previous()
+        if not above.isValid():
             return
-
-        
-        cursor.movePosition(QTextCursor.StartOfBlock)
-        cursor.movePosition(QTextCursor.EndOfBlock, QTextCursor.KeepAnchor)
-        current_line = cursor.selectedText()
-        cursor.removeSelectedText()
-
-        
-        if not cursor.atEnd():
-            cursor.deleteChar()
-
-        
-        cursor.movePosition(QTextCursor.PreviousBlock)
-        cursor.movePosition(QTextCursor.StartOfBlock)
-
-        
-        cursor.insertText(current_line + '\n')
-
-        
-        cursor.movePosition(QTextCursor.PreviousBlock)
-
-        cursor.endEditBlock()
-        self.setTextCursor(cursor)
+        self._replace_lines(above, last, lambda lines: move_lines(lines, -1), line_shift=-1)
 
     def move_line_down(self):
         """
-        Move current line down.
+        Move current line (or the selected lines) down.
         Alt+Down shortcut.
         """
-        cursor = self.textCursor()
-        cursor.beginEditBlock()
-
-        
-        cursor.movePosition(QTextCursor.StartOfBlock)
-        cursor.movePosition(QTextCursor.EndOfBlock, QTextCursor.KeepAnchor)
-        current_line = cursor.selectedText()
-
-        
-        cursor.clearSelection()
-        cursor.movePosition(QTextCursor.EndOfBlock)
-        if cursor.atEnd():
-            cursor.endEditBlock()
+        first, last = self._selected_block_range(self.textCursor())
+        below = last.next()
+        if not below.isValid():
             return
-
-        
-        cursor.movePosition(QTextCursor.StartOfBlock)
-        cursor.movePosition(QTextCursor.EndOfBlock, QTextCursor.KeepAnchor)
-        cursor.movePosition(QTextCursor.Right, QTextCursor.KeepAnchor)  
-        cursor.removeSelectedText()
-
-        
-        cursor.movePosition(QTextCursor.EndOfBlock)
-
-        
-        cursor.insertText('\n' + current_line)
-
-        
-        cursor.movePosition(QTextCursor.StartOfBlock)
-
-        cursor.endEditBlock()
-        self.setTextCursor(cursor)
+        self._replace_lines(first, below, lambda lines: move_lines(lines, 1), line_shift=1)
 
     def smart_home(self):
         """
@@ -740,20 +850,8 @@ class CodeEditor(InlineGhosting):
         """
         if not self.extra_cursors:
             return
-
-        
-        sorted_positions = sorted(self.extra_cursors, reverse=True)
-        new_positions = []
-
-        for pos in sorted_positions:
-            cursor = QTextCursor(self.document())
-            cursor.setPosition(pos)
-            cursor.insertText(text)
-            
-            new_positions.append(pos + len(text))
-
-        
-        self.extra_cursors = new_positions
+        self.extra_cursors.insert_text(text)
+        self._refresh_extra_selections()
         self.viewport().update()
 
     def apply_backspace_to_extra_cursors(self):
@@ -762,22 +860,8 @@ class CodeEditor(InlineGhosting):
         """
         if not self.extra_cursors:
             return
-
-        
-        sorted_positions = sorted(self.extra_cursors, reverse=True)
-        new_positions = []
-
-        for pos in sorted_positions:
-            if pos > 0:  
-                cursor = QTextCursor(self.document())
-                cursor.setPosition(pos)
-                cursor.deletePreviousChar()
-                new_positions.append(pos - 1)
-            else:
-                new_positions.append(pos)
-
-        
-        self.extra_cursors = new_positions
+        self.extra_cursors.delete_previous_char()
+        self._refresh_extra_selections()
         self.viewport().update()
 
     def apply_delete_to_extra_cursors(self):
@@ -786,20 +870,8 @@ class CodeEditor(InlineGhosting):
         """
         if not self.extra_cursors:
             return
-
-        
-        sorted_positions = sorted(self.extra_cursors, reverse=True)
-        new_positions = []
-
-        for pos in sorted_positions:
-            cursor = QTextCursor(self.document())
-            cursor.setPosition(pos)
-            if not cursor.atEnd():  
-                cursor.deleteChar()
-            new_positions.append(pos)
-
-        
-        self.extra_cursors = new_positions
+        self.extra_cursors.delete_char()
+        self._refresh_extra_selections()
         self.viewport().update()
 
     def get_main_window(self):
@@ -820,7 +892,7 @@ class CodeEditor(InlineGhosting):
 
         
         run_selected_action = QAction("Run Selected Code", self)
-        run_selected_action.setShortcut(self.settings.get_shortcut("Execute Selected or All"))
+        run_selected_action.setShortcut(get_keymap().shortcut("Execute Selected or All"))
         if self.textCursor().hasSelection():
             run_selected_action.triggered.connect(lambda: main_window.run_code() if main_window else None)
         else:
@@ -829,13 +901,13 @@ class CodeEditor(InlineGhosting):
 
         
         run_all_action = QAction("Run All Code", self)
-        run_all_action.setShortcut(self.settings.get_shortcut("Execute All Code"))
+        run_all_action.setShortcut(get_keymap().shortcut("Execute All Code"))
         run_all_action.triggered.connect(lambda: self.run_all_code())
         menu.addAction(run_all_action)
 
         
         execute_line_action = QAction("Execute Current Line", self)
-        execute_line_action.setShortcut(self.settings.get_shortcut("Execute Current Line"))
+        execute_line_action.setShortcut(get_keymap().shortcut("Execute Current Line"))
         execute_line_action.triggered.connect(lambda: self.execute_current_line())
         menu.addAction(execute_line_action)
 
@@ -845,7 +917,7 @@ class CodeEditor(InlineGhosting):
         
         # Use '&&' so the menu shows a literal '&' (no mnemonic)
         search_action = QAction("Search && Replace", self)
-        search_action.setShortcut(self.settings.get_shortcut("Find"))
+        search_action.setShortcut(get_keymap().shortcut("Find"))
 
         if main_window:
             selected = self.textCursor().selectedText()
@@ -866,29 +938,86 @@ class CodeEditor(InlineGhosting):
         return parent
 
     def highlight_current_word(self):
-        extra_selections = []
         selected_text = self.textCursor().selectedText()
-
         if selected_text and len(selected_text) >= 2:
-            document = self.document()
-            cursor = QTextCursor(document)
-            highlight_format = QTextCharFormat()
-            highlight_format.setBackground(QColor(125, 81, 0))
-
-            while not cursor.isNull() and not cursor.atEnd():
-                cursor = document.find(selected_text, cursor)
-                if not cursor.isNull():
-                    selection = QTextEdit.ExtraSelection()
-                    selection.cursor = cursor
-                    selection.format = highlight_format
-                    extra_selections.append(selection)
-        else:
+            self._occurrence_timer.start()
+            return
+
+        self._occurrence_timer.stop()
+        self._occurrence_scan_key = None
+        self._occurrence_generation = self._occurrence_worker.next_generation()
+        self._occurrence_worker.discard(id(self))
+        self.occurrence_markers.set_lines((), 0)
+        if self._word_selections:
             self._word_selections = []
             self._refresh_extra_selections()
+
+    def _schedule_occurrences(self, *_args):
+        # Scrolling brings new lines into range; refresh once the viewport settles.
+        if len(self.textCursor().selectedText()) >= 2:
+            self._occurrence_timer.start()
+
+    def _update_occurrences(self):
+        """Highlight occurrences of the selection around the viewport, up to a fixed cap."""
+        selected_text = self.textCursor().selectedText()
+        if len(selected_text) < 2:
+            return
+        if "\u2029" in selected_text:
+            # A multi-line selection never matches inside one block.
+            self._occurrence_scan_key = None
+            self.occurrence_markers.set_lines((), 0)
+            if self._word_selections:
+                self._word_selections = []
+                self._refresh_extra_selections()
             return
 
+        document = self.document()
+        first, last = self.visible_block_range()
+        block = document.findBlockByNumber(max(0, first - OCCURRENCE_MARGIN_LINES))
+        end_number = min(document.blockCount() - 1, last + OCCURRENCE_MARGIN_LINES)
+
+        highlight_format = QTextCharFormat()
+        highlight_format.setBackground(QColor(125, 81, 0))
+        extra_selections = []
+        # Search only the blocks around the viewport, case-insensitively like
+        # QTextDocument.find, so the cost does not depend on the file size.
+        needle = selected_text.lower()
+        while block.isValid() and block.blockNumber() <= end_number:
+            text = block.text().lower()
+            start = text.find(needle)
+            while start != -1 and len(extra_selections) < OCCURRENCE_HIGHLIGHT_LIMIT:
+                cursor = QTextCursor(document)
+                cursor.setPosition(block.position() + start)
+                cursor.setPosition(block.position() + start + len(selected_text), QTextCursor.KeepAnchor)
+                selection = QTextEdit.ExtraSelection()
+                selection.cursor = cursor
+                selection.format = highlight_format
+                extra_selections.append(selection)
+                start = text.find(needle, start + len(needle))
+            if len(extra_selections) >= OCCURRENCE_HIGHLIGHT_LIMIT:
+                break
+            block = block.next()
+
         self._word_selections = extra_selections
         self._refresh_extra_selections()
+        self._scan_occurrence_markers(selected_text)
+
+    def _scan_occurrence_markers(self, needle):
+        # Multi-line selections never match a single block, so there is nothing to mark.
+        # Large files skip the whole-document scan and only highlight around the viewport.
+        if "\u2029" in needle or self.large_file_mode:
+            self.occurrence_markers.set_lines((), 0)
+            return
+        key = (needle, self.document().revision())
+        if key == self._occurrence_scan_key:
+            return
+        self._occurrence_scan_key = key
+        self._occurrence_generation = self._occurrence_worker.next_generation()
+        self._occurrence_worker.submit(id(self), self._occurrence_generation, self.toPlainText(), needle)
+
+    def _on_occurrences_scanned(self, generation, lines, line_count):
+        if generation == self._occurrence_generation:
+            self.occurrence_markers.set_lines(lines, line_count)
 
     def highlight_matching_brackets(self):
         """
@@ -898,11 +1027,7 @@ class CodeEditor(InlineGhosting):
         pos = cursor.position()
 
         
-        brackets = {
-            '(': ')', ')': '(',
-            '[': ']', ']': '[',
-            '{': '}', '}': '{',
-        }
+        brackets = _BRACKET_PAIRS
 
         
         char_at = self.document().characterAt(pos)
@@ -957,41 +1082,38 @@ class CodeEditor(InlineGhosting):
     def find_matching_bracket(self, pos, bracket, brackets):
         """
         Find the position of matching bracket.
-        """
-        doc = self.document()
-        text = doc.toPlainText()
 
-        
-        if pos < 0 or pos >= len(text):
+        Walks the per-block bracket lists kept by the highlighter, so brackets inside
+        strings and comments are ignored and the document text is never copied.
+        """
+        block = self.document().findBlock(pos)
+        if not block.isValid():
+            return -1
+        block_brackets = self.highlighter.block_brackets
+        offset = pos - block.position()
+        entries = block_brackets(block)
+        if (offset, bracket) not in entries:
             return -1
 
-        is_opening = bracket in '([{'
+        is_opening = bracket in _OPEN_BRACKETS
         match_bracket = brackets[bracket]
-
-        if is_opening:
-            
-            count = 1
-            for i in range(pos + 1, len(text)):
-                if i >= len(text):  
-                    break
-                if text[i] == bracket:
-                    count += 1
-                elif text[i] == match_bracket:
-                    count -= 1
-                    if count == 0:
-                        return i
-        else:
-            
-            count = 1
-            for i in range(pos - 1, -1, -1):
-                if i < 0 or i >= len(text):  
-                    break
-                if text[i] == bracket:
+        count = 0
+        while block.isValid():
+            if is_opening:
+                candidates = entries if offset is None else [e for e in entries if e[0] >= offset]
+            else:
+                candidates = reversed(entries if offset is None else [e for e in entries if e[0] <= offset])
+            for index, char in candidates:
+                if char == bracket:
                     count += 1
-                elif text[i] == match_bracket:
+                elif char == match_bracket:
                     count -= 1
                     if count == 0:
-                        return i
+                        return block.position() + index
+            block = block.next() if is_opening else block.previous()
+            offset = None
+            if block.isValid():
+                entries = block_brackets(block)
 
         return -1  
 
@@ -1005,6 +1127,8 @@ class CodeEditor(InlineGhosting):
             main_window.status_bar.showMessage(f"{line}:{column}")
 
     def _refresh_extra_selections(self):
+        if self._defer_selection_refresh:
+            return
         selections = []
         if self._line_selection:
             selections.append(self._line_selection)
@@ -1012,75 +1136,76 @@ class CodeEditor(InlineGhosting):
             selections.append(self._clicked_line_selection)
         selections.extend(self._word_selections)
         selections.extend(self._bracket_selections)
+        if self.extra_cursors:
+            # Box and multi-cursor selections are painted like the main selection.
+            highlight = self.palette().highlight()
+            highlighted_text = self.palette().highlightedText()
+            for cursor in self.extra_cursors:
+                if cursor.hasSelection():
+                    selection = QTextEdit.ExtraSelection()
+                    selection.cursor = cursor
+                    selection.format.setBackground(highlight)
+                    selection.format.setForeground(highlighted_text)
+                    selections.append(selection)
         self.setExtraSelections(selections)
 
     def paintEvent(self, event):
         super().paintEvent(event)
+        large_file_mode = self.large_file_mode
+        if large_file_mode and not self.extra_cursors:
+            return
         painter = QPainter(self.viewport())
-
-        
-        pen = QPen(QColor(CodeEditorSettings().intender_color))
-        pen.setWidth(CodeEditorSettings().intender_width)
-        painter.setPen(pen)
-
+        cache = self.render_cache()
+        char_width = cache.char_width
+        indent_step = cache.tab_size * char_width
+        half_height = cache.char_height / 2
+        x_offset = self.contentOffset().x()
+        show_whitespace = self.show_whitespace
+        block_indent = self.highlighter.block_indent
+        rect_top = event.rect().top()
+        rect_bottom = event.rect().bottom()
+
+        guides = []
+        dots = []
+        arrows = []
+
+        # One pass over the visible blocks collects everything; each kind is drawn in a single call.
         block = self.firstVisibleBlock()
         top = self.blockBoundingGeometry(block).translated(self.contentOffset()).top()
         bottom = top + self.blockBoundingRect(block).height()
 
-        while block.isValid() and top <= event.rect().bottom():
-            if block.isVisible() and bottom >= event.rect().top():
-                text = block.text()
-                indentation_level = len(text) - len(text.lstrip())
-                indent_size = int(CodeEditorSettings().tab_size)
-                font_metrics = self.fontMetrics()
-                char_width = font_metrics.horizontalAdvance(' ')
+        # Indent guides and whitespace markers are skipped for large files.
+        while not large_file_mode and block.isValid() and top <= rect_bottom:
+            if block.isVisible() and bottom >= rect_top:
+                for i in range(1, block_indent(block) // cache.tab_size + 1):
+                    x = i * indent_step
+                    guides.append(QLineF(x, top, x, bottom))
 
-                for i in range(1, (indentation_level // indent_size) + 1):
-                    x = i * indent_size * char_width
-                    painter.drawLine(x, top, x, bottom)
+                if show_whitespace:
+                    y = top + half_height
+                    for i, char in enumerate(block.text()):
+                        if char == ' ':
+                            dots.append(QPointF(i * char_width + x_offset + char_width / 2, y))
+                        elif char == '\t':
+                            x = i * char_width + x_offset
+                            arrow_end_x = x + indent_step - 2
+                            arrows.append(QLineF(x + 2, y, arrow_end_x, y))
+                            arrows.append(QLineF(arrow_end_x, y, arrow_end_x - 3, y - 2))
+                            arrows.append(QLineF(arrow_end_x, y, arrow_end_x - 3, y + 2))
 
             block = block.next()
             top = bottom
             bottom = top + self.blockBoundingRect(block).height()
 
-        
-        if self.show_whitespace:
-            pen = QPen(QColor(100, 100, 100))  
-            painter.setPen(pen)
-
-            block = self.firstVisibleBlock()
-            top = self.blockBoundingGeometry(block).translated(self.contentOffset()).top()
-            bottom = top + self.blockBoundingRect(block).height()
-
-            font_metrics = self.fontMetrics()
-            char_width = font_metrics.horizontalAdvance(' ')
-            char_height = font_metrics.height()
-
-            while block.isValid() and top <= event.rect().bottom():
-                if block.isVisible() and bottom >= event.rect().top():
-                    text = block.text()
-                    x_offset = self.contentOffset().x()
-
-                    for i, char in enumerate(text):
-                        x = i * char_width + x_offset
-                        y = top + char_height / 2
-
-                        if char == ' ':
-                            
-                            painter.drawEllipse(int(x + char_width / 2 - 1), int(y - 1), 2, 2)
-                        elif char == '\t':
-                            
-                            arrow_y = int(y)
-                            arrow_start_x = int(x + 2)
-                            arrow_end_x = int(x + char_width * int(CodeEditorSettings().tab_size) - 2)
-                            painter.drawLine(arrow_start_x, arrow_y, arrow_end_x, arrow_y)
-                            
-                            painter.drawLine(arrow_end_x, arrow_y, arrow_end_x - 3, arrow_y - 2)
-                            painter.drawLine(arrow_end_x, arrow_y, arrow_end_x - 3, arrow_y + 2)
-
-                block = block.next()
-                top = bottom
-                bottom = top + self.blockBoundingRect(block).height()
+        if guides:
+            painter.setPen(cache.guide_pen)
+            painter.drawLines(guides)
+        if dots:
+            painter.setPen(cache.whitespace_dot_pen)
+            painter.drawPoints(dots)
+        if arrows:
+            painter.setPen(cache.whitespace_pen)
+            painter.drawLines(arrows)
 
         
         if self.extra_cursors:
@@ -1088,13 +1213,11 @@ class CodeEditor(InlineGhosting):
             pen.setWidth(2)
             painter.setPen(pen)
 
-            for pos in self.extra_cursors:
-                cursor = QTextCursor(self.document())
-                cursor.setPosition(pos)
+            carets = []
+            for cursor in self.extra_cursors:
                 rect = self.cursorRect(cursor)
-
-                
-                painter.drawLine(rect.topLeft(), rect.bottomLeft())
+                carets.append(QLineF(rect.topLeft(), rect.bottomLeft()))
+            painter.drawLines(carets)
 
         painter.end()
 
@@ -1104,7 +1227,7 @@ class CodeEditor(InlineGhosting):
         return space
 
     def update_line_number_area_width(self, _):
-        self.setViewportMargins(self.line_number_area_width(), 0, 0, 0)
+        self.setViewportMargins(self.line_number_area_width(), self._top_banner_height(), 0, 0)
 
     def update_line_number_area(self, rect, dy):
         if dy:
@@ -1117,8 +1240,8 @@ class CodeEditor(InlineGhosting):
 
     def resizeEvent(self, event):
         super().resizeEvent(event)
-        cr = self.contentsRect()
-        self.line_number_area.setGeometry(QRect(cr.left(), cr.top(), self.line_number_area_width(), cr.height()))
+        self._layout_margin_widgets()
+        self._highlight_visible_blocks()
 
     def highlight_current_line(self):
         if self.isReadOnly():
@@ -1137,82 +1260,67 @@ class CodeEditor(InlineGhosting):
 
     def line_number_area_paint_event(self, event):
         painter = QPainter(self.line_number_area)
-        painter.fillRect(event.rect(), CodeEditorSettings().line_number_background_color)
+        cache = self.render_cache()
+        painter.fillRect(event.rect(), cache.gutter_background)
 
         block = self.firstVisibleBlock()
         block_number = block.blockNumber()
         top = self.blockBoundingGeometry(block).translated(self.contentOffset()).top()
         bottom = top + self.blockBoundingRect(block).height()
 
-        font = painter.font()
-        font.setBold(CodeEditorSettings().line_number_weight)
-        font.setPointSize(CodeEditorSettings().main_font_size)
-        painter.setFont(font)
+        painter.setFont(cache.gutter_font)
+        folding_enabled = cache.folding_enabled
+        line_height = cache.char_height
+        icon_size = 8
+        icon_x = 3
+        line_number_x = 15
+        number_width = self.line_number_area.width() - line_number_x - 5
 
         while block.isValid() and top <= event.rect().bottom():
             if block.isVisible() and bottom >= event.rect().top():
                 number = str(block_number + 1)
-                text = block.text().strip()
 
-                
-                folding_enabled = CodeEditorSettings().ENABLE_CODE_FOLDING
                 is_foldable = folding_enabled and self.is_foldable_line(block_number)
                 is_folded = folding_enabled and block_number in self.folded_blocks
 
-                
-                if folding_enabled and is_foldable:
-                    icon_size = 8  
-                    icon_x = 3  
-                    icon_y = int(top + (self.fontMetrics().height() - icon_size) / 2)
-
-                    
-                    icon_color = QColor(120, 120, 120)
-                    painter.setPen(QPen(icon_color))
-                    painter.setBrush(icon_color)
+                if is_foldable:
+                    icon_y = int(top + (line_height - icon_size) / 2)
+                    painter.setPen(cache.fold_icon_pen)
+                    painter.setBrush(cache.fold_icon_color)
 
                     if is_folded:
-                        
                         triangle = [
                             QPoint(icon_x, icon_y),
                             QPoint(icon_x, icon_y + icon_size),
                             QPoint(icon_x + icon_size, icon_y + icon_size // 2)
                         ]
-                        painter.drawPolygon(triangle)
                     else:
-                        
                         triangle = [
                             QPoint(icon_x, icon_y),
                             QPoint(icon_x + icon_size, icon_y),
                             QPoint(icon_x + icon_size // 2, icon_y + icon_size)
                         ]
-                        painter.drawPolygon(triangle)
+                    painter.drawPolygon(triangle)
 
-                
-                painter.setPen(CodeEditorSettings().line_number_color)
-                line_number_x = 15  
-                painter.drawText(line_number_x, top, self.line_number_area.width() - line_number_x - 5,
-                                self.fontMetrics().height(), Qt.AlignLeft, number)
+                painter.setPen(cache.gutter_number_color)
+                painter.drawText(line_number_x, top, number_width, line_height, Qt.AlignLeft, number)
 
-                
-                if folding_enabled and is_folded:
-                    end_line = self.find_block_end(block_number)
-                    hidden_lines = end_line - block_number
+                if is_folded:
+                    hidden_lines = self.find_block_end(block_number) - block_number
                     if hidden_lines > 0:
-                        
-                        painter.setPen(QColor(100, 100, 100))
+                        painter.setPen(cache.fold_hint_color)
                         indicator_text = f"  ... ({hidden_lines} lines)"
-                        text_width = self.fontMetrics().horizontalAdvance(block.text())
+                        text_width = cache.metrics.horizontalAdvance(block.text())
                         painter.drawText(self.line_number_area.width() + text_width + 10, top,
-                                       500, self.fontMetrics().height(),
+                                       500, line_height,
                                        Qt.AlignLeft, indicator_text)
 
-            
             block_number += 1
             block = block.next()
             top = bottom
             bottom = top + self.blockBoundingRect(block).height()
 
-        painter.setPen(CodeEditorSettings().line_number_draw_line)
+        painter.setPen(cache.gutter_border_color)
         painter.drawLine(self.line_number_area.width() - 1, event.rect().top(), self.line_number_area.width() - 1,
                          event.rect().bottom())
 
@@ -1226,31 +1334,51 @@ class CodeEditor(InlineGhosting):
         
         if event.modifiers() == Qt.ControlModifier and event.button() == Qt.LeftButton:
             cursor = self.cursorForPosition(event.pos())
-            position = cursor.position()
-
-            
-            if position in self.extra_cursors:
-                
-                self.extra_cursors.remove(position)
-            else:
-                
-                self.extra_cursors.append(position)
-
+            self.extra_cursors.toggle(cursor.position())
+            self._refresh_extra_selections()
             self.viewport().update()  
             return
 
+        # Alt+drag starts a column (box) selection.
+        if event.modifiers() == Qt.AltModifier and event.button() == Qt.LeftButton:
+            self._column_anchor = self.cursorForPosition(event.pos()).position()
+            self._update_column_selection(self._column_anchor)
+            return
+
         
         if event.button() == Qt.LeftButton and event.modifiers() == Qt.NoModifier:
-            self.extra_cursors.clear()
+            self._column_anchor = None
+            if self.extra_cursors:
+                self.extra_cursors.clear()
+                self._refresh_extra_selections()
 
         super().mousePressEvent(event)  
         self.highlight_clicked_line()
 
+    def mouseMoveEvent(self, event):
+        if self._column_anchor is not None and event.buttons() & Qt.LeftButton:
+            self._update_column_selection(self.cursorForPosition(event.pos()).position())
+            return
+        super().mouseMoveEvent(event)
+
+    def mouseReleaseEvent(self, event):
+        if self._column_anchor is not None and event.button() == Qt.LeftButton:
+            self._column_anchor = None
+            return
+        super().mouseReleaseEvent(event)
+
+    def _update_column_selection(self, position):
+        main_cursor = self.extra_cursors.set_column_selection(self._column_anchor, position)
+        if main_cursor is not None:
+            self.setTextCursor(main_cursor)
+        self._refresh_extra_selections()
+        self.viewport().update()
+
     def highlight_clicked_line(self):
         """Highlight the clicked line with a translucent background."""
         cursor = self.textCursor()
         selection = QTextEdit.ExtraSelection()
-        line_color = CodeEditorSettings().clicked_line_color
+        line_color = get_settings().clicked_line_color
         selection.format.setBackground(line_color)
         selection.format.setProperty(QTextFormat.FullWidthSelection, True)
         selection.cursor = cursor
@@ -1264,63 +1392,15 @@ class CodeEditor(InlineGhosting):
 
     def find_block_end(self, start_line):
         """Find the end line of a code block starting at start_line"""
-        block = self.document().findBlockByNumber(start_line)
-        if not block.isValid():
-            return start_line
-
-        start_text = block.text()
-        start_indent = self.get_indentation_level(start_text)
-
-        
-        block = block.next()
-        current_line = start_line + 1
-
-        while block.isValid():
-            text = block.text().strip()
-
-            
-            if not text or text.startswith('#'):
-                block = block.next()
-                current_line += 1
-                continue
-
-            
-            current_indent = self.get_indentation_level(block.text())
-
-            
-            if current_indent <= start_indent:
-                return current_line - 1
-
-            block = block.next()
-            current_line += 1
-
-        
-        return current_line - 1
+        return self.fold_index.fold_end(start_line)
 
     def is_foldable_line(self, line_number):
         """Check if a line can be folded (starts with def, class, if, for, while, etc.)"""
-        block = self.document().findBlockByNumber(line_number)
-        if not block.isValid():
-            return False
-
-        text = block.text().strip()
-
-        
-        foldable_keywords = ['def ', 'class ', 'if ', 'elif ', 'else:', 'for ', 'while ', 'try:', 'except', 'with ', 'match ', 'case ']
-
-        for keyword in foldable_keywords:
-            if text.startswith(keyword):
-                
-                if text.endswith(':'):
-                    
-                    end_line = self.find_block_end(line_number)
-                    return end_line > line_number
-
-        return False
+        return self.fold_index.is_foldable(line_number)
 
     def toggle_fold(self, line_number):
         """Toggle folding for a block starting at line_number"""
-        if not CodeEditorSettings().ENABLE_CODE_FOLDING:
+        if not get_settings().ENABLE_CODE_FOLDING:
             return
         if not self.is_foldable_line(line_number):
             return
@@ -1339,30 +1419,27 @@ class CodeEditor(InlineGhosting):
 
     def is_line_folded(self, line_number):
         """Check if a line is inside a folded block"""
-        for folded_line in self.folded_blocks:
-            if folded_line < line_number <= self.find_block_end(folded_line):
-                return True
-        return False
+        self.fold_index.set_folded(self.folded_blocks)
+        return self.fold_index.is_hidden(line_number)
 
     def update_folded_blocks(self):
         """Update the visibility of folded blocks"""
-        if not CodeEditorSettings().ENABLE_CODE_FOLDING:
+        if not get_settings().ENABLE_CODE_FOLDING:
             self.folded_blocks.clear()
             return
+        self.fold_index.set_folded(self.folded_blocks)
+        is_hidden = self.fold_index.is_hidden
         block = self.document().firstBlock()
         line_number = 0
 
         while block.isValid():
-            
-            should_hide = self.is_line_folded(line_number)
-
-            
-            block.setVisible(not should_hide)
+            should_hide = is_hidden(line_number)
+            if block.isVisible() == should_hide:
+                block.setVisible(not should_hide)
 
             block = block.next()
             line_number += 1
 
-        
         self.updateGeometry()
         self.viewport().update()
         self.update()
@@ -1380,7 +1457,7 @@ class LineNumberArea(QWidget):
 
     def mousePressEvent(self, event):
         """Handle mouse clicks on line number area for folding"""
-        if not CodeEditorSettings().ENABLE_CODE_FOLDING:
+        if not get_settings().ENABLE_CODE_FOLDING:
             super().mousePressEvent(event)
             return
         if event.button() == Qt.LeftButton:
@@ -1401,6 +1478,137 @@ class LineNumberArea(QWidget):
         super().mousePressEvent(event)
 
 
+class EditorRenderCache:
+    """Pens, fonts and metrics shared by CodeEditor.paintEvent and the line number gutter."""
+
+    def __init__(self, editor):
+        settings = get_settings()
+        self.metrics = editor.fontMetrics()
+        self.char_width = self.metrics.horizontalAdvance(' ')
+        self.char_height = self.metrics.height()
+        self.tab_size = max(1, int(settings.tab_size))
+
+        self.guide_pen = QPen(QColor(settings.intender_color))
+        self.guide_pen.setWidth(settings.intender_width)
+        self.whitespace_pen = QPen(QColor(100, 100, 100))
+        self.whitespace_dot_pen = QPen(QColor(100, 100, 100))
+        self.whitespace_dot_pen.setWidth(2)
+
+        self.gutter_font = QFont(editor.line_number_area.font())
+        self.gutter_font.setBold(settings.line_number_weight)
+        self.gutter_font.setPointSize(settings.main_font_size)
+        self.gutter_background = settings.line_number_background_color
+        self.gutter_number_color = settings.line_number_color
+        self.gutter_border_color = settings.line_number_draw_line
+        self.folding_enabled = settings.ENABLE_CODE_FOLDING
+        self.fold_icon_color = QColor(120, 120, 120)
+        self.fold_icon_pen = QPen(self.fold_icon_color)
+        self.fold_hint_color = QColor(100, 100, 100)
+
+
+class OccurrenceScanWorker(QThread):
+    """
+    Finds the lines containing a needle in text snapshots, off the GUI thread.
+
+    Shared by every editor. Each editor has at most one pending scan, and a newer one
+    replaces it. `scanned(generation, lines, line_count)` carries the generation the
+    scan was submitted with; generations come from `next_generation()`, so they are
+    unique across editors and each editor keeps only the results of its latest scan.
+    """
+    scanned = Signal(int, object, int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._generations = itertools.count(1)
+        self._wake = threading.Condition()
+        # owner -> (generation, text, needle)
+        self._pending = {}
+
+    def next_generation(self):
+        return next(self._generations)
+
+    def submit(self, owner, generation, text, needle):
+        with self._wake:
+            self._pending[owner] = (generation, text, needle)
+            self._wake.notify()
+        if not self.isRunning():
+            self.start()
+
+    def discard(self, owner, *_args):
+        with self._wake:
+            self._pending.pop(owner, None)
+
+    def stop(self):
+        self.requestInterruption()
+        with self._wake:
+            self._wake.notify()
+        self.wait()
+
+    def run(self):
+        while not self.isInterruptionRequested():
+            with self._wake:
+                while not self._pending and not self.isInterruptionRequested():
+                    self._wake.wait()
+                if not self._pending:
+                    continue
+                generation, text, needle = self._pending.pop(next(iter(self._pending)))
+            # QTextDocument.find is case-insensitive by default; match that here.
+            needle = needle.lower()
+            lines = text.lower().split("\n")
+            hits = [number for number, line in enumerate(lines) if needle in line]
+            self.scanned.emit(generation, hits, len(lines))
+
+
+_occurrence_worker = None
+
+
+def occurrence_worker():
+    """The process-wide occurrence scan worker, shared by every editor."""
+    global _occurrence_worker
+    if _occurrence_worker is None:
+        _occurrence_worker = OccurrenceScanWorker()
+    return _occurrence_worker
+
+
+class OccurrenceMarkerBar(QWidget):
+    """Overlay on the vertical scrollbar that marks lines containing the current selection."""
+
+    def __init__(self, scrollbar):
+        super().__init__(scrollbar)
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self._lines = ()
+        self._line_count = 0
+        self.setGeometry(scrollbar.rect())
+        scrollbar.installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if obj is self.parent() and event.type() == QEvent.Resize:
+            self.setGeometry(obj.rect())
+        return super().eventFilter(obj, event)
+
+    def set_lines(self, lines, line_count):
+        if not lines and not self._lines:
+            return
+        self._lines = lines
+        self._line_count = line_count
+        self.update()
+
+    def paintEvent(self, event):
+        if not self._lines or self._line_count <= 0:
+            return
+        height = self.height()
+        scale = height / float(self._line_count)
+        # Several hits usually share a pixel row; draw each row once.
+        rows = sorted({min(height - 2, int(line * scale)) for line in self._lines})
+        width = self.width()
+        painter = QPainter(self)
+        color = QColor(230, 150, 30)
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(color)
+        painter.drawRects([QRect(width - 4, row, 3, 2) for row in rows])
+        painter.end()
+
+
 class PyCharmDarkStyle(Style):
     """
     PyCharm Dark theme adapted for Pygments.
@@ -1482,18 +1690,25 @@ class PyCharmDarkStyle(Style):
     }
 
 
+class BlockData(QTextBlockUserData):
+    """Per-block data produced by the highlighter alongside the formats."""
+
+    __slots__ = ("brackets", "indent")
+
+    def __init__(self, brackets=(), indent=0):
+        super().__init__()
+        self.brackets = brackets
+        self.indent = indent
+
+
 class PygmentsHighlighter(QSyntaxHighlighter):
     def __init__(self, document):
         
         style = "monokai"  
         
         try:
-            with open(settings_path, "r") as settings_file:
-                settings = json.load(settings_file)
-                style = settings.get("General", {}).get("syntax_style_dropdown", style)
-        except FileNotFoundError:
-            pass
-        except json.JSONDecodeError:
+            style = get_settings().syntax_style or style
+        except (OSError, ValueError):
             pass
         super().__init__(document)
 
@@ -1501,13 +1716,36 @@ class PygmentsHighlighter(QSyntaxHighlighter):
         self.formatter = HtmlFormatter(style=style)
         self.lexer = PythonLexer()
         self.token_styles = self._generate_token_styles()
-        self._triple_string_format = self.token_styles.get(String, QTextCharFormat())
         self._resolved_format_cache = {}
         self._default_text_format = self.token_styles.get(Text, QTextCharFormat())
         self._text_fg = self._format_for_token(Text)
         self._op_fg = self._format_for_token(Operator)
         self._attr_fg = self._format_for_token(Name.Attribute)
         self._self_fg = self._pick_self_format()
+        # Use operator color for brackets/dots when it is distinct, otherwise keep text color.
+        self._bracket_fg = self._pick_distinct(self._op_fg, self._attr_fg, against=self._text_fg)
+        self._doc_fg = self._format_for_token(String.Doc)
+        self._root_stack = ("root",)
+        self._stacks = []
+        self._stack_ids = {}
+        self._state_for_stack(self._root_stack)
+        # Lazy mode: blocks past `_lazy_limit` stay pending unless they are on screen.
+        self._lazy = False
+        self._lazy_limit = -1
+        self._visible_range = (0, -1)
+        self._catch_up_timer = QTimer(self)
+        self._catch_up_timer.setSingleShot(True)
+        self._catch_up_timer.timeout.connect(self._catch_up_slice)
+        # Large-file mode swaps the Pygments state machine for a single regex pass.
+        self._light = False
+        self._light_formats = {
+            "comment": self._format_for_token(Comment),
+            "triple": self._format_for_token(String),
+            "string": self._format_for_token(String),
+            "number": self._format_for_token(Number),
+            "keyword": self._format_for_token(Keyword),
+            "bracket": self._bracket_fg,
+        }
 
     def _generate_token_styles(self):
         """Convert Pygments token styles to PyQt formats."""
@@ -1592,111 +1830,307 @@ class PygmentsHighlighter(QSyntaxHighlighter):
         chosen = self._pick_distinct(chosen, self._format_for_token(Name.Attribute), against=text)
         return chosen
 
-    def highlightBlock(self, text):
+    def _state_for_stack(self, stack, in_docstring=False, provisional=False):
         """
-        Split text into tokens and apply styles.
+        Intern a lexer state stack (plus the docstring flag) as a QTextBlock state integer.
 
-        Note: QSyntaxHighlighter runs per-block; Pygments lexers are not stateful per line.
-        We special-case triple-quoted strings so multi-line docstrings highlight correctly.
+        Provisional states belong to on-screen blocks highlighted before the lazy pass
+        reached them; they never compare equal to the final state, so catching up
+        always re-highlights them.
         """
-        self.setCurrentBlockState(0)
+        key = (stack, bool(in_docstring), bool(provisional))
+        state = self._stack_ids.get(key)
+        if state is None:
+            state = len(self._stacks)
+            self._stack_ids[key] = state
+            self._stacks.append(key)
+        return state
+
+    def _stack_for_state(self, state):
+        if 0 <= state < len(self._stacks):
+            return self._stacks[state][:2]
+        return self._root_stack, False
+
+    def is_lazy(self):
+        return self._lazy
+
+    def set_light_mode(self, enabled, rehighlight=True):
+        """Switch between full Pygments highlighting and the lightweight large-file lexer."""
+        enabled = bool(enabled)
+        if enabled == self._light:
+            return
+        self._light = enabled
+        if rehighlight and self.document() is not None:
+            self.rehighlight()
+
+    def _light_line(self, text, quote_state):
+        """
+        Tokenize one line for large-file mode.
+
+        Returns (spans, brackets, quote_state), where spans are (start, length, kind) and
+        quote_state tracks an open triple-quoted string across lines.
+        """
+        spans = []
+        brackets = []
+        pos = 0
+        length = len(text)
+        if quote_state:
+            close = text.find(_LIGHT_QUOTES[quote_state])
+            if close < 0:
+                return [(0, length, "string")], brackets, quote_state
+            pos = close + 3
+            spans.append((0, pos, "string"))
+            quote_state = 0
+        while pos < length:
+            match = _LIGHT_TOKEN_RE.search(text, pos)
+            if match is None:
+                break
+            kind = match.lastgroup
+            start = match.start()
+            if kind == "triple":
+                quote = match.group()
+                close = text.find(quote, match.end())
+                if close < 0:
+                    spans.append((start, length - start, "string"))
+                    return spans, brackets, _LIGHT_QUOTE_STATES[quote]
+                pos = close + 3
+                spans.append((start, pos - start, "string"))
+                continue
+            if kind == "bracket":
+                brackets.append((start, match.group()))
+            spans.append((start, match.end() - start, kind))
+            pos = max(match.end(), start + 1)
+        return spans, brackets, quote_state
+
+    def _highlight_light(self, text, provisional):
+        previous = self.previousBlockState()
+        quote_state = previous & 3 if previous >= 0 else 0
+        spans, brackets, quote_state = self._light_line(text, quote_state)
+        formats = self._light_formats
+        for start, length, kind in spans:
+            self.setFormat(start, length, formats[kind])
+        self.setCurrentBlockState(quote_state | (_LIGHT_PROVISIONAL if provisional else 0))
+        self.setCurrentBlockUserData(BlockData(tuple(brackets), len(text) - len(text.lstrip())))
+
+    def begin_lazy(self, visible_blocks):
+        """Highlight only the first `visible_blocks` blocks until catch-up runs."""
+        self._catch_up_timer.stop()
+        self._lazy = True
+        self._lazy_limit = max(visible_blocks, 0)
+        self._visible_range = (0, self._lazy_limit)
+
+    def start_catch_up(self):
+        if self._lazy:
+            self._catch_up_timer.start(0)
+
+    def highlight_range(self, first, last):
+        """Highlight pending blocks in [first, last] right away, e.g. after a scroll."""
+        self._visible_range = (first, last)
+        document = self.document()
+        if not self._lazy or document is None:
+            return
+        block = document.findBlockByNumber(max(first, self._lazy_limit + 1))
+        while block.isValid() and block.blockNumber() <= last:
+            if block.userState() == _PENDING_STATE:
+                # QSyntaxHighlighter carries on through the following pending blocks.
+                self.rehighlightBlock(block)
+            block = block.next()
 
-        def apply_pygments(segment: str, offset: int):
-            if not segment:
+    def _catch_up_slice(self):
+        document = self.document()
+        if not self._lazy or document is None:
+            return
+        deadline = time.perf_counter() + LAZY_HIGHLIGHT_SLICE_MS / 1000.0
+        while True:
+            block = document.findBlockByNumber(self._lazy_limit + 1)
+            if not block.isValid():
+                self._lazy = False
                 return
-            tokens = self.lexer.get_tokens(segment)
-            local_index = 0
-            for token_type, token_value in tokens:
-                if local_index >= len(segment):
-                    break
-                if not token_value:
-                    continue
-                length = len(token_value)
-                fmt = self._format_for_token(token_type)
-                safe_length = max(0, min(length, len(segment) - local_index))
-                if safe_length:
-                    self.setFormat(offset + local_index, safe_length, fmt)
-                local_index += length
-
-        prev_state = self.previousBlockState()
-        in_delim = None
-        in_state = 0
-        if prev_state == 1:
-            in_delim = "'''"
-            in_state = 1
-        elif prev_state == 2:
-            in_delim = '"""'
-            in_state = 2
-
-        start = 0
-
-        if in_delim:
-            end = text.find(in_delim)
-            if end == -1:
-                self.setFormat(0, len(text), self._triple_string_format)
-                self.setCurrentBlockState(in_state)
+            self._lazy_limit += LAZY_HIGHLIGHT_CHUNK
+            # Pending and provisional blocks always change state, so this walks the whole chunk.
+            self.rehighlightBlock(block)
+            if time.perf_counter() >= deadline:
+                self._catch_up_timer.start(0)
                 return
-            self.setFormat(0, min(len(text), end + 3), self._triple_string_format)
-            start = end + 3
-
-        while start < len(text):
-            next_single = text.find("'''", start)
-            next_double = text.find('"""', start)
-            next_positions = [p for p in (next_single, next_double) if p != -1]
 
-            if not next_positions:
-                apply_pygments(text[start:], start)
-                break
+    def _opens_docstring(self, tokens):
+        # Line-by-line lexing cannot see the closing quotes of a multi-line docstring,
+        # so treat a triple quote that starts the line as a docstring opener.
+        for _index, token_type, value in tokens:
+            if value.isspace() or token_type in String.Affix:
+                continue
+            return token_type in String and value in _TRIPLE_QUOTES
+        return False
 
-            next_pos = min(next_positions)
-            apply_pygments(text[start:next_pos], start)
+    def _lex_line(self, text, stack):
+        """
+        Run the PythonLexer state machine over one line starting from `stack`.
 
-            delim = "'''" if next_pos == next_single else '"""'
-            state = 1 if delim == "'''" else 2
-            end = text.find(delim, next_pos + 3)
-            if end == -1:
-                self.setFormat(next_pos, len(text) - next_pos, self._triple_string_format)
-                self.setCurrentBlockState(state)
+        Mirrors RegexLexer.get_tokens_unprocessed, but also returns the state stack
+        at the end of the line so the next block can resume from it.
+        """
+        lexer = self.lexer
+        tokendefs = lexer._tokens
+        statestack = list(stack)
+        statetokens = tokendefs[statestack[-1]]
+        tokens = []
+        pos = 0
+        end = len(text)
+        while pos < end:
+            for rexmatch, action, new_state in statetokens:
+                m = rexmatch(text, pos)
+                if not m:
+                    continue
+                if action is not None:
+                    if type(action) is _TokenType:
+                        tokens.append((pos, action, m.group()))
+                    else:
+                        tokens.extend(action(lexer, m))
+                pos = m.end()
+                if new_state is not None:
+                    if isinstance(new_state, tuple):
+                        for state in new_state:
+                            if state == '#pop':
+                                if len(statestack) > 1:
+                                    statestack.pop()
+                            elif state == '#push':
+                                statestack.append(statestack[-1])
+                            else:
+                                statestack.append(state)
+                    elif isinstance(new_state, int):
+                        if abs(new_state) >= len(statestack):
+                            del statestack[1:]
+                        else:
+                            del statestack[new_state:]
+                    elif new_state == '#push':
+                        statestack.append(statestack[-1])
+                    statetokens = tokendefs[statestack[-1]]
                 break
+            else:
+                if text[pos] == '\n':
+                    statestack = ['root']
+                    statetokens = tokendefs['root']
+                else:
+                    tokens.append((pos, Error, text[pos]))
+                pos += 1
+        return tokens, tuple(statestack)
 
-            self.setFormat(next_pos, min(len(text) - next_pos, (end + 3) - next_pos), self._triple_string_format)
-            start = end + 3
-
-        # Extra semantic-style overlays (theme-derived) for a more IDE-like feel.
-        self._apply_parameter_name_highlight(text)
-        self._apply_self_highlight(text)
-        self._apply_bracket_highlight(text)
+    def highlightBlock(self, text):
+        """
+        Highlight one block, resuming the lexer from the previous block's state stack.
 
-    def _apply_parameter_name_highlight(self, text: str):
-        # Highlight parameter names in `def func(a, b=1, *, c=None, **kw):`
-        m = re.match(r"^\\s*def\\s+[_A-Za-z][_A-Za-z0-9]*\\s*\\((.*)\\)\\s*:", text)
-        if not m:
-            return
-        params = m.group(1)
-        if not params:
+        The stack left at the end of the line is stored as the block state, so after an
+        edit QSyntaxHighlighter only re-lexes following blocks until the state converges.
+        Parameter names, `self` and brackets are styled from the same token stream.
+        """
+        provisional = False
+        if self._lazy:
+            number = self.currentBlock().blockNumber()
+            if number > self._lazy_limit:
+                first, last = self._visible_range
+                if not first <= number <= last:
+                    self.setCurrentBlockState(_PENDING_STATE)
+                    return
+                provisional = True
+        if self._light:
+            self._highlight_light(text, provisional)
             return
+        stack, doc_active = self._stack_for_state(self.previousBlockState())
+        tokens, end_stack = self._lex_line(text + "\n", stack)
+        opens_doc = not doc_active and end_stack != self._root_stack and self._opens_docstring(tokens)
+
+        length = len(text)
+        brackets = []
+        def_state = 0
+        depth = 0
+        expect_param = False
+        for index, token_type, value in tokens:
+            if index >= length:
+                break
+            if not value:
+                continue
+            fmt = self._format_for_token(token_type)
+
+            if value in _BRACKET_CHARS and (token_type in Punctuation or token_type in Operator):
+                fmt = self._bracket_fg
+                if value != ".":
+                    brackets.append((index, value))
+            elif value == "self" and token_type in Name:
+                fmt = self._self_fg
+            elif token_type in String:
+                if doc_active:
+                    fmt = self._doc_fg
+                    doc_active = value not in _TRIPLE_QUOTES
+                elif opens_doc and value in _TRIPLE_QUOTES:
+                    fmt = self._doc_fg
+                    doc_active = True
+                    opens_doc = False
+
+            # Parameter names in `def func(a, b=1, *, c=None, **kw):`
+            if def_state == 0:
+                if value == "def" and token_type in Keyword:
+                    def_state = 1
+            elif def_state == 1:
+                if token_type in Name.Function:
+                    def_state = 2
+                elif not value.isspace():
+                    def_state = 0
+            elif def_state == 2:
+                if value == "(":
+                    def_state = 3
+                    depth = 1
+                    expect_param = True
+                elif not value.isspace():
+                    def_state = 0
+            elif value in ("(", "[", "{"):
+                depth += 1
+            elif value in (")", "]", "}"):
+                depth -= 1
+                if depth == 0:
+                    def_state = 0
+            elif depth == 1:
+                if value == ",":
+                    expect_param = True
+                elif value in ("=", ":"):
+                    expect_param = False
+                elif expect_param and token_type in Name:
+                    expect_param = False
+                    if value != "self":
+                        fmt = self._attr_fg
+
+            self.setFormat(index, min(len(value), length - index), fmt)
+
+        self.setCurrentBlockState(
+            self._state_for_stack(end_stack, doc_active and end_stack != self._root_stack, provisional)
+        )
+        self.setCurrentBlockUserData(BlockData(tuple(brackets), length - len(text.lstrip())))
+
+    def block_indent(self, block):
+        """Leading whitespace width of `block`, cached in its BlockData once highlighted."""
+        data = block.userData()
+        if isinstance(data, BlockData):
+            return data.indent
+        text = block.text()
+        return len(text) - len(text.lstrip())
 
-        # Find the absolute offset where params start in the line.
-        start_idx = text.find("(")
-        if start_idx == -1:
-            return
-        start_idx += 1
+    def block_brackets(self, block):
+        """
+        Return the (offset, char) code brackets of `block`, skipping strings and comments.
 
-        # Match identifiers that look like parameter names; skip common syntax tokens.
-        for match in re.finditer(r"\\b[_A-Za-z][_A-Za-z0-9]*\\b", params):
-            name = match.group(0)
-            if name in {"def", "return", "lambda"}:
-                continue
-            abs_pos = start_idx + match.start()
-            self.setFormat(abs_pos, len(name), self._attr_fg)
-
-    def _apply_self_highlight(self, text: str):
-        for match in re.finditer(r"\\bself\\b", text):
-            self.setFormat(match.start(), 4, self._self_fg)
-
-    def _apply_bracket_highlight(self, text: str):
-        # Color brackets/braces/parentheses and dots so `{}`, `[]`, `self.` become visible.
-        # Use operator color when it is distinct, otherwise keep text color.
-        fmt = self._pick_distinct(self._op_fg, self._attr_fg, against=self._text_fg)
-        for match in re.finditer(r"[\\[\\]\\{\\}\\(\\)\\.]", text):
-            self.setFormat(match.start(), 1, fmt)
+        Blocks the lazy highlighter has not reached yet are lexed on demand.
+        """
+        data = block.userData()
+        if isinstance(data, BlockData):
+            return data.brackets
+        previous = block.previous()
+        previous_state = previous.userState() if previous.isValid() else -1
+        text = block.text()
+        if self._light:
+            return tuple(self._light_line(text, previous_state & 3 if previous_state >= 0 else 0)[1])
+        stack, _doc = self._stack_for_state(previous_state)
+        tokens, _end_stack = self._lex_line(text + "\n", stack)
+        return tuple(
+            (index, value)
+            for index, token_type, value in tokens
+            if index < len(text) and value in _BRACKET_PAIRS and (token_type in Punctuation or token_type in Operator)
+        )
@@ -2,21 +2,21 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 import builtins
-import inspect
 import json
-import keyword
 import os
 import re
-import types
-from collections import deque
-from difflib import get_close_matches
+from collections import OrderedDict, deque
+from types import MappingProxyType
 from typing import List, Sequence, Tuple
 
 from PySide2.QtCore import QAbstractListModel, QModelIndex, QPoint, QRect, QSize, Qt, QTimer
 from PySide2.QtGui import QColor, QFont, QFontMetrics, QPainter, QTextCursor
 from PySide2.QtWidgets import QApplication, QCompleter, QLabel, QListView, QStyle, QStyledItemDelegate, QStyleOptionViewItem
 
-from editor.core import CodeEditorSettings, PathFromOS
+from editor.core import PathFromOS, get_settings
+from editor import introspection
+from editor.completion_worker import CompletionRequest, classify, completion_worker
+from editor.fuzzy_match import match_score
 
 try:
     import nuke
@@ -35,6 +35,11 @@ except Exception:  # pragma: no cover
     _QtGui = None
     _QtWidgets = None
 
+# Rows shown in the completion popup.
+MAX_COMPLETION_ITEMS = 200
+# Resolved (kind, info) pairs kept across keystrokes.
+COMPLETION_DETAILS_CACHE_SIZE = 4096
+
 
 class CompletionRole:
     TEXT = Qt.UserRole + 1
@@ -48,6 +53,8 @@ class CompletionRole:
 
 @dataclass(frozen=True)
 class CompletionItem:
+    """One popup row; an empty `kind` or `info` is resolved by the model when first needed."""
+
     text: str
     kind: str
     source: str
@@ -61,6 +68,8 @@ class CompletionListModel(QAbstractListModel):
     def __init__(self, parent=None):
         super().__init__(parent)
         self._items: List[CompletionItem] = []
+        self._resolver = None
+        self._resolved = {}
 
     def rowCount(self, parent=QModelIndex()):  # noqa: N802 (Qt API)
         if parent.isValid():
@@ -78,7 +87,7 @@ class CompletionListModel(QAbstractListModel):
         if role in (Qt.DisplayRole, CompletionRole.TEXT):
             return item.text
         if role == CompletionRole.KIND:
-            return item.kind
+            return item.kind or self._details(row)[0]
         if role == CompletionRole.SOURCE:
             return item.source
         if role == CompletionRole.SCORE:
@@ -88,14 +97,33 @@ class CompletionListModel(QAbstractListModel):
         if role == CompletionRole.MATCH_INDICES:
             return item.match_indices
         if role == CompletionRole.INFO:
-            return item.info
+            return item.info or self._details(row)[1]
         return None
 
-    def set_items(self, items: Sequence[CompletionItem]):
+    def set_items(self, items: Sequence[CompletionItem], resolver=None):
+        """
+        Replace the rows. `resolver(item)` returns (kind, info) for rows built without
+        them; it is only called for rows that are painted or selected.
+        """
         self.beginResetModel()
         self._items = list(items)
+        self._resolver = resolver
+        self._resolved = {}
         self.endResetModel()
 
+    def _details(self, row: int) -> Tuple[str, str]:
+        details = self._resolved.get(row)
+        if details is None:
+            item = self._items[row]
+            details = (item.kind, item.info)
+            if self._resolver is not None:
+                try:
+                    details = self._resolver(item)
+                except Exception:
+                    pass
+            self._resolved[row] = details
+        return details
+
 
 class CompletionItemDelegate(QStyledItemDelegate):
     def __init__(self, parent=None):
@@ -208,7 +236,7 @@ class CompletionItemDelegate(QStyledItemDelegate):
         x = text_x
 
         painter.setPen(normal_pen)
-        if match_indices and match_prefix:
+        if match_indices and match_prefix and elided != text:
             # Recompute indices for the elided string to keep highlighting accurate.
             recomputed = self._subsequence_match_indices(match_prefix, elided)
             if recomputed:
@@ -383,9 +411,16 @@ class Completer:
             pass
 
         self.recent_completions = deque(maxlen=20)
-        self._cached_identifiers: List[str] = []
-        self._cached_doc_text: str = ""
-        self._pyside_index = self._build_pyside_index()
+        # (static names, symbol table version) -> merged context-free candidates.
+        self._local_candidates_key = None
+        self._local_candidates = ((), {})
+        self._details_cache = OrderedDict()
+        # Ranking runs on the shared completion worker; rows from older requests are dropped.
+        self._worker = completion_worker()
+        self._worker.ranked.connect(self._on_ranked)
+        self.editor.destroyed.connect(self._disconnect_worker)
+        self._pending_request = None
+        self._pending_context = None
         self._connected_selection = False
         self._active_prefix: str = ""
         self._active_context = None
@@ -411,6 +446,8 @@ class Completer:
             pass
         self._active_prefix = ""
         self._active_context = None
+        self._pending_request = None
+        self._pending_context = None
         try:
             self._debounce_timer.stop()
         except Exception:
@@ -428,20 +465,25 @@ class Completer:
         return True
 
     def update_completions(self, immediate: bool = False):
-        settings = CodeEditorSettings()
+        settings = get_settings()
         if not settings.ENABLE_COMPLETER or not getattr(settings, "ENABLE_COMPLETION_POPUP", True):
             self.hide_popup()
             return
         if immediate:
-            self._update_completions_now()
+            self._update_completions_now(synchronous=True)
             return
         try:
             self._debounce_timer.start(self._debounce_ms)
         except Exception:
             self._update_completions_now()
 
-    def _update_completions_now(self):
-        settings = CodeEditorSettings()
+    def _update_completions_now(self, synchronous: bool = False):
+        """
+        Collect candidates for the cursor position and rank them on the completion worker.
+
+        With `synchronous` the ranking runs here and the popup is updated before returning.
+        """
+        settings = get_settings()
         if not settings.ENABLE_COMPLETER or not getattr(settings, "ENABLE_COMPLETION_POPUP", True):
             self.hide_popup()
             return
@@ -452,7 +494,7 @@ class Completer:
             return
 
         prefix, context = self._get_completion_prefix_and_context(cursor)
-        if (not prefix and context is None) or not self.editor.toPlainText().strip():
+        if (not prefix and context is None) or self.editor.document().isEmpty():
             self.hide_popup()
             return
 
@@ -469,15 +511,40 @@ class Completer:
             except Exception:
                 pass
 
-        self._active_prefix = prefix or ""
+        request = self._make_request(prefix, context=context)
+        if request is None:
+            self.hide_popup()
+            return
+        self._pending_request = request
+        self._pending_context = context
+        if synchronous:
+            self._on_ranked(request.generation, self._worker.rank(id(self), request))
+        else:
+            self._worker.submit(id(self), request)
+
+    def _on_ranked(self, generation: int, rows):
+        """Show the worker's rows if they still belong to the latest request for this editor."""
+        request = self._pending_request
+        if request is None or request.generation != generation:
+            return
+        self._pending_request = None
+        document = self.editor.document()
+        if request.snapshot != (document.revision(), self.editor.textCursor().position()):
+            # The cursor moved without an edit (an edit would have made a newer request).
+            self.hide_popup()
+            return
+
+        prefix = request.prefix
+        context = self._pending_context
+        self._active_prefix = prefix
         self._active_context = context
 
-        items = self._build_items(prefix, context=context)
+        items = self._items_from_rows(rows, prefix)
         if not items:
             self.hide_popup()
             return
 
-        self.model.set_items(items)
+        self.model.set_items(items, resolver=lambda item: self._resolve_details(item, context))
         self._ensure_popup_signals()
         try:
             # Keep QCompleter's internal completion model in sync to avoid empty popups.
@@ -514,6 +581,14 @@ class Completer:
         self._ensure_first_item_selected()
         self._update_info_from_index(self.completion_popup.popup().currentIndex())
 
+    def _disconnect_worker(self, *_args):
+        self._pending_request = None
+        self._worker.discard(id(self))
+        try:
+            self._worker.ranked.disconnect(self._on_ranked)
+        except (RuntimeError, TypeError):
+            pass
+
     def insert_completion(self, completion: str):
         cursor = self.editor.textCursor()
         remove_len = len(self._active_prefix or "")
@@ -576,8 +651,8 @@ class Completer:
 
     def _popup_font(self) -> QFont:
         font = QFont()
-        font.setFamily(CodeEditorSettings().main_default_font)
-        font.setPointSize(max(9, int(CodeEditorSettings().main_font_size) - 2))
+        font.setFamily(get_settings().main_default_font)
+        font.setPointSize(max(9, int(get_settings().main_font_size) - 2))
         return font
 
     def _popup_styles(self) -> str:
@@ -623,7 +698,7 @@ class Completer:
         """
 
     def _calculate_popup_width(self, items: Sequence[CompletionItem]) -> int:
-        sample = items[:200] if isinstance(items, list) else list(items)[:200]
+        sample = items[:MAX_COMPLETION_ITEMS] if isinstance(items, list) else list(items)[:MAX_COMPLETION_ITEMS]
 
         base_font = QFont(self.popup_view.font())
         base_metrics = QFontMetrics(base_font)
@@ -669,71 +744,60 @@ class Completer:
         rect.setWidth(popup_width)
         return rect
 
-    def _build_items(self, prefix: str, context=None) -> List[CompletionItem]:
-        prefix_norm = prefix.lower()
-
+    def _make_request(self, prefix: str, context=None):
+        """Snapshot what ranking needs; returns None when there is nothing to complete."""
         candidates, base_priority, fixed_source = self._collect_candidates(context=context)
         if not candidates:
-            return []
-
-        items: List[CompletionItem] = []
-        for text in candidates:
-            match_indices, match_score = self._match_indices_and_score(prefix, text)
-            if match_score <= 0:
-                continue
+            return None
+        document = self.editor.document()
+        return CompletionRequest(
+            generation=self._worker.next_generation(),
+            snapshot=(document.revision(), self.editor.textCursor().position()),
+            prefix=prefix or "",
+            context_key=self._context_key(context),
+            # The context-free candidates are cached and never modified, so no copies here;
+            # an unchanged tuple also lets the matcher skip its universe diff.
+            candidates=tuple(candidates),
+            base_priority=MappingProxyType(base_priority),
+            fixed_source=fixed_source,
+            recent=frozenset(self.recent_completions),
+            fuzzy=bool(get_settings().ENABLE_FUZZY_COMPLETION),
+            limit=MAX_COMPLETION_ITEMS,
+        )
 
-            if fixed_source is not None:
-                kind, source = self._classify_with_source(text, fixed_source, context=context)
-            else:
-                kind, source = self._classify(text)
-            info = self._build_info(text=text, kind=kind, source=source, context=context)
-            priority = float(base_priority.get(text, 0))
-            recent_boost = 5.0 if text in self.recent_completions else 0.0
-            source_boost = 6.0 if source == "nuke" else 2.0 if source == "pyside2" else 0.0
-            score = match_score + priority + recent_boost + source_boost
-            items.append(
-                CompletionItem(
-                    text=text,
-                    kind=kind,
-                    source=source,
-                    score=score,
-                    match_prefix=prefix,
-                    match_indices=match_indices,
-                    info=info,
-                )
+    def _items_from_rows(self, rows, prefix: str) -> List[CompletionItem]:
+        return [
+            CompletionItem(
+                text=text,
+                kind=kind,
+                source=source,
+                score=score,
+                match_prefix=prefix,
+                match_indices=match_indices,
             )
-
-        if CodeEditorSettings().ENABLE_FUZZY_COMPLETION and len(prefix_norm) >= 3 and len(items) < 30:
-            normalized_map = {c.lower(): c for c in candidates}
-            fuzzy_keys = get_close_matches(prefix_norm, normalized_map.keys(), n=30, cutoff=0.6)
-            existing = {it.text for it in items}
-            for key in fuzzy_keys:
-                text = normalized_map.get(key)
-                if not text or text in existing:
-                    continue
-                if fixed_source is not None:
-                    kind, source = self._classify_with_source(text, fixed_source, context=context)
-                else:
-                    kind, source = self._classify(text)
-                info = self._build_info(text=text, kind=kind, source=source, context=context)
-                priority = float(base_priority.get(text, 0))
-                recent_boost = 5.0 if text in self.recent_completions else 0.0
-                source_boost = 6.0 if source == "nuke" else 2.0 if source == "pyside2" else 0.0
-                items.append(
-                    CompletionItem(
-                        text=text,
-                        kind=kind,
-                        source=source,
-                        score=520.0 + priority + recent_boost + source_boost,
-                        match_prefix=prefix,
-                        match_indices=(),
-                        info=info,
-                    )
-                )
-                existing.add(text)
-
-        items.sort(key=lambda item: (-item.score, item.text.lower()))
-        return items[:200]
+            for score, text, kind, source, match_indices in rows
+        ]
+
+    def _resolve_details(self, item: CompletionItem, context=None) -> Tuple[str, str]:
+        """(kind, info) for a popup row, cached per (completed object, name)."""
+        key = (self._context_key(context), item.text)
+        details = self._details_cache.get(key)
+        if details is not None:
+            self._details_cache.move_to_end(key)
+            return details
+        kind = item.kind
+        if not kind:
+            kind, _source = self._classify_with_source(item.text, item.source, context=context)
+        details = (kind, self._build_info(text=item.text, kind=kind, source=item.source, context=context))
+        self._details_cache[key] = details
+        if len(self._details_cache) > COMPLETION_DETAILS_CACHE_SIZE:
+            self._details_cache.popitem(last=False)
+        return details
+
+    def _context_key(self, context):
+        if context is None:
+            return None
+        return context.get("type"), context.get("base"), id(context.get("object"))
 
     def _classify_with_source(self, name: str, source: str, context=None) -> Tuple[str, str]:
         if source == "node":
@@ -776,6 +840,9 @@ class Completer:
             return "Node"
 
         if source == "builtin":
+            entry = introspection.completion_index()["builtins"].get(text)
+            if entry:
+                return entry[1]
             obj = getattr(builtins, text, None)
             return self._format_object_info(obj, fallback=f"builtins.{text}")
         if source == "python" and kind == "keyword":
@@ -788,6 +855,9 @@ class Completer:
                 except Exception:
                     obj = None
             else:
+                entry = introspection.completion_index()["nuke"].get(text)
+                if entry:
+                    return entry[1]
                 try:
                     obj = getattr(nuke, text) if nuke else None
                 except Exception:
@@ -809,23 +879,7 @@ class Completer:
         return base or source
 
     def _format_object_info(self, obj, fallback: str) -> str:
-        if obj is None:
-            return fallback
-        try:
-            if callable(obj):
-                try:
-                    sig = str(inspect.signature(obj))
-                    return f"{fallback}{sig}"
-                except Exception:
-                    pass
-            doc = getattr(obj, "__doc__", None)
-            if doc:
-                first = doc.strip().splitlines()[0].strip()
-                if first:
-                    return first
-        except Exception:
-            pass
-        return fallback
+        return introspection.describe(obj, fallback)
 
     def _get_completion_prefix_and_context(self, cursor: QTextCursor):
         """
@@ -939,150 +993,17 @@ class Completer:
         return prefix, {"type": "node_name", "source": "node", "prefix": prefix}
 
     def _classify(self, text: str) -> Tuple[str, str]:
-        if text in keyword.kwlist:
-            return "keyword", "python"
-        if hasattr(builtins, text):
-            obj = getattr(builtins, text, None)
-            return ("function" if callable(obj) else "object"), "builtin"
-        if nuke and hasattr(nuke, text):
-            obj = getattr(nuke, text, None)
-            return ("function" if callable(obj) else "object"), "nuke"
-        if text in self._pyside_index:
-            return self._pyside_index[text]
-        if text.startswith("@"):
-            return "decorator", "python"
-        return "name", "local"
-
-    def _build_pyside_index(self) -> dict:
-        if not (_QtCore and _QtGui and _QtWidgets):
-            return {}
-        modules = (_QtCore, _QtGui, _QtWidgets)
-        index: dict = {}
-        for mod in modules:
-            try:
-                for name in dir(mod):
-                    if not name or name.startswith("_"):
-                        continue
-                    obj = getattr(mod, name, None)
-                    if isinstance(obj, type):
-                        kind = "class"
-                    elif callable(obj):
-                        kind = "function"
-                    else:
-                        kind = "object"
-                    index.setdefault(name, (kind, "pyside2"))
-            except Exception:
-                continue
-        return index
+        return classify(text)
 
     def _match_indices_and_score(self, pattern: str, candidate: str) -> Tuple[Tuple[int, ...], float]:
-        pattern = (pattern or "").strip()
-        candidate = (candidate or "").strip()
-        if not candidate:
-            return (), 0.0
-        if not pattern:
-            # Used for attribute completion right after a dot (e.g. `nuke.`).
-            # Keep a stable ordering but allow everything to show.
-            return (), 450.0
-
-        p = pattern.lower()
-        c = candidate.lower()
-
-        # Keep auto-popup noise low: for 1-char patterns, only allow prefix matches.
-        if len(p) < 2 and not c.startswith(p):
-            return (), 0.0
+        return match_score(pattern, candidate)
 
-        if c.startswith(p):
-            indices = tuple(range(min(len(pattern), len(candidate))))
-            return indices, 1000.0
-
-        if len(p) >= 2:
-            start = c.find(p)
-            if start >= 0:
-                end = min(len(candidate), start + len(pattern))
-                indices = tuple(range(start, end))
-                # Earlier substring matches rank higher.
-                return indices, 850.0 - float(start * 2)
-
-        # Subsequence match (harf harf)
-        out: List[int] = []
-        pos = 0
-        for ch in p:
-            idx = c.find(ch, pos)
-            if idx < 0:
-                return (), 0.0
-            out.append(idx)
-            pos = idx + 1
-
-        if not out:
-            return (), 0.0
-
-        span = out[-1] - out[0] + 1
-        gaps = span - len(p)
-        start_penalty = out[0] * 2
-        gap_penalty = gaps * 6
-        base_score = 700.0 - float(start_penalty + gap_penalty)
-
-        # CamelCase / abbreviation boosting (PyCharm-like feel)
-        boundaries = {0}
-        for i in range(1, len(candidate)):
-            prev = candidate[i - 1]
-            cur = candidate[i]
-            nxt = candidate[i + 1] if i + 1 < len(candidate) else ""
-            if prev in "._-/\\ ":
-                boundaries.add(i)
-            elif prev == ":":
-                boundaries.add(i)
-            elif cur.isupper() and (prev.islower() or (nxt and nxt.islower())):
-                # Treat capitals that start a word as boundaries, including QWidget (W + next lowercase).
-                boundaries.add(i)
-            elif prev.isdigit() and cur.isalpha():
-                boundaries.add(i)
-            elif prev.isalpha() and cur.isdigit():
-                boundaries.add(i)
-
-        boundary_hits = sum(1 for idx in out if idx in boundaries)
-        case_hits = sum(
-            1
-            for pch, idx in zip(pattern, out)
-            if pch.isupper() and 0 <= idx < len(candidate) and candidate[idx].isupper()
-        )
-        uppercase_bonus = 60.0 if any(ch.isupper() for ch in pattern) else 0.0
-        start_boundary_bonus = 60.0 if out and out[0] in boundaries else 0.0
-        boundary_bonus = float(boundary_hits) * 40.0
-        case_bonus = float(case_hits) * 30.0
-
-        score = base_score + boundary_bonus + case_bonus + uppercase_bonus + start_boundary_bonus
-
-        # Strong abbreviation match: all chars hit boundaries (e.g. QW -> QWidget, cN -> createNode)
-        if boundary_hits == len(p) and len(p) <= 6:
-            score = max(score, 930.0 - float(out[0] * 2 + gaps * 2))
-
-        return tuple(out), max(1.0, score)
-
-    def _extract_identifiers(self) -> List[str]:
-        text = self.editor.toPlainText()
-        if text == self._cached_doc_text:
-            return self._cached_identifiers
-
-        variable_pattern = r"\b([a-zA-Z_][a-zA-Z_0-9]*)\b"
-        function_pattern = r"\bdef\s+([a-zA-Z_][a-zA-Z_0-9]*)\b"
-        class_pattern = r"\bclass\s+([a-zA-Z_][a-zA-Z_0-9]*)\b"
-
-        variables = set(re.findall(variable_pattern, text))
-        functions = set(re.findall(function_pattern, text))
-        classes = set(re.findall(class_pattern, text))
-
-        self._cached_doc_text = text
-        self._cached_identifiers = sorted(variables | functions | classes)
-        return self._cached_identifiers
-
-    def _collect_candidates(self, context=None) -> Tuple[List[str], dict, str | None]:
+    def _collect_candidates(self, context=None) -> Tuple[Sequence[str], dict, str | None]:
         candidates: List[str] = []
         base_priority: dict = {}
 
         if context and context.get("type") == "node_name":
-            if not CodeEditorSettings().CREATE_NODE_COMPLETER:
+            if not get_settings().CREATE_NODE_COMPLETER:
                 return [], {}, None
             self._ensure_node_cache()
             names = sorted(self._node_cache.keys(), key=lambda n: n.lower())
@@ -1091,7 +1012,7 @@ class Completer:
             return names, base_priority, "node"
 
         if context and context.get("type") == "node_attr":
-            if not CodeEditorSettings().CREATE_NODE_COMPLETER:
+            if not get_settings().CREATE_NODE_COMPLETER:
                 return [], {}, None
             self._ensure_node_cache()
             try:
@@ -1162,63 +1083,31 @@ class Completer:
             # Keep attribute completion list tight.
             return candidates, base_priority, str(source)
 
-        if nuke:
-            try:
-                for name in dir(nuke):
-                    if name.startswith("_"):
-                        continue
-                    candidates.append(name)
-                    base_priority[name] = 20
-            except Exception:
-                pass
-
-        if self._pyside_index:
-            for name in self._pyside_index.keys():
-                candidates.append(name)
-                base_priority.setdefault(name, 12)
-
-        try:
-            for name in dir(builtins):
-                candidates.append(name)
-                base_priority.setdefault(name, 10)
-        except Exception:
-            pass
-
-        try:
-            for name in keyword.kwlist:
-                candidates.append(name)
-                base_priority.setdefault(name, 5)
-        except Exception:
-            pass
-
-        try:
-            for name in dir(types):
-                candidates.append(name)
-                base_priority.setdefault(name, 1)
-        except Exception:
-            pass
-
-        for name in ("@staticmethod", "@classmethod", "@property", "async def", "await"):
-            candidates.append(name)
-            base_priority.setdefault(name, 2)
+        return self._local_candidates_for_document() + (None,)
 
-        try:
-            for name in self._extract_identifiers():
-                candidates.append(name)
-                base_priority.setdefault(name, 3)
-        except Exception:
-            pass
+    def _local_candidates_for_document(self):
+        """
+        Context-free candidates: the shared completion index plus the document's identifiers.
 
-        # Keep unique strings while preserving priority dict.
-        unique: List[str] = []
-        seen = set()
-        for name in candidates:
-            if not isinstance(name, str) or not name:
-                continue
-            if name not in seen:
-                seen.add(name)
+        The merged tuple only changes when a name appears in or disappears from the
+        document, so the matcher sees the same universe between such edits.
+        """
+        # nuke, PySide2, builtins, keywords and types come from the shared completion index.
+        static_names, static_priority = introspection.base_candidates()
+        symbols = self.editor.symbol_table
+        key = (introspection.generation(), symbols.version)
+        if key == self._local_candidates_key:
+            return self._local_candidates
+
+        base_priority = dict(static_priority)
+        unique = list(static_names)
+        for name in symbols.names():
+            if name not in base_priority:
                 unique.append(name)
-        return unique, base_priority, None
+                base_priority[name] = 3
+        self._local_candidates_key = key
+        self._local_candidates = (tuple(unique), base_priority)
+        return self._local_candidates
 
     def _ensure_node_cache(self):
         if self._node_loaded:
@@ -0,0 +1,209 @@
+"""
+Completion ranking off the GUI thread.
+
+The GUI thread gathers everything that needs `nuke` or the document (the prefix, the
+candidate names, recent completions) into an immutable `CompletionRequest`. The worker
+matches and ranks the candidates and emits `ranked(generation, rows)`. Only the newest
+request of each editor is kept, so a burst of keystrokes ranks once. The receiver
+drops rows whose generation is no longer current.
+"""
+import heapq
+import itertools
+import keyword
+import threading
+from dataclasses import dataclass
+from typing import Mapping, Optional, Tuple
+
+from PySide2.QtCore import QThread, Signal
+
+from editor import introspection
+from editor.fuzzy_match import IncrementalMatcher
+
+
+@dataclass(frozen=True)
+class CompletionRequest:
+    generation: int
+    # (document revision, cursor position) the request was made at.
+    snapshot: Tuple[int, int]
+    prefix: str
+    # Identifies the completion context (type, base, completed object) for the matchers.
+    context_key: object
+    candidates: Tuple[str, ...]
+    base_priority: Mapping[str, int]
+    # Set when every candidate comes from one source (attribute and node completion).
+    fixed_source: Optional[str]
+    recent: frozenset
+    fuzzy: bool
+    limit: int
+
+
+_KEYWORDS = frozenset(keyword.kwlist)
+
+
+def classifier():
+    """
+    Return a `classify(text)` bound to the shared completion index.
+
+    The index is looked up once here, so classifying a batch of candidates costs one
+    dict lookup per name and section.
+    """
+    index = introspection.completion_index()
+    builtin_entries = index["builtins"]
+    nuke_entries = index["nuke"]
+    pyside = introspection.pyside_index()
+
+    def classify_text(text):
+        if text in _KEYWORDS:
+            return "keyword", "python"
+        entry = builtin_entries.get(text)
+        if entry:
+            return entry[0], "builtin"
+        entry = nuke_entries.get(text)
+        if entry:
+            return entry[0], "nuke"
+        kind_source = pyside.get(text)
+        if kind_source:
+            return kind_source
+        if text.startswith("@"):
+            return "decorator", "python"
+        return "name", "local"
+
+    return classify_text
+
+
+def classify(text):
+    """(kind, source) of a context-free candidate, from the shared completion index."""
+    return classifier()(text)
+
+
+def rank_completions(request, matcher):
+    """
+    Rank `request.candidates` against `request.prefix`.
+
+    Returns up to `request.limit` (score, text, kind, source, match indices) rows, best
+    first. `kind` is empty when it needs the completed object; the popup model resolves
+    it on the GUI thread.
+    """
+    prefix_norm = request.prefix.lower()
+    fixed_source = request.fixed_source
+    base_priority = request.base_priority
+    recent = request.recent
+    classify_text = classifier() if fixed_source is None else None
+
+    def classify_name(text):
+        if classify_text is None:
+            return "", fixed_source
+        return classify_text(text)
+
+    def rank(text, source, match_score):
+        priority = float(base_priority.get(text, 0))
+        recent_boost = 5.0 if text in recent else 0.0
+        source_boost = 6.0 if source == "nuke" else 2.0 if source == "pyside2" else 0.0
+        return match_score + priority + recent_boost + source_boost
+
+    scored = []
+    for text, match_indices, match_score in matcher.match(request.prefix, request.candidates):
+        kind, source = classify_name(text)
+        scored.append((rank(text, source, match_score), text, kind, source, match_indices))
+
+    if request.fuzzy and len(prefix_norm) >= 3 and len(scored) < 30:
+        # Typo-tolerant fallback; each edit away from the typed prefix costs a little.
+        existing = {entry[1] for entry in scored}
+        for text, match_indices, distance in matcher.approximate(request.prefix, limit=30):
+            if text in existing:
+                continue
+            kind, source = classify_name(text)
+            scored.append((rank(text, source, 520.0 - 10.0 * distance), text, kind, source, match_indices))
+
+    return heapq.nsmallest(request.limit, scored, key=lambda entry: (-entry[0], entry[1].lower()))
+
+
+class CompletionWorker(QThread):
+    """
+    Ranks completion requests one at a time, for every editor.
+
+    Each owner (one per completer) has at most one pending request, and a newer one
+    from the same owner replaces it. `ranked(generation, rows)` is emitted with the rows
+    of `rank_completions` unless the same owner submitted again while ranking.
+    Generations come from `next_generation()`, so they are unique across owners.
+    """
+    ranked = Signal(int, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._generations = itertools.count(1)
+        self._wake = threading.Condition()
+        # owner -> newest request
+        self._pending = {}
+        # Matchers keep per-context state; ranking on the caller's thread shares them.
+        self._rank_lock = threading.Lock()
+        # owner -> {context key -> IncrementalMatcher}
+        self._matchers = {}
+
+    def next_generation(self):
+        return next(self._generations)
+
+    def submit(self, owner, request):
+        with self._wake:
+            self._pending[owner] = request
+            self._wake.notify()
+        if not self.isRunning():
+            self.start()
+
+    def discard(self, owner, *_args):
+        """Drop the pending request and the matchers of `owner`, e.g. when its editor closes."""
+        with self._wake:
+            self._pending.pop(owner, None)
+        with self._rank_lock:
+            self._matchers.pop(owner, None)
+
+    def rank(self, owner, request):
+        """Rank `request` on the calling thread."""
+        with self._rank_lock:
+            return rank_completions(request, self._matcher_for(owner, request.context_key))
+
+    def stop(self):
+        self.requestInterruption()
+        with self._wake:
+            self._wake.notify()
+        self.wait()
+
+    def run(self):
+        while not self.isInterruptionRequested():
+            with self._wake:
+                while not self._pending and not self.isInterruptionRequested():
+                    self._wake.wait()
+                if not self._pending:
+                    continue
+                owner = next(iter(self._pending))
+                request = self._pending.pop(owner)
+            try:
+                rows = self.rank(owner, request)
+            except Exception:
+                rows = []
+            with self._wake:
+                superseded = owner in self._pending
+            if not superseded:
+                self.ranked.emit(request.generation, rows)
+
+    def _matcher_for(self, owner, context_key):
+        # One matcher per owner and completion context, so switching contexts keeps each
+        # narrowing and no editor narrows against another editor's candidates.
+        matchers = self._matchers.setdefault(owner, {})
+        matcher = matchers.get(context_key)
+        if matcher is None:
+            if len(matchers) >= 8:
+                matchers.clear()
+            matcher = matchers[context_key] = IncrementalMatcher()
+        return matcher
+
+
+_completion_worker = None
+
+
+def completion_worker():
+    """The process-wide completion worker, shared by every editor."""
+    global _completion_worker
+    if _completion_worker is None:
+        _completion_worker = CompletionWorker()
+    return _completion_worker
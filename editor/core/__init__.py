@@ -2,9 +2,13 @@
 
 from .core import (  # noqa: F401
     CodeEditorSettings,
+    DEFAULT_KEYBOARD_SHORTCUTS,
     PathFromOS,
     ensure_py_extension,
+    get_settings,
     get_unique_python_path,
+    invalidate_settings,
     load_nuke_function_descriptions,
+    settings_notifier,
     write_python_file,
 )
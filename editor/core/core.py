@@ -2,9 +2,13 @@ import os
 import json
 import shutil
 import platform
-from PySide2.QtCore import QSize, QStandardPaths
+import threading
+import time
+from PySide2.QtCore import QObject, QSize, QStandardPaths, Signal
 from PySide2.QtGui import QColor, Qt, QFontDatabase
 
+_available_font_families = None
+
 def load_nuke_function_descriptions(json_path):
     """Loads Nuke function descriptions from JSON."""
     with open(json_path, "r") as file:
@@ -40,6 +44,46 @@ def get_unique_python_path(file_path):
             return candidate
         counter += 1
 
+
+# Shortcuts used when settings.json has no "Keyboard" entry for a command.
+DEFAULT_KEYBOARD_SHORTCUTS = {
+    "New Project": "Ctrl+N",
+    "New File": "Ctrl+Shift+N",
+    "Open File": "Ctrl+O",
+    "Save": "Ctrl+S",
+    "Save As": "Ctrl+Shift+S",
+    "Close Tab": "Ctrl+W",
+    "Exit": "Ctrl+Q",
+
+    "Undo": "Ctrl+Z",
+    "Redo": "Ctrl+Y",
+    "Cut": "Ctrl+X",
+    "Copy": "Ctrl+C",
+    "Paste": "Ctrl+V",
+    "Select All": "Ctrl+A",
+    "Find": "Ctrl+F",
+    "Replace": "Ctrl+Shift+R",
+    "Go to Line": "Ctrl+G",
+    "Comment Toggle": "Ctrl+/",
+    "Duplicate Line": "Ctrl+D",
+    "Delete Line": "Ctrl+Shift+K",
+    "Move Line Up": "Alt+Up",
+    "Move Line Down": "Alt+Down",
+    "Smart Home": "Home",
+    "Smart End": "End",
+
+    "Zoom In": "Ctrl++",
+    "Zoom Out": "Ctrl+-",
+    "Reset Zoom": "Ctrl+0",
+    "Show Whitespace": "Ctrl+Shift+W",
+
+    "Run Code": "F5",
+    "Execute Selected or All": "Ctrl+Enter",
+    "Execute All Code": "Ctrl+Shift+Enter",
+    "Execute Current Line": "Ctrl+Alt+Enter",
+}
+
+
 class PathFromOS:
     def __init__(self):
         self.project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -107,9 +151,9 @@ class PathFromOS:
 
 
 class CodeEditorSettings:
-    def __init__(self):
+    def __init__(self, settings_json=None):
         """Loads code editor settings."""
-        self.settings_json = os.path.join(PathFromOS().settings_db, "settings.json")
+        self.settings_json = settings_json or os.path.join(PathFromOS().settings_db, "settings.json")
         
         self.temp_codes = "# from love import StopWars"
 
@@ -180,6 +224,9 @@ class CodeEditorSettings:
         self.autosave_interval = code_editor_settings.get("autosave_interval", 5)
         self.tab_size = code_editor_settings.get("tab_size", 4)
         self.use_spaces_for_tabs = code_editor_settings.get("use_spaces_for_tabs", True)
+        # Documents above either threshold switch the editor to large-file mode.
+        self.large_file_line_threshold = code_editor_settings.get("large_file_line_threshold", 20000)
+        self.large_file_byte_threshold = code_editor_settings.get("large_file_size_threshold_kb", 2048) * 1024
 
         
         self.OUTLINER_DOCK_POS = Qt.LeftDockWidgetArea
@@ -204,6 +251,8 @@ class CodeEditorSettings:
             self.WORKPLACE_VISIBLE = True
             self.OUTPUT_VISIBLE = True
 
+        self.syntax_style = settings.get("General", {}).get("syntax_style_dropdown", "monokai")
+
         interface_mode = settings.get("General", {}).get("default_interface_mode", "")
         if interface_mode == "Mumen Rider (Professional)":
             set_default_mode()
@@ -212,10 +261,13 @@ class CodeEditorSettings:
             set_focus_mode()
 
         
-        self.keyboard_shortcuts = self._load_keyboard_shortcuts()
+        self.keyboard_shortcuts = self._load_keyboard_shortcuts(settings)
 
     def _resolve_default_font(self, preferred_font):
-        available_fonts = set(QFontDatabase().families())
+        global _available_font_families
+        if _available_font_families is None:
+            _available_font_families = frozenset(QFontDatabase().families())
+        available_fonts = _available_font_families
         if preferred_font in available_fonts:
             return preferred_font
 
@@ -233,12 +285,13 @@ class CodeEditorSettings:
 
         return "Monospace"
 
-    def _load_keyboard_shortcuts(self):
+    def _load_keyboard_shortcuts(self, settings=None):
         """Load keyboard shortcuts from settings.json"""
         try:
-            with open(self.settings_json, "r") as file:
-                settings = json.load(file)
-                return settings.get("Keyboard", {})
+            if settings is None:
+                with open(self.settings_json, "r") as file:
+                    settings = json.load(file)
+            return settings.get("Keyboard", {})
         except Exception:
             return {}
 
@@ -253,47 +306,80 @@ class CodeEditorSettings:
         Returns:
             str: Keyboard shortcut (e.g., "Ctrl+D", "Ctrl+S")
         """
-        
-        default_shortcuts = {
-            
-            "New Project": "Ctrl+N",
-            "New File": "Ctrl+Shift+N",
-            "Open File": "Ctrl+O",
-            "Save": "Ctrl+S",
-            "Save As": "Ctrl+Shift+S",
-            "Close Tab": "Ctrl+W",
-            "Exit": "Ctrl+Q",
-
-            
-            "Undo": "Ctrl+Z",
-            "Redo": "Ctrl+Y",
-            "Cut": "Ctrl+X",
-            "Copy": "Ctrl+C",
-            "Paste": "Ctrl+V",
-            "Select All": "Ctrl+A",
-            "Find": "Ctrl+F",
-            "Replace": "Ctrl+Shift+R",
-            "Go to Line": "Ctrl+G",
-            "Comment Toggle": "Ctrl+/",
-            "Duplicate Line": "Ctrl+D",
-            "Delete Line": "Ctrl+Shift+K",
-            "Move Line Up": "Alt+Up",
-            "Move Line Down": "Alt+Down",
-            "Smart Home": "Home",
-            "Smart End": "End",
-
-            
-            "Zoom In": "Ctrl++",
-            "Zoom Out": "Ctrl+-",
-            "Reset Zoom": "Ctrl+0",
-            "Show Whitespace": "Ctrl+Shift+W",
-
-            
-            "Run Code": "F5",
-            "Execute Selected or All": "Ctrl+Enter",
-            "Execute All Code": "Ctrl+Shift+Enter",
-            "Execute Current Line": "Ctrl+Alt+Enter",
-        }
-
-        
-        return self.keyboard_shortcuts.get(command_name, default_shortcuts.get(command_name, ""))
+        return self.keyboard_shortcuts.get(command_name, DEFAULT_KEYBOARD_SHORTCUTS.get(command_name, ""))
+
+
+class SettingsNotifier(QObject):
+    """Broadcasts that the settings snapshot was replaced."""
+    settings_changed = Signal()
+
+
+_SETTINGS_MTIME_CHECK_INTERVAL = 2.0
+_settings_lock = threading.Lock()
+_settings_snapshot = None
+_settings_snapshot_mtime = None
+_settings_last_check = 0.0
+_settings_file = None
+_settings_notifier = None
+
+
+def settings_notifier():
+    """Return the process-wide SettingsNotifier."""
+    global _settings_notifier
+    if _settings_notifier is None:
+        _settings_notifier = SettingsNotifier()
+    return _settings_notifier
+
+
+def _settings_file_mtime():
+    try:
+        return os.path.getmtime(_settings_file)
+    except OSError:
+        return None
+
+
+def get_settings():
+    """
+    Return the shared CodeEditorSettings snapshot.
+
+    The snapshot is built once and reused by every editor, completer and paint path.
+    settings.json is re-checked by mtime at most every few seconds; call
+    invalidate_settings() to force a reload immediately.
+    """
+    global _settings_snapshot, _settings_snapshot_mtime, _settings_last_check, _settings_file
+
+    now = time.monotonic()
+    snapshot = _settings_snapshot
+    if snapshot is not None and now - _settings_last_check < _SETTINGS_MTIME_CHECK_INTERVAL:
+        return snapshot
+
+    changed = False
+    with _settings_lock:
+        if _settings_file is None:
+            _settings_file = PathFromOS().settings_path
+        _settings_last_check = now
+        mtime = _settings_file_mtime()
+        if mtime is None:
+            # PathFromOS re-seeds a missing settings.json from the example file.
+            PathFromOS()
+            mtime = _settings_file_mtime()
+        if _settings_snapshot is None or mtime != _settings_snapshot_mtime:
+            changed = _settings_snapshot is not None
+            _settings_snapshot = CodeEditorSettings(_settings_file)
+            _settings_snapshot_mtime = mtime
+        snapshot = _settings_snapshot
+
+    if changed:
+        settings_notifier().settings_changed.emit()
+    return snapshot
+
+
+def invalidate_settings():
+    """Drop the cached snapshot, reload it and notify listeners."""
+    global _settings_snapshot, _settings_snapshot_mtime, _settings_last_check
+    with _settings_lock:
+        _settings_snapshot = None
+        _settings_snapshot_mtime = None
+        _settings_last_check = 0.0
+    get_settings()
+    settings_notifier().settings_changed.emit()
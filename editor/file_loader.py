@@ -0,0 +1,273 @@
+"""
+Streaming file loader for editor tabs.
+
+The file is read and decoded on a worker thread, then appended to the editor in
+line-aligned chunks, a few milliseconds per event-loop tick, so the tab can be
+scrolled and read while the rest of the file is still arriving.
+"""
+import codecs
+import os
+import time
+from collections import deque
+
+from PySide2.QtCore import QObject, QThread, QTimer, Qt, Signal
+from PySide2.QtWidgets import QFrame, QHBoxLayout, QLabel, QProgressBar, QPushButton
+
+try:
+    import charset_normalizer
+except ImportError:
+    charset_normalizer = None
+
+READ_CHUNK_BYTES = 1024 * 1024
+APPEND_CHUNK_CHARS = 64 * 1024
+APPEND_SLICE_MS = 12
+# Files smaller than this load in a tick or two, so no progress banner is shown.
+PROGRESS_MIN_BYTES = 512 * 1024
+
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+# Keeps running loaders alive until their worker thread has finished.
+_active_loaders = set()
+
+
+def detect_encoding(raw):
+    """
+    Best guess at the encoding of `raw`.
+
+    BOMs and valid UTF-8 are recognised directly; anything else goes to the bundled
+    charset_normalizer, with latin-1 as the last resort since it decodes any byte.
+    """
+    for bom, encoding in _BOMS:
+        if raw.startswith(bom):
+            return encoding
+    try:
+        raw.decode("utf-8")
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+    if charset_normalizer is not None:
+        try:
+            best = charset_normalizer.from_bytes(raw).best()
+            if best is not None and best.encoding:
+                return best.encoding
+        except Exception:
+            pass
+    return "latin-1"
+
+
+def split_chunks(text, size=APPEND_CHUNK_CHARS):
+    """Split `text` into pieces of about `size` characters that end on a line break."""
+    chunks = []
+    start = 0
+    length = len(text)
+    while start < length:
+        end = start + size
+        if end < length:
+            newline = text.find("\n", end)
+            end = length if newline < 0 else newline + 1
+        chunks.append(text[start:end])
+        start = end
+    return chunks
+
+
+class FileLoadThread(QThread):
+    """Reads and decodes a file, then hands the text over in chunks."""
+    progress = Signal(int, int)
+    decoded = Signal(str, int)
+    chunk_ready = Signal(str)
+    failed = Signal(str)
+
+    def __init__(self, file_path, parent=None):
+        super().__init__(parent)
+        self.file_path = file_path
+
+    def run(self):
+        try:
+            total = os.path.getsize(self.file_path)
+            parts = []
+            read = 0
+            with open(self.file_path, "rb") as file:
+                while True:
+                    if self.isInterruptionRequested():
+                        return
+                    data = file.read(READ_CHUNK_BYTES)
+                    if not data:
+                        break
+                    parts.append(data)
+                    read += len(data)
+                    self.progress.emit(read, total)
+            raw = b"".join(parts)
+            encoding = detect_encoding(raw)
+            text = raw.decode(encoding, errors="replace")
+            del raw, parts
+            # Same newline handling as reading in text mode.
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+
+        self.decoded.emit(encoding, len(text))
+        for chunk in split_chunks(text):
+            if self.isInterruptionRequested():
+                return
+            self.chunk_ready.emit(chunk)
+
+
+class FileLoadBanner(QFrame):
+    """Progress strip with a cancel button, shown along the top of a loading editor."""
+    cancel_requested = Signal()
+
+    def __init__(self, file_name, parent=None):
+        super().__init__(parent)
+        self.setObjectName("fileLoadBanner")
+        self.setStyleSheet(
+            "#fileLoadBanner { background-color: #2b2b2b; border-bottom: 1px solid #3c3c3c; }"
+            "QLabel { color: #c0c0c0; }"
+        )
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(8, 2, 8, 2)
+        self.label = QLabel(f"Loading {file_name}...")
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setTextVisible(False)
+        self.progress_bar.setFixedHeight(8)
+        cancel_button = QPushButton("Cancel")
+        cancel_button.setCursor(Qt.PointingHandCursor)
+        cancel_button.clicked.connect(self.cancel_requested.emit)
+        layout.addWidget(self.label)
+        layout.addWidget(self.progress_bar, 1)
+        layout.addWidget(cancel_button)
+
+    def set_progress(self, label, percent):
+        self.label.setText(label)
+        self.progress_bar.setValue(percent)
+
+
+class StreamingFileLoader(QObject):
+    """
+    Loads `file_path` into `editor` without blocking the GUI thread.
+
+    Emits `loaded(encoding)` once the whole file is in the document, `cancelled()`
+    if the user stops the load and `failed(message)` if the file cannot be read.
+    """
+    loaded = Signal(str)
+    cancelled = Signal()
+    failed = Signal(str)
+
+    def __init__(self, editor, file_path):
+        super().__init__()
+        self.editor = editor
+        self.file_path = file_path
+        self.encoding = None
+        self._pending = deque()
+        self._total_chars = 0
+        self._appended_chars = 0
+        self._done = False
+
+        self._append_timer = QTimer(self)
+        self._append_timer.setSingleShot(True)
+        self._append_timer.timeout.connect(self._append_slice)
+
+        self.banner = None
+        try:
+            size = os.path.getsize(file_path)
+        except OSError:
+            size = 0
+        if size >= PROGRESS_MIN_BYTES:
+            self.banner = FileLoadBanner(os.path.basename(file_path), editor)
+            self.banner.cancel_requested.connect(self.cancel)
+            editor.set_top_banner(self.banner)
+
+        self._thread = FileLoadThread(file_path)
+        self._thread.progress.connect(self._on_read_progress)
+        self._thread.decoded.connect(self._on_decoded)
+        self._thread.chunk_ready.connect(self._on_chunk)
+        self._thread.failed.connect(self._on_failed)
+        self._thread.finished.connect(self._on_thread_finished)
+        editor.begin_document_stream(size)
+
+    def start(self):
+        _active_loaders.add(self)
+        self._thread.start()
+
+    def is_running(self):
+        return not self._done
+
+    def cancel(self):
+        if self._done:
+            return
+        self._finish()
+        self.cancelled.emit()
+
+    def _on_read_progress(self, read, total):
+        if self.banner is not None and total:
+            self.banner.set_progress(f"Reading {os.path.basename(self.file_path)}...", read * 50 // total)
+
+    def _on_decoded(self, encoding, total_chars):
+        self.encoding = encoding
+        self._total_chars = total_chars
+        if not total_chars:
+            self._complete()
+
+    def _on_chunk(self, chunk):
+        if self._done:
+            return
+        self._pending.append(chunk)
+        if not self._append_timer.isActive():
+            self._append_timer.start(0)
+
+    def _append_slice(self):
+        if self._done:
+            return
+        deadline = time.perf_counter() + APPEND_SLICE_MS / 1000.0
+        while self._pending:
+            chunk = self._pending.popleft()
+            self.editor.append_document_stream(chunk)
+            self._appended_chars += len(chunk)
+            if time.perf_counter() >= deadline:
+                break
+
+        if self.banner is not None and self._total_chars:
+            percent = 50 + self._appended_chars * 50 // self._total_chars
+            self.banner.set_progress(f"Loading {os.path.basename(self.file_path)}...", percent)
+
+        if self._appended_chars >= self._total_chars and self._total_chars:
+            self._complete()
+        elif self._pending:
+            self._append_timer.start(0)
+
+    def _complete(self):
+        self._finish()
+        self.loaded.emit(self.encoding or "utf-8")
+
+    def _on_failed(self, message):
+        if self._done:
+            return
+        self._finish()
+        self.failed.emit(message)
+
+    def _finish(self):
+        self._done = True
+        self._append_timer.stop()
+        self._pending.clear()
+        self._thread.requestInterruption()
+        self.editor.end_document_stream()
+        if self.banner is not None:
+            self.editor.set_top_banner(None)
+            self.banner.deleteLater()
+            self.banner = None
+        self._release()
+
+    def _on_thread_finished(self):
+        self._release()
+
+    def _release(self):
+        if self._done and self._thread.isFinished():
+            self._thread.deleteLater()
+            _active_loaders.discard(self)
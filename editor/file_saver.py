@@ -0,0 +1,177 @@
+"""
+Background save pipeline for editor tabs.
+
+The GUI thread only snapshots the document text. Encoding, hashing and writing run on
+one worker thread, in submission order. A file is only rewritten when its content
+actually changed, and always through a temp file plus `os.replace`, so a crash or a
+dropped network share never leaves a half-written file behind.
+"""
+import hashlib
+import itertools
+import os
+import queue
+import uuid
+
+from PySide2.QtCore import QThread, Signal
+
+
+def content_hash(data):
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+
+def encode_text(text, encoding):
+    """
+    Encode editor text for disk with the platform's newlines, like text-mode `open()`.
+
+    Falls back to UTF-8 when the text no longer fits `encoding`.
+    Returns (data, encoding actually used).
+    """
+    if os.linesep != "\n":
+        text = text.replace("\n", os.linesep)
+    try:
+        return text.encode(encoding or "utf-8"), encoding or "utf-8"
+    except (LookupError, UnicodeEncodeError):
+        return text.encode("utf-8"), "utf-8"
+
+
+def atomic_write(file_path, data):
+    """
+    Write `data` to a temp file next to `file_path`, then swap it into place.
+
+    A symlink is followed, so the file it points to is replaced, not the link. The
+    permissions and, where the platform allows, the owner of the old file are kept.
+    """
+    file_path = os.path.realpath(file_path)
+    directory, name = os.path.split(file_path)
+    tmp_path = os.path.join(directory, f".{name}.{uuid.uuid4().hex[:8]}.tmp")
+    try:
+        existing = os.stat(file_path)
+    except OSError:
+        existing = None
+    mode = existing.st_mode & 0o7777 if existing else 0o666
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0), mode)
+    try:
+        with os.fdopen(fd, "wb") as file:
+            if existing:
+                # The umask applies to the mode given to os.open; set the exact bits again.
+                if hasattr(os, "fchmod"):
+                    os.fchmod(file.fileno(), mode)
+                if hasattr(os, "fchown"):
+                    try:
+                        os.fchown(file.fileno(), existing.st_uid, existing.st_gid)
+                    except OSError:
+                        # Only root may give a file away; keep at least the group if allowed.
+                        try:
+                            os.fchown(file.fileno(), -1, existing.st_gid)
+                        except OSError:
+                            pass
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        if existing and not hasattr(os, "fchmod"):
+            os.chmod(tmp_path, mode)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class FileSaveThread(QThread):
+    """
+    Worker that writes queued save jobs one at a time.
+
+    `saved(job_id, path, encoding, written, error)` is emitted for every job; `written`
+    is False when the file already had the same content, `error` is empty on success.
+    """
+    saved = Signal(int, str, str, bool, str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._jobs = queue.Queue()
+        self._job_ids = itertools.count(1)
+        # path -> (mtime_ns, size, hash) of what is known to be on disk.
+        self._disk_hashes = {}
+
+    def submit(self, file_path, text, encoding="utf-8"):
+        """Queue `text` to be saved to `file_path` and return the job id."""
+        job_id = next(self._job_ids)
+        self._jobs.put((job_id, os.path.normpath(file_path), text, encoding))
+        if not self.isRunning():
+            self.start()
+        return job_id
+
+    def save_now(self, file_path, text, encoding="utf-8"):
+        """
+        Save on the calling thread once earlier jobs have finished.
+
+        Used when the caller cannot continue until the file is on disk, e.g. before
+        closing a tab. Returns (job_id, encoding, written, error).
+        """
+        self._jobs.join()
+        job_id = next(self._job_ids)
+        result = self._save(os.path.normpath(file_path), text, encoding)
+        self.saved.emit(job_id, file_path, *result)
+        return (job_id,) + result
+
+    def wait_for_jobs(self):
+        self._jobs.join()
+
+    def stop(self):
+        """Finish the queued jobs, then end the thread; a later `submit` starts it again."""
+        if self.isRunning():
+            self._jobs.put(None)
+            self.wait()
+
+    def run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                self._jobs.task_done()
+                return
+            job_id, file_path, text, encoding = job
+            try:
+                result = self._save(file_path, text, encoding)
+                self.saved.emit(job_id, file_path, *result)
+            finally:
+                self._jobs.task_done()
+
+    def _disk_hash(self, file_path):
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        cached = self._disk_hashes.get(file_path)
+        if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+        with open(file_path, "rb") as file:
+            digest = content_hash(file.read())
+        self._disk_hashes[file_path] = (stat.st_mtime_ns, stat.st_size, digest)
+        return digest
+
+    def _save(self, file_path, text, encoding):
+        try:
+            data, encoding = encode_text(text, encoding)
+            digest = content_hash(data)
+            if self._disk_hash(file_path) == digest:
+                return encoding, False, ""
+            atomic_write(file_path, data)
+            stat = os.stat(file_path)
+            self._disk_hashes[file_path] = (stat.st_mtime_ns, stat.st_size, digest)
+            return encoding, True, ""
+        except Exception as e:
+            self._disk_hashes.pop(file_path, None)
+            return encoding, False, str(e) or e.__class__.__name__
+
+
+_save_thread = None
+
+
+def save_thread():
+    """The process-wide save worker, shared by every editor window."""
+    global _save_thread
+    if _save_thread is None:
+        _save_thread = FileSaveThread()
+    return _save_thread
@@ -0,0 +1,135 @@
+from bisect import bisect_right
+
+FOLDABLE_KEYWORDS = ('def ', 'class ', 'if ', 'elif ', 'else:', 'for ', 'while ', 'try:', 'except', 'with ', 'match ', 'case ')
+
+
+def _scan_line(text):
+    """Return (indent, is_header) for a line; indent is -1 for blank and comment-only lines."""
+    stripped = text.strip()
+    if not stripped or stripped.startswith('#'):
+        return -1, False
+    indent = len(text) - len(text.lstrip())
+    return indent, stripped.endswith(':') and stripped.startswith(FOLDABLE_KEYWORDS)
+
+
+class FoldIndex:
+    """
+    Indentation-based fold regions for a document, kept up to date line by line.
+
+    A region starts at a header line (`def`, `class`, `if`, ... ending in `:`) and runs
+    until the line before the next code line indented at or below the header.
+    Regions nest like a tree. Each end is computed on demand and memoised. An edit
+    only invalidates the regions that enclose it, so lookups stay cheap in large files.
+    """
+
+    def __init__(self):
+        self._indents = []
+        self._headers = []
+        self._ends = []
+        self._hidden_starts = []
+        self._hidden_ends = []
+        self._hidden_dirty = True
+        self._folded = ()
+
+    def __len__(self):
+        return len(self._indents)
+
+    def rebuild(self, lines):
+        scanned = [_scan_line(text) for text in lines]
+        self._indents = [indent for indent, _header in scanned]
+        self._headers = [header for _indent, header in scanned]
+        self._ends = [None] * len(scanned)
+        self._hidden_dirty = True
+
+    def update_lines(self, first, old_count, lines):
+        """
+        Replace `old_count` lines starting at `first` with `lines`.
+
+        Returns False when the replaced lines scan exactly as before. Qt also reports
+        format-only changes from the highlighter, and those can be ignored.
+        """
+        scanned = [_scan_line(text) for text in lines]
+        stop = first + old_count
+        if len(scanned) == old_count and scanned == list(zip(self._indents[first:stop], self._headers[first:stop])):
+            return False
+
+        self._indents[first:stop] = [indent for indent, _header in scanned]
+        self._headers[first:stop] = [header for _indent, header in scanned]
+        self._ends[first:stop] = [None] * len(scanned)
+
+        delta = len(scanned) - old_count
+        if delta:
+            # Regions after the edit are unchanged, only shifted.
+            after = first + len(scanned)
+            ends = self._ends
+            for line in range(after, len(ends)):
+                if ends[line] is not None:
+                    ends[line] += delta
+
+        # Walk back through the enclosing headers; their regions may now end elsewhere.
+        floor = None
+        indents = self._indents
+        for line in range(first - 1, -1, -1):
+            indent = indents[line]
+            if indent < 0:
+                continue
+            if floor is None or indent < floor:
+                self._ends[line] = None
+                floor = indent
+                if floor == 0:
+                    break
+        self._hidden_dirty = True
+        return True
+
+    def is_header(self, line):
+        return 0 <= line < len(self._headers) and self._headers[line]
+
+    def fold_end(self, line):
+        """Last line of the region starting at `line` (`line` itself if it is not a header)."""
+        if not self.is_header(line):
+            return line
+        end = self._ends[line]
+        if end is None:
+            indents = self._indents
+            start_indent = indents[line]
+            end = len(indents) - 1
+            for current in range(line + 1, len(indents)):
+                indent = indents[current]
+                if 0 <= indent <= start_indent:
+                    end = current - 1
+                    break
+            self._ends[line] = end
+        return end
+
+    def is_foldable(self, line):
+        return self.fold_end(line) > line
+
+    def set_folded(self, folded_lines):
+        folded = tuple(sorted(folded_lines))
+        if folded != self._folded:
+            self._folded = folded
+            self._hidden_dirty = True
+
+    def _refresh_hidden(self):
+        # Merge the folded regions into disjoint hidden intervals for bisect lookups.
+        starts = []
+        ends = []
+        for line in self._folded:
+            end = self.fold_end(line)
+            if end <= line:
+                continue
+            if ends and line <= ends[-1]:
+                ends[-1] = max(ends[-1], end)
+                continue
+            starts.append(line + 1)
+            ends.append(end)
+        self._hidden_starts = starts
+        self._hidden_ends = ends
+        self._hidden_dirty = False
+
+    def is_hidden(self, line):
+        """True if `line` lies inside a folded region."""
+        if self._hidden_dirty:
+            self._refresh_hidden()
+        slot = bisect_right(self._hidden_starts, line) - 1
+        return slot >= 0 and line <= self._hidden_ends[slot]
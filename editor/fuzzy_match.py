@@ -0,0 +1,379 @@
+"""
+Fuzzy matching of a typed prefix against completion candidates.
+
+A candidate matches as a prefix, a substring or a subsequence of its characters, with
+bonuses for hitting word boundaries (CamelCase humps, `_`, `.`, digit runs). The
+lowercase form and boundary bitmap of every name are computed once and shared, and
+`IncrementalMatcher` keeps the survivors of the previous keystroke, so typing one more
+character only re-scores the names that still matched.
+
+`TypoIndex` covers the names that do not match at all because of a typo: bigram
+postings narrow the universe to a few names, which are then aligned against the
+typed pattern with a bounded edit distance.
+"""
+
+from collections import Counter
+
+_SEPARATORS = frozenset("._-/\\ :")
+# Per-name (lowercase, boundary bitmap); names come from fixed APIs and the open documents.
+_PREPARED = {}
+_PREPARED_LIMIT = 200000
+# Bigrams are taken over the name with this prefix, so the first letter gets a gram of its own.
+_GRAM_PAD = "\x00"
+# Characters of each name indexed for typo lookups.
+_HEAD = 32
+
+
+def boundary_mask(text):
+    """Bitmap with bit `i` set when `text[i]` starts a word."""
+    mask = 1
+    length = len(text)
+    for i in range(1, length):
+        prev = text[i - 1]
+        cur = text[i]
+        if prev in _SEPARATORS:
+            mask |= 1 << i
+        elif cur.isupper() and (prev.islower() or (i + 1 < length and text[i + 1].islower())):
+            # Capitals that start a word are boundaries, including QWidget (W + next lowercase).
+            mask |= 1 << i
+        elif prev.isdigit() and cur.isalpha():
+            mask |= 1 << i
+        elif prev.isalpha() and cur.isdigit():
+            mask |= 1 << i
+    return mask
+
+
+def prepare(text):
+    """Return (lowercase, boundary bitmap) for `text`, computed once per distinct name."""
+    prepared = _PREPARED.get(text)
+    if prepared is None:
+        if len(_PREPARED) >= _PREPARED_LIMIT:
+            _PREPARED.clear()
+        prepared = _PREPARED[text] = (text.lower(), boundary_mask(text))
+    return prepared
+
+
+def match_score(pattern, text):
+    """
+    Score `text` against `pattern`; returns (matched indices, score), score 0 if no match.
+
+    Prefix matches score 1000, substrings 850 minus their offset and subsequences
+    about 700, raised towards 930 when every typed character lands on a boundary.
+    """
+    pattern = (pattern or "").strip()
+    text = (text or "").strip()
+    if not text:
+        return (), 0.0
+    if not pattern:
+        # Attribute completion right after a dot (e.g. `nuke.`): everything matches.
+        return (), 450.0
+    lower, boundaries = prepare(text)
+    return _score(pattern, pattern.lower(), text, lower, boundaries)
+
+
+def _score(pattern, p, text, lower, boundaries):
+    # Keep auto-popup noise low: for 1-char patterns, only allow prefix matches.
+    if lower.startswith(p):
+        return tuple(range(min(len(pattern), len(text)))), 1000.0
+    if len(p) < 2:
+        return (), 0.0
+
+    start = lower.find(p)
+    if start >= 0:
+        end = min(len(text), start + len(pattern))
+        # Earlier substring matches rank higher.
+        return tuple(range(start, end)), 850.0 - float(start * 2)
+
+    out = []
+    pos = 0
+    find = lower.find
+    for ch in p:
+        idx = find(ch, pos)
+        if idx < 0:
+            return (), 0.0
+        out.append(idx)
+        pos = idx + 1
+
+    span = out[-1] - out[0] + 1
+    gaps = span - len(p)
+    score = 700.0 - float(out[0] * 2 + gaps * 6)
+
+    boundary_hits = 0
+    for idx in out:
+        if boundaries >> idx & 1:
+            boundary_hits += 1
+    has_upper = p != pattern
+    if has_upper:
+        case_hits = sum(1 for pch, idx in zip(pattern, out) if pch.isupper() and text[idx].isupper())
+        score += case_hits * 30.0 + 60.0
+    score += boundary_hits * 40.0
+    if boundaries >> out[0] & 1:
+        score += 60.0
+
+    # Strong abbreviation match: all chars hit boundaries (e.g. QW -> QWidget, cN -> createNode).
+    if boundary_hits == len(p) and len(p) <= 6:
+        score = max(score, 930.0 - float(out[0] * 2 + gaps * 2))
+
+    return tuple(out), max(1.0, score)
+
+
+def positional_bigrams(lower, limit=None):
+    """(bigram, position) pairs of `lower`, the first pair covering its first letter alone."""
+    padded = _GRAM_PAD + lower[:limit]
+    return [(padded[i:i + 2], i) for i in range(len(padded) - 1)]
+
+
+def prefix_alignment(pattern, text, max_edits):
+    """
+    Edit distance between `pattern` and the closest prefix of `text`.
+
+    Insertions, deletions, substitutions and swaps of adjacent characters count as
+    one edit each; both strings are expected in lowercase. Returns (distance, matched
+    indices in `text`), with a distance above `max_edits` when there is no alignment
+    within the budget.
+    """
+    # A shared start costs nothing; align only what follows it.
+    shared = 0
+    for pch, tch in zip(pattern, text):
+        if pch != tch:
+            break
+        shared += 1
+    if shared:
+        distance, indices = prefix_alignment(pattern[shared:], text[shared:], max_edits)
+        return distance, tuple(range(shared)) + tuple(shared + index for index in indices)
+
+    m = len(pattern)
+    t = text[:m + max_edits]
+    n = len(t)
+    rows = [list(range(n + 1))]
+    for i in range(1, m + 1):
+        pch = pattern[i - 1]
+        prev = rows[-1]
+        row = [i] + [0] * n
+        for j in range(1, n + 1):
+            best = prev[j - 1] + (pch != t[j - 1])
+            if prev[j] + 1 < best:
+                best = prev[j] + 1
+            if row[j - 1] + 1 < best:
+                best = row[j - 1] + 1
+            if i > 1 and j > 1 and pch == t[j - 2] and pattern[i - 2] == t[j - 1] and rows[-2][j - 2] + 1 < best:
+                best = rows[-2][j - 2] + 1
+            row[j] = best
+        if min(row) > max_edits:
+            return max_edits + 1, ()
+        rows.append(row)
+
+    last = rows[m]
+    end = min(range(n + 1), key=lambda j: (last[j], abs(j - m)))
+    distance = last[end]
+    if distance > max_edits:
+        return distance, ()
+
+    indices = []
+    i, j = m, end
+    while i > 0 and j > 0:
+        here = rows[i][j]
+        if pattern[i - 1] == t[j - 1] and here == rows[i - 1][j - 1]:
+            indices.append(j - 1)
+            i, j = i - 1, j - 1
+        elif (i > 1 and j > 1 and pattern[i - 1] == t[j - 2] and pattern[i - 2] == t[j - 1]
+              and here == rows[i - 2][j - 2] + 1):
+            indices.extend((j - 1, j - 2))
+            i, j = i - 2, j - 2
+        elif here == rows[i - 1][j - 1] + 1:
+            i, j = i - 1, j - 1
+        elif here == rows[i - 1][j] + 1:
+            i -= 1
+        else:
+            j -= 1
+    return distance, tuple(sorted(indices))
+
+
+class TypoIndex:
+    """
+    Positional bigram postings over a set of names, for patterns typed with a typo.
+
+    Aligning the pattern with a name's start in `k` edits shifts each character by at
+    most `k` places, and each edit breaks at most three of the pattern's bigrams. So
+    only names sharing enough bigrams at nearby positions (and starting with one of the
+    first two typed letters) are aligned with `prefix_alignment`. Names can be added
+    and discarded as the universe changes.
+    """
+
+    def __init__(self, names=()):
+        # (bigram, position) -> names; only the first `_HEAD` characters are indexed.
+        self._postings = {}
+        self._lower = {}
+        self.add(names)
+
+    def __len__(self):
+        return len(self._lower)
+
+    def add(self, names):
+        postings = self._postings
+        for name in names:
+            if name in self._lower:
+                continue
+            lower = name.strip().lower()
+            self._lower[name] = lower
+            for key in positional_bigrams(lower, _HEAD):
+                bucket = postings.get(key)
+                if bucket is None:
+                    postings[key] = {name}
+                else:
+                    bucket.add(name)
+
+    def discard(self, names):
+        postings = self._postings
+        for name in names:
+            lower = self._lower.pop(name, None)
+            if lower is None:
+                continue
+            for key in positional_bigrams(lower, _HEAD):
+                bucket = postings.get(key)
+                if bucket is not None:
+                    bucket.discard(name)
+                    if not bucket:
+                        del postings[key]
+
+    def search(self, pattern, limit=30, max_edits=None):
+        """
+        Names whose start is within `max_edits` edits of `pattern`.
+
+        `max_edits` defaults to 1, or 2 from eight typed characters on. Returns up to
+        `limit` (name, matched indices, distance) tuples, closest first.
+        """
+        p = (pattern or "").strip().lower()[:_HEAD - 2]
+        if not p:
+            return []
+        if max_edits is None:
+            max_edits = 1 if len(p) < 8 else 2
+        grams = positional_bigrams(p)
+        # An edit breaks at most three bigrams (two, or three for a swap of neighbours).
+        needed = max(1, len(grams) - 3 * max_edits)
+
+        postings = self._postings
+        counts = Counter()
+        for gram, position in grams:
+            near = set()
+            for shift in range(max(0, position - max_edits), position + max_edits + 1):
+                bucket = postings.get((gram, shift))
+                if bucket:
+                    near.update(bucket)
+            counts.update(near)
+        if len(p) > 1 and p[0] != p[1]:
+            # Swapping the first two letters of a short pattern can break every bigram
+            # it shares with the name, so names with the swapped start always qualify.
+            first = postings.get((_GRAM_PAD + p[1], 0))
+            second = postings.get((p[1] + p[0], 1))
+            if first and second:
+                for name in (first & second if len(first) < len(second) else second & first):
+                    if counts[name] < needed:
+                        counts[name] = needed
+
+        # Names sharing the same start align the same way; align each start once.
+        window = len(p) + max_edits
+        alignments = {}
+        found = []
+        # Like most editors, trust the first typed letter; a swap of the first two is allowed.
+        starts = p[:2]
+        lowers = self._lower
+        for name, count in counts.items():
+            if count < needed:
+                continue
+            head = lowers[name][:window]
+            if head[:1] not in starts:
+                continue
+            alignment = alignments.get(head)
+            if alignment is None:
+                alignment = alignments[head] = prefix_alignment(p, head, max_edits)
+            distance, indices = alignment
+            if distance <= max_edits:
+                found.append((distance, len(name), name.lower(), name, indices))
+        found.sort()
+        return [(name, indices, distance) for distance, _length, _key, name, indices in found[:limit]]
+
+
+class IncrementalMatcher:
+    """
+    Matches one candidate universe keystroke by keystroke.
+
+    While the typed pattern only grows, a name that failed to match cannot match again,
+    so only the previous survivors are re-scored. One-character patterns are the
+    exception: they only accept prefix matches, while longer ones also accept
+    substrings and subsequences. Changes to the universe are applied as a diff, so
+    a newly typed local name does not force a full rescan either; the same diff keeps
+    the typo index used by `approximate()` current.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._pattern = None
+        self._candidates = None
+        self._universe = frozenset()
+        self._survivors = []
+        self._typos = None
+
+    def match(self, pattern, candidates):
+        """
+        Return [(text, matched indices, score)] for every candidate matching `pattern`.
+
+        `candidates` is a sequence of unique names; passing the same object again
+        skips the universe diff.
+        """
+        pattern = (pattern or "").strip()
+        p = pattern.lower()
+        previous = self._pattern
+        narrowing = previous is not None and p.startswith(previous) and (len(previous) >= 2 or not previous)
+
+        if candidates is self._candidates:
+            added = ()
+            removed = None
+        else:
+            universe = frozenset(candidates)
+            added = [text for text in candidates if text not in self._universe]
+            removed = self._universe - universe
+            self._universe = universe
+            self._candidates = candidates
+            if self._typos is not None:
+                self._typos.discard(removed)
+                self._typos.add(added)
+
+        if narrowing:
+            pool = self._survivors
+            if removed:
+                pool = [text for text in pool if text not in removed]
+            if added:
+                pool = pool + added
+        else:
+            pool = candidates
+
+        results = []
+        if not pattern:
+            results = [(text, (), 450.0) for text in pool if text.strip()]
+        else:
+            for text in pool:
+                stripped = text.strip()
+                if not stripped:
+                    continue
+                lower, boundaries = prepare(stripped)
+                indices, score = _score(pattern, p, stripped, lower, boundaries)
+                if score > 0:
+                    results.append((text, indices, score))
+
+        self._pattern = p
+        self._survivors = [text for text, _indices, _score in results]
+        return results
+
+    def approximate(self, pattern, limit=30):
+        """
+        Typo-tolerant lookup in the universe of the last `match()` call.
+
+        Returns up to `limit` (text, matched indices, edit distance) tuples, closest
+        first. The bigram index is built on first use and then kept up to date.
+        """
+        if self._typos is None:
+            self._typos = TypoIndex(self._universe)
+        return self._typos.search(pattern, limit=limit)
@@ -1,4 +1,3 @@
-import inspect
 import re
 from PySide2.QtGui import QColor, QPainter, QTextCursor, QFont
 from PySide2.QtWidgets import QPlainTextEdit
@@ -13,7 +12,78 @@ except ImportError:
     nuke = None
 
 importlib.reload(editor.core)
-from editor.core import CodeEditorSettings, PathFromOS
+from editor.core import PathFromOS, get_settings
+from editor import introspection
+
+# Accepted ghost suggestions per name, shared by every editor like the indexes below.
+_usage_count = {}
+
+
+class SuggestionIndex:
+    """
+    Prefix trie over suggestion names for ghost-text lookups.
+
+    Every node keeps the two best-ranked names below it (priority, then usage count,
+    then name), so a lookup only walks the typed prefix. Usage counts only grow, so
+    bumping a name just re-offers it along its own path.
+    """
+
+    def __init__(self, completions, priority, usage_count):
+        self.completions = completions
+        self._priority = priority
+        self._usage_count = usage_count
+        self._root = [{}, []]
+        for name in completions:
+            self.bump(name)
+
+    def __contains__(self, name):
+        return name in self.completions
+
+    def _rank(self, name):
+        return -self._priority.get(name, 0), -self._usage_count.get(name, 0), name
+
+    def bump(self, name):
+        """Insert `name`, or re-rank it after its usage count changed."""
+        node = self._root
+        self._offer(node, name)
+        for char in name:
+            children = node[0]
+            child = children.get(char)
+            if child is None:
+                child = children[char] = [{}, []]
+            node = child
+            self._offer(node, name)
+
+    def _offer(self, node, name):
+        top = node[1]
+        if name in top:
+            top.remove(name)
+        top.append(name)
+        if len(top) > 1:
+            top.sort(key=self._rank)
+            del top[2:]
+
+    def lookup(self, prefix):
+        """Return up to two best-ranked names starting with `prefix`."""
+        node = self._root
+        for char in prefix:
+            node = node[0].get(char)
+            if node is None:
+                return []
+        return node[1]
+
+
+def shared_suggestion_index(completions, priority):
+    """
+    Prefix index over the shared `completions` dict, built once per process.
+
+    The index keeps `completions` alive, so its id cannot be reused while the cache
+    entry exists.
+    """
+    return introspection.cached(
+        ("suggestion_index", id(completions)),
+        lambda: SuggestionIndex(completions, priority, _usage_count),
+    )
 
 
 class InlineGhosting(QPlainTextEdit):
@@ -29,7 +99,8 @@ class InlineGhosting(QPlainTextEdit):
         super().__init__(*args, **kwargs)
 
         self.suggestions, self.nuke_suggestions, self.nukescripts_suggestions, self.suggestion_priority = self.load_suggestions_from_modules()
-        self.usage_count = {key: 0 for key in self.suggestions}  
+        self.usage_count = _usage_count
+        self._suggestion_indexes = {}
         self.ghost_text = ""
         self.current_suggestion = None
         self.accepting_suggestion = False
@@ -144,34 +215,12 @@ class InlineGhosting(QPlainTextEdit):
         """
         Loads function suggestions from the `nuke` and `nukescripts` modules.
 
+        The introspection runs once per process and is shared by every editor.
+
         Returns:
             tuple: Suggestions, Nuke-only suggestions, nukescripts-only suggestions, and priority map.
         """
-        suggestions = {}
-        nuke_suggestions = {}
-        nukescripts_suggestions = {}
-        suggestion_priority = {}
-
-        if nuke:
-            for attr in dir(nuke):
-                if not attr.startswith("_"):
-                    completion_text = self.get_completion_text(nuke, attr)
-                    suggestions[attr] = completion_text
-                    nuke_suggestions[attr] = completion_text
-                    suggestion_priority[attr] = 2
-
-        try:
-            import nukescripts
-            for attr in dir(nukescripts):
-                if not attr.startswith("_"):
-                    completion_text = self.get_completion_text(nukescripts, attr)
-                    suggestions[attr] = completion_text
-                    nukescripts_suggestions[attr] = completion_text
-                    suggestion_priority.setdefault(attr, 1)
-        except ImportError:
-            pass
-
-        return suggestions, nuke_suggestions, nukescripts_suggestions, suggestion_priority
+        return introspection.ghosting_suggestions()
 
     def get_prefix_and_context(self):
         cursor = self.textCursor()
@@ -199,22 +248,19 @@ class InlineGhosting(QPlainTextEdit):
         prefix_len = max(0, cursor.position() - word_cursor.selectionStart())
         return word[:prefix_len], None
 
-    def get_sorted_suggestions(self, module_context):
-        if module_context == "nuke":
-            candidates = self.nuke_suggestions.items()
-        elif module_context == "nukescripts":
-            candidates = self.nukescripts_suggestions.items()
-        else:
-            candidates = self.suggestions.items()
-
-        return sorted(
-            candidates,
-            key=lambda item: (
-                -self.suggestion_priority.get(item[0], 0),
-                -self.usage_count.get(item[0], 0),
-                item[0],
-            ),
-        )
+    def get_suggestion_index(self, module_context):
+        """Shared prefix index for `module_context`, built on the first lookup of any editor."""
+        index = self._suggestion_indexes.get(module_context)
+        if index is None:
+            if module_context == "nuke":
+                completions = self.nuke_suggestions
+            elif module_context == "nukescripts":
+                completions = self.nukescripts_suggestions
+            else:
+                completions = self.suggestions
+            index = shared_suggestion_index(completions, self.suggestion_priority)
+            self._suggestion_indexes[module_context] = index
+        return index
 
     def get_completion_text(self, module, attr):
         """
@@ -227,32 +273,19 @@ class InlineGhosting(QPlainTextEdit):
         Returns:
             str: Completion text based on the function's signature or docstring.
         """
-        item = getattr(module, attr)
-        if inspect.isfunction(item) or inspect.ismethod(item):
-            try:
-                params = inspect.signature(item).parameters
-                param_list = ", ".join(param.name for param in params.values())
-                return f"{attr}({param_list})"
-            except (ValueError, TypeError):
-                
-                docstring = getattr(item, "__doc__", "")
-                if docstring:
-                    first_line = docstring.splitlines()[0]
-                    return f"{attr}({first_line})"
-                else:
-                    return f"{attr}()"
-        elif isinstance(item, str):
-            return f"{attr}('')"
-        elif isinstance(item, (int, float)):
-            return f"{attr}"
-        else:
-            return f"{attr}()"
+        return introspection.completion_text(module, attr)
 
     def update_ghost_text(self):
         """
         Updates the ghost text based on the current word under the cursor.
         """
-        if not CodeEditorSettings().ENABLE_INLINE_GHOSTING:
+        if not get_settings().ENABLE_INLINE_GHOSTING:
+            self.clear_ghost_text()
+            return
+
+        # Large-file mode turns suggestions off; the string/comment scan alone walks
+        # up to 200 blocks per keystroke.
+        if getattr(self, "large_file_mode", False):
             self.clear_ghost_text()
             return
 
@@ -269,8 +302,14 @@ class InlineGhosting(QPlainTextEdit):
             self.clear_ghost_text()
             return
 
-        sorted_suggestions = self.get_sorted_suggestions(module_context)
-        suggestion = self.find_suggestion(prefix, sorted_suggestions)
+        suggestion = None
+        index = self.get_suggestion_index(module_context)
+        for name in index.lookup(prefix):
+            completion_text = index.completions[name]
+            if name == prefix and completion_text == name:
+                continue
+            suggestion = name, completion_text
+            break
         if suggestion:
             suggestion_key, completion_text = suggestion
             self.current_suggestion = suggestion_key
@@ -283,24 +322,6 @@ class InlineGhosting(QPlainTextEdit):
 
         self.viewport().update()
 
-    def find_suggestion(self, prefix, sorted_suggestions):
-        """
-        Finds a relevant suggestion based on the typed word, including partial matches.
-
-        Args:
-            word (str): The current word under the cursor.
-            sorted_suggestions (dict): Dictionary of sorted suggestions.
-
-        Returns:
-            str: The completion text for the suggestion.
-        """
-        for suggestion, completion_text in sorted_suggestions:
-            if suggestion.startswith(prefix):
-                if suggestion == prefix and completion_text == suggestion:
-                    continue
-                return suggestion, completion_text
-        return ""
-
     def accept_ghost_text(self, cursor=None):
         if not self.ghost_text:
             return False
@@ -310,6 +331,9 @@ class InlineGhosting(QPlainTextEdit):
         cursor.insertText(self.ghost_text)
         if self.current_suggestion:
             self.usage_count[self.current_suggestion] = self.usage_count.get(self.current_suggestion, 0) + 1
+            for index in self._suggestion_indexes.values():
+                if self.current_suggestion in index:
+                    index.bump(self.current_suggestion)
         self.ghost_text = ""
         self.current_suggestion = None
         self.accepting_suggestion = False
@@ -357,7 +381,7 @@ class InlineGhosting(QPlainTextEdit):
         super().paintEvent(event)
         if self.ghost_text:
             painter = QPainter(self.viewport())
-            painter.setPen(CodeEditorSettings().GHOSTING_COLOR)
+            painter.setPen(get_settings().GHOSTING_COLOR)
 
             cursor_rect = self.cursorRect(self.textCursor())
             x_offset, y_offset = cursor_rect.x(), cursor_rect.y() + self.fontMetrics().ascent()
@@ -0,0 +1,392 @@
+"""
+Process-wide introspection cache shared by every editor tab, the completer and the outliner.
+
+Entries are built lazily on first use and keyed by module name and version, so a new
+tab reuses the `dir()`/`inspect.signature` work done by the first one.
+"""
+import ast
+import builtins
+import inspect
+import json
+import keyword
+import os
+import platform
+import threading
+import types
+
+from editor.core import PathFromOS
+
+try:
+    import nuke
+except ImportError:
+    nuke = None
+
+_lock = threading.RLock()
+_entries = {}
+# completion_index_key() as a sorted tuple; the versions it reads are fixed per process.
+_index_key = None
+# Bumped by clear(), so holders of derived values can tell the cache was rebuilt.
+_generation = 0
+
+
+def cached(key, build):
+    """Return the cached value for `key`, calling `build()` once to create it."""
+    try:
+        return _entries[key]
+    except KeyError:
+        pass
+    with _lock:
+        if key not in _entries:
+            _entries[key] = build()
+        return _entries[key]
+
+
+def clear():
+    global _index_key, _generation
+    with _lock:
+        _entries.clear()
+        _index_key = None
+        _generation += 1
+
+
+def generation():
+    """Counter that changes whenever the cached values are dropped."""
+    return _generation
+
+
+def module_version(module):
+    """Best-effort version string for `module`, falling back to its file mtime."""
+    if module is None:
+        return None
+    for attr in ("NUKE_VERSION_STRING", "__version__"):
+        version = getattr(module, attr, None)
+        if isinstance(version, str) and version:
+            return version
+    try:
+        return str(os.path.getmtime(module.__file__))
+    except (AttributeError, TypeError, OSError):
+        return None
+
+
+def _module_key(kind, module):
+    return kind, getattr(module, "__name__", None), module_version(module)
+
+
+def public_names(module):
+    """Names from `dir(module)` that do not start with an underscore."""
+    if module is None:
+        return ()
+
+    def build():
+        try:
+            return tuple(name for name in dir(module) if not name.startswith("_"))
+        except Exception:
+            return ()
+
+    return cached(_module_key("public_names", module), build)
+
+
+def completion_text(module, attr):
+    """
+    Retrieves the completion text for a given attribute in a module.
+
+    Args:
+        module: The module to inspect.
+        attr: The attribute name.
+
+    Returns:
+        str: Completion text based on the function's signature or docstring.
+    """
+    item = getattr(module, attr)
+    if inspect.isfunction(item) or inspect.ismethod(item):
+        try:
+            params = inspect.signature(item).parameters
+            param_list = ", ".join(param.name for param in params.values())
+            return f"{attr}({param_list})"
+        except (ValueError, TypeError):
+            docstring = getattr(item, "__doc__", "")
+            if docstring:
+                first_line = docstring.splitlines()[0]
+                return f"{attr}({first_line})"
+            else:
+                return f"{attr}()"
+    elif isinstance(item, str):
+        return f"{attr}('')"
+    elif isinstance(item, (int, float)):
+        return f"{attr}"
+    else:
+        return f"{attr}()"
+
+
+def module_completions(module):
+    """Map of public attribute name to ghost-text completion for `module`."""
+    if module is None:
+        return {}
+    return cached(
+        _module_key("completions", module),
+        lambda: {attr: completion_text(module, attr) for attr in public_names(module)},
+    )
+
+
+def ghosting_suggestions():
+    """
+    Suggestions for InlineGhosting built from `nuke` and `nukescripts`.
+
+    Returns:
+        tuple: Suggestions, Nuke-only suggestions, nukescripts-only suggestions, and priority map.
+        The dictionaries are shared between editors and must not be modified.
+    """
+    try:
+        import nukescripts
+    except ImportError:
+        nukescripts = None
+
+    def build():
+        suggestions = {}
+        suggestion_priority = {}
+        nuke_suggestions = module_completions(nuke)
+        nukescripts_suggestions = module_completions(nukescripts)
+        for attr, text in nuke_suggestions.items():
+            suggestions[attr] = text
+            suggestion_priority[attr] = 2
+        for attr, text in nukescripts_suggestions.items():
+            suggestions[attr] = text
+            suggestion_priority.setdefault(attr, 1)
+        return suggestions, nuke_suggestions, nukescripts_suggestions, suggestion_priority
+
+    key = ("ghosting", module_version(nuke), module_version(nukescripts))
+    return cached(key, build)
+
+
+COMPLETION_INDEX_FORMAT = 1
+COMPLETION_INDEX_FILE = "completion_index.json"
+
+
+def _nuke_version():
+    try:
+        return nuke.env['NukeVersionString']
+    except Exception:
+        return module_version(nuke)
+
+
+def _pyside_modules():
+    try:
+        from PySide2 import QtCore, QtGui, QtWidgets
+    except ImportError:
+        return ()
+    return QtCore, QtGui, QtWidgets
+
+
+def completion_index_key():
+    """Identifies the environment a stored completion index was built for."""
+    try:
+        import PySide2
+        pyside_version = PySide2.__version__
+    except (ImportError, AttributeError):
+        pyside_version = None
+    return {
+        "format": COMPLETION_INDEX_FORMAT,
+        "nuke": _nuke_version(),
+        "pyside2": pyside_version,
+        "python": platform.python_version(),
+    }
+
+
+def describe(obj, fallback):
+    """One-line info for a completion: signature for callables, else the first docstring line."""
+    if obj is None:
+        return fallback
+    try:
+        if callable(obj):
+            try:
+                return f"{fallback}{inspect.signature(obj)}"
+            except Exception:
+                pass
+        doc = getattr(obj, "__doc__", None)
+        if doc:
+            first = doc.strip().splitlines()[0].strip()
+            if first:
+                return first
+    except Exception:
+        pass
+    return fallback
+
+
+def _module_section(module, prefix):
+    section = {}
+    for name in public_names(module):
+        try:
+            obj = getattr(module, name)
+        except Exception:
+            continue
+        kind = "function" if callable(obj) else "object"
+        section[name] = [kind, describe(obj, f"{prefix}.{name}")]
+    return section
+
+
+def _pyside_section():
+    section = {}
+    for mod in _pyside_modules():
+        for name in public_names(mod):
+            if name in section:
+                continue
+            obj = getattr(mod, name, None)
+            if isinstance(obj, type):
+                kind = "class"
+            elif callable(obj):
+                kind = "function"
+            else:
+                kind = "object"
+            section[name] = [kind, name]
+    return section
+
+
+def _builtins_section():
+    section = {}
+    for name in dir(builtins):
+        obj = getattr(builtins, name, None)
+        section[name] = ["function" if callable(obj) else "object", describe(obj, f"builtins.{name}")]
+    return section
+
+
+def build_completion_index():
+    try:
+        import nukescripts
+    except ImportError:
+        nukescripts = None
+    return {
+        "nuke": _module_section(nuke, "nuke") if nuke else {},
+        "nukescripts": _module_section(nukescripts, "nukescripts") if nukescripts else {},
+        "pyside2": _pyside_section(),
+        "builtins": _builtins_section(),
+        "types": dir(types),
+    }
+
+
+def _completion_index_path():
+    return os.path.join(PathFromOS().json_dynamic_path, COMPLETION_INDEX_FILE)
+
+
+def _load_or_build_completion_index(key):
+    try:
+        path = _completion_index_path()
+    except Exception:
+        path = None
+
+    if path and os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("key") == key:
+                return data["sections"]
+        except Exception:
+            pass
+
+    sections = build_completion_index()
+    if path:
+        try:
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"key": key, "sections": sections}, f, separators=(",", ":"))
+            os.replace(tmp_path, path)
+        except Exception:
+            pass
+    return sections
+
+
+def completion_index():
+    """
+    Names, kinds and one-line info for nuke, nukescripts, PySide2 and builtins.
+
+    Stored as compact JSON under `PathFromOS().json_dynamic_path`, keyed by the Nuke,
+    PySide2 and Python versions, and loaded once per process. Each section maps
+    name -> [kind, info]; `types` is a plain name list.
+    """
+    key = _index_cache_key()
+    return cached(("completion_index", key), lambda: _load_or_build_completion_index(dict(key)))
+
+
+def _index_cache_key():
+    """
+    `completion_index_key()` as a hashable tuple, computed once per process.
+
+    It reads `nuke.env`, so the first call has to happen on the GUI thread; the
+    completer's `base_candidates()` call does that before any ranking is queued.
+    """
+    global _index_key
+    key = _index_key
+    if key is None:
+        with _lock:
+            if _index_key is None:
+                _index_key = tuple(sorted(completion_index_key().items()))
+            key = _index_key
+    return key
+
+
+def pyside_index():
+    """Map of PySide2 name to (kind, "pyside2")."""
+    return cached(
+        ("pyside_index", _index_cache_key()),
+        lambda: {name: (entry[0], "pyside2") for name, entry in completion_index()["pyside2"].items()},
+    )
+
+
+def base_candidates():
+    """
+    Context-free completion candidates and their base priorities.
+
+    Returns:
+        tuple: Names in priority order without duplicates, and a name -> priority map.
+        Both are shared and must not be modified.
+    """
+    def build():
+        index = completion_index()
+        ordered = []
+        priority = {}
+        for name in index["nuke"]:
+            ordered.append(name)
+            priority[name] = 20
+        groups = (
+            (index["pyside2"], 12),
+            (index["builtins"], 10),
+            (keyword.kwlist, 5),
+            (index["types"], 1),
+            (("@staticmethod", "@classmethod", "@property", "async def", "await"), 2),
+        )
+        for names, value in groups:
+            for name in names:
+                ordered.append(name)
+                priority.setdefault(name, value)
+        unique = []
+        seen = set()
+        for name in ordered:
+            if name and name not in seen:
+                seen.add(name)
+                unique.append(name)
+        return tuple(unique), priority
+
+    return cached(("base_candidates", _index_cache_key()), build)
+
+
+def file_classes(file_path):
+    """
+    (class name, public method names) pairs defined in a Python file.
+
+    Cached by path and modification time; returns an empty list if the file is missing.
+    """
+    try:
+        mtime = os.path.getmtime(file_path)
+    except OSError:
+        return []
+
+    def build():
+        with open(file_path, 'r') as file:
+            tree = ast.parse(file.read())
+        classes = []
+        for node in ast.walk(tree):
+            if isinstance(node, ast.ClassDef):
+                methods = [n.name for n in node.body if isinstance(n, ast.FunctionDef) and not n.name.startswith('__')]
+                classes.append((node.name, methods))
+        return classes
+
+    return cached(("file_classes", os.path.abspath(file_path), mtime), build)
@@ -0,0 +1,160 @@
+"""
+Compiled keyboard shortcuts shared by the editor, the main window and the settings panel.
+
+Shortcut strings from settings.json and the defaults are parsed once into a
+(key, modifiers) -> command table, so key dispatch is a single dict lookup.
+The keymap is rebuilt only when the "Keyboard" settings change.
+"""
+import re
+
+from PySide2.QtCore import Qt
+from PySide2.QtGui import QKeySequence
+
+from editor.core import DEFAULT_KEYBOARD_SHORTCUTS, get_settings
+
+_MODIFIERS = {
+    "Ctrl": Qt.ControlModifier,
+    "Shift": Qt.ShiftModifier,
+    "Alt": Qt.AltModifier,
+    "Meta": Qt.MetaModifier,
+}
+
+_KEYS = {
+    "Enter": Qt.Key_Return,
+    "Return": Qt.Key_Return,
+    "Up": Qt.Key_Up,
+    "Down": Qt.Key_Down,
+    "Left": Qt.Key_Left,
+    "Right": Qt.Key_Right,
+    "Home": Qt.Key_Home,
+    "End": Qt.Key_End,
+    "Tab": Qt.Key_Tab,
+    "Backspace": Qt.Key_Backspace,
+    "Delete": Qt.Key_Delete,
+    "Del": Qt.Key_Delete,
+    "Escape": Qt.Key_Escape,
+    "Esc": Qt.Key_Escape,
+    "Space": Qt.Key_Space,
+    "/": Qt.Key_Slash,
+    "+": Qt.Key_Plus,
+    "-": Qt.Key_Minus,
+    "*": Qt.Key_Asterisk,
+}
+
+_FUNCTION_KEY = re.compile(r"F(\d{1,2})$")
+
+
+def parse_shortcut(text):
+    """
+    Parse a shortcut string such as "Ctrl+Shift+Enter" or "Ctrl++".
+
+    Returns a (key, modifiers) pair with modifiers as an int, or None if the string
+    is empty or not understood. Only the first chord of a sequence is used.
+    """
+    text = (text or "").split(",")[0].strip()
+    if not text:
+        return None
+    if text.endswith("+") and (len(text) == 1 or text[-2] == "+"):
+        parts = text[:-2].split("+") if len(text) > 1 else []
+        key_name = "+"
+    else:
+        *parts, key_name = text.split("+")
+
+    modifiers = Qt.NoModifier
+    for part in parts:
+        modifier = _MODIFIERS.get(part.strip())
+        if modifier is None:
+            return None
+        modifiers |= modifier
+
+    key_name = key_name.strip()
+    if key_name in _KEYS:
+        key = _KEYS[key_name]
+    elif len(key_name) == 1:
+        key = ord(key_name.upper())
+    else:
+        match = _FUNCTION_KEY.match(key_name)
+        if match:
+            key = Qt.Key_F1 + int(match.group(1)) - 1
+        else:
+            sequence = QKeySequence(key_name)
+            if sequence.isEmpty():
+                return None
+            key = int(sequence[0]) & ~int(Qt.KeyboardModifierMask)
+    return int(key), int(modifiers)
+
+
+def find_conflicts(shortcuts):
+    """
+    Commands bound to the same key.
+
+    Args:
+        shortcuts: Iterable of (command, shortcut string) pairs in priority order.
+
+    Returns:
+        list: (shortcut, first command, conflicting command) tuples.
+    """
+    owners = {}
+    conflicts = []
+    for command, text in shortcuts:
+        binding = parse_shortcut(text)
+        if binding is None:
+            continue
+        if binding in owners:
+            conflicts.append((text, owners[binding], command))
+        else:
+            owners[binding] = command
+    return conflicts
+
+
+class Keymap:
+    """Shortcut strings and compiled bindings for one version of the Keyboard settings."""
+
+    def __init__(self, custom_shortcuts):
+        self.custom_shortcuts = dict(custom_shortcuts)
+        self.shortcuts = dict(DEFAULT_KEYBOARD_SHORTCUTS)
+        self.shortcuts.update(self.custom_shortcuts)
+        self._tables = {}
+
+    def shortcut(self, command):
+        """Shortcut string for `command`, or "" if it has none."""
+        return self.shortcuts.get(command, "")
+
+    def key_sequence(self, command):
+        return QKeySequence(self.shortcut(command))
+
+    def table(self, commands):
+        """
+        (key, modifiers) -> command for `commands`, compiled once per command tuple.
+
+        When two commands share a key, the one listed first wins.
+        """
+        table = self._tables.get(commands)
+        if table is None:
+            table = {}
+            for command in commands:
+                binding = parse_shortcut(self.shortcut(command))
+                if binding is not None:
+                    table.setdefault(binding, command)
+            self._tables[commands] = table
+        return table
+
+    def command_for_event(self, event, commands):
+        """The command in `commands` bound to a QKeyEvent, or None."""
+        return self.table(commands).get((event.key(), int(event.modifiers())))
+
+
+_keymap = None
+_keymap_settings = None
+
+
+def get_keymap():
+    """Return the shared Keymap, rebuilding it when the Keyboard settings changed."""
+    global _keymap, _keymap_settings
+    settings = get_settings()
+    if settings is _keymap_settings:
+        return _keymap
+    if _keymap is None or _keymap.custom_shortcuts != settings.keyboard_shortcuts:
+        _keymap = Keymap(settings.keyboard_shortcuts)
+    _keymap_settings = settings
+    return _keymap
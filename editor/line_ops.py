@@ -0,0 +1,71 @@
+"""
+Whole-line text transforms used by CodeEditor's line operations.
+
+Each function takes the affected lines as a list of strings and returns the new lines.
+The editor reads the block range once, transforms it here and writes it back in a
+single edit, so commenting or moving thousands of lines is one document mutation.
+"""
+
+
+def toggle_comment_lines(lines):
+    """Comment lines that are not commented and uncomment the ones that are."""
+    result = []
+    for line in lines:
+        stripped = line.lstrip()
+        if stripped.startswith('#'):
+            indent = len(line) - len(stripped)
+            rest = stripped[1:]
+            if rest.startswith(' '):
+                rest = rest[1:]
+            result.append(line[:indent] + rest)
+        else:
+            result.append('# ' + line)
+    return result
+
+
+def indent_lines(lines, unit):
+    """Prefix every non-empty line with one indent unit."""
+    return [unit + line if line else line for line in lines]
+
+
+def dedent_lines(lines, tab_size, use_spaces):
+    """Remove one indent level (a tab, or up to `tab_size` spaces) from every line."""
+    tab_size = max(1, int(tab_size))
+    result = []
+    for line in lines:
+        if not use_spaces and line.startswith('\t'):
+            result.append(line[1:])
+            continue
+        leading_spaces = len(line) - len(line.lstrip(' '))
+        result.append(line[min(tab_size, leading_spaces):])
+    return result
+
+
+def move_lines(lines, direction):
+    """
+    Rotate `lines` so the selected run moves by one line.
+
+    For `direction` < 0 the first line is the one above the selection and ends up
+    below it; otherwise the last line is the one below and ends up above it.
+    """
+    if direction < 0:
+        return lines[1:] + lines[:1]
+    return lines[-1:] + lines[:-1]
+
+
+def remap_line_position(index, column, old_lines, new_lines, line_shift=0):
+    """
+    Where a cursor at (`index`, `column`) in `old_lines` ends up in `new_lines`.
+
+    Without `line_shift` the cursor keeps its line, and a column past the start moves
+    by the change in the line's length. With `line_shift` the lines were rotated by
+    `move_lines`: the cursor follows its line, including the one rotated to the other
+    end. Returns (index, column).
+    """
+    if line_shift:
+        index = (index + line_shift) % len(new_lines)
+        return index, min(column, len(new_lines[index]))
+    if column:
+        delta = len(new_lines[index]) - len(old_lines[index])
+        column = max(0, min(len(new_lines[index]), column + delta))
+    return index, column
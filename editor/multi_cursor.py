@@ -0,0 +1,121 @@
+from PySide2.QtGui import QTextCursor
+
+
+class MultiCursor:
+    """
+    Extra cursors for CodeEditor's multi-cursor mode.
+
+    Each cursor is a persistent QTextCursor, so the document keeps positions up to date
+    across every edit. Each operation runs inside a single edit block: one undo step and
+    one layout pass, however many cursors there are.
+    """
+
+    def __init__(self, document):
+        self._document = document
+        self._cursors = []
+
+    def __bool__(self):
+        return bool(self._cursors)
+
+    def __len__(self):
+        return len(self._cursors)
+
+    def __iter__(self):
+        return iter(self._cursors)
+
+    def __contains__(self, position):
+        return any(cursor.position() == position for cursor in self._cursors)
+
+    def positions(self):
+        return [cursor.position() for cursor in self._cursors]
+
+    def clear(self):
+        self._cursors = []
+
+    def add(self, position, anchor=None):
+        cursor = QTextCursor(self._document)
+        cursor.setPosition(position if anchor is None else anchor)
+        if anchor is not None:
+            cursor.setPosition(position, QTextCursor.KeepAnchor)
+        self._cursors.append(cursor)
+        return cursor
+
+    def toggle(self, position):
+        """Remove the cursor at `position` if there is one, otherwise add one there."""
+        for cursor in self._cursors:
+            if cursor.position() == position and not cursor.hasSelection():
+                self._cursors.remove(cursor)
+                return False
+        self.add(position)
+        return True
+
+    def set_column_selection(self, anchor_position, position):
+        """
+        Replace the cursors with a box selection between two document positions.
+
+        One cursor is created per line, selecting the same column range (clipped to
+        the line length). The cursor for the line holding `position` is returned
+        separately so the editor can make it the main cursor.
+        """
+        document = self._document
+        anchor_block = document.findBlock(anchor_position)
+        block = document.findBlock(position)
+        anchor_column = anchor_position - anchor_block.position()
+        column = position - block.position()
+        first, last = sorted((anchor_block.blockNumber(), block.blockNumber()))
+
+        self._cursors = []
+        main_cursor = None
+        current = document.findBlockByNumber(first)
+        while current.isValid() and current.blockNumber() <= last:
+            length = current.length() - 1
+            cursor = QTextCursor(document)
+            cursor.setPosition(current.position() + min(anchor_column, length))
+            cursor.setPosition(current.position() + min(column, length), QTextCursor.KeepAnchor)
+            if current == block:
+                main_cursor = cursor
+            else:
+                self._cursors.append(cursor)
+            current = current.next()
+        return main_cursor
+
+    def _dedupe(self):
+        seen = set()
+        unique = []
+        for cursor in self._cursors:
+            key = (cursor.anchor(), cursor.position())
+            if key not in seen:
+                seen.add(key)
+                unique.append(cursor)
+        self._cursors = unique
+
+    def _apply(self, edit):
+        if not self._cursors:
+            return
+        block_cursor = QTextCursor(self._document)
+        block_cursor.beginEditBlock()
+        try:
+            for cursor in self._cursors:
+                edit(cursor)
+        finally:
+            block_cursor.endEditBlock()
+        self._dedupe()
+
+    def insert_text(self, text):
+        self._apply(lambda cursor: cursor.insertText(text))
+
+    def delete_previous_char(self):
+        def edit(cursor):
+            if cursor.hasSelection():
+                cursor.removeSelectedText()
+            elif cursor.position() > 0:
+                cursor.deletePreviousChar()
+        self._apply(edit)
+
+    def delete_char(self):
+        def edit(cursor):
+            if cursor.hasSelection():
+                cursor.removeSelectedText()
+            elif not cursor.atEnd():
+                cursor.deleteChar()
+        self._apply(edit)
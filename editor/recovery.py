@@ -0,0 +1,287 @@
+"""
+Crash-recovery journal for editor tabs.
+
+Every modified tab has an append-only journal under the user data folder. It starts
+with a snapshot of the document and is followed by the edits reported by
+`QTextDocument.contentsChange`, one JSON object per line. Edits are batched and written
+on a background thread. The journal is rewritten as a fresh snapshot once it grows, and
+deleted when the tab is saved or closed without saving. Journals still present at start
+up belong to a session that ended without closing its tabs, e.g. a Nuke crash, and can
+be replayed.
+"""
+import json
+import os
+import queue
+import time
+import uuid
+
+from PySide2.QtCore import QObject, QThread, QTimer, Signal
+from PySide2.QtGui import QTextCursor
+
+from editor.core import PathFromOS
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+JOURNAL_SUFFIX = ".journal"
+JOURNAL_FLUSH_MS = 1500
+# Rewrite the journal as a single snapshot after this many edits or bytes of edits.
+JOURNAL_COMPACT_EDITS = 2000
+JOURNAL_COMPACT_BYTES = 1024 * 1024
+
+
+def recovery_dir():
+    path = os.path.join(PathFromOS().user_data_path, "recovery")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _pid_alive(pid):
+    if not pid:
+        return False
+    if pid == os.getpid():
+        return True
+    if psutil is not None:
+        return psutil.pid_exists(pid)
+    if os.name == "posix":
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except OSError:
+            return True
+        return True
+    return False
+
+
+def replay_journal(journal_path):
+    """
+    Rebuild the document stored in a journal.
+
+    Returns the snapshot record (file path, encoding, ...) with its `text` replaced by
+    the replayed text, or None if the journal has no readable snapshot. A torn last
+    line from a crash mid-write is ignored.
+    """
+    base = None
+    text = None
+    with open(journal_path, "r", encoding="utf-8") as file:
+        for line in file:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+            kind = record.get("t")
+            if kind == "base":
+                base = record
+                text = record.get("text", "")
+            elif kind == "e" and text is not None:
+                position = record["p"]
+                text = text[:position] + record["a"] + text[position + record["r"]:]
+    if base is None:
+        return None
+    base["text"] = text
+    return base
+
+
+def pending_recoveries():
+    """
+    Journals left behind by sessions that are no longer running.
+
+    Returns a list of (journal path, snapshot record) pairs, oldest first.
+    """
+    try:
+        directory = recovery_dir()
+        names = [name for name in os.listdir(directory) if name.endswith(JOURNAL_SUFFIX)]
+    except OSError:
+        return []
+
+    recoveries = []
+    for name in names:
+        journal_path = os.path.join(directory, name)
+        try:
+            record = replay_journal(journal_path)
+        except Exception:
+            continue
+        if record is None:
+            discard_journal_file(journal_path)
+            continue
+        if _pid_alive(record.get("pid")):
+            continue  # Another open editor session still owns this journal
+        recoveries.append((journal_path, record))
+    recoveries.sort(key=lambda item: item[1].get("time", 0))
+    return recoveries
+
+
+def discard_journal_file(journal_path):
+    try:
+        os.remove(journal_path)
+    except OSError:
+        pass
+
+
+class JournalWriterThread(QThread):
+    """
+    Applies queued journal writes in order: appends, snapshot rewrites and deletes.
+
+    `failed(journal_path, error)` is emitted for the first failed write to a journal;
+    it is emitted again for that journal only after a write to it has succeeded.
+    """
+    failed = Signal(str, str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._jobs = queue.Queue()
+        # Journals whose last write failed; a full disk fails every flush.
+        self._failing = set()
+
+    def submit(self, action, journal_path, data=""):
+        self._jobs.put((action, journal_path, data))
+        if not self.isRunning():
+            self.start()
+
+    def wait_for_jobs(self):
+        self._jobs.join()
+
+    def stop(self):
+        """Apply the queued writes, then end the thread; a later `submit` starts it again."""
+        if self.isRunning():
+            self._jobs.put(None)
+            self.wait()
+
+    def run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                self._jobs.task_done()
+                return
+            action, journal_path, data = job
+            try:
+                if action == "append":
+                    with open(journal_path, "a", encoding="utf-8") as file:
+                        file.write(data)
+                elif action == "rewrite":
+                    tmp_path = f"{journal_path}.tmp"
+                    with open(tmp_path, "w", encoding="utf-8") as file:
+                        file.write(data)
+                    os.replace(tmp_path, journal_path)
+                elif action == "delete":
+                    discard_journal_file(journal_path)
+                self._failing.discard(journal_path)
+            except Exception as e:
+                if journal_path not in self._failing:
+                    self._failing.add(journal_path)
+                    message = str(e) or e.__class__.__name__
+                    print(f"Recovery journal write failed: {message}")
+                    self.failed.emit(journal_path, message)
+            finally:
+                self._jobs.task_done()
+
+
+_journal_writer = None
+
+
+def journal_writer():
+    """The process-wide journal writer, shared by every editor tab."""
+    global _journal_writer
+    if _journal_writer is None:
+        _journal_writer = JournalWriterThread()
+    return _journal_writer
+
+
+class EditJournal(QObject):
+    """
+    Recovery journal for one editor.
+
+    Only modified documents are journaled. The first flush after the document becomes
+    modified writes a snapshot. Later flushes append the edits collected since then.
+    """
+
+    def __init__(self, editor):
+        super().__init__(editor)
+        self.editor = editor
+        self.journal_path = os.path.join(recovery_dir(), f"{uuid.uuid4().hex}{JOURNAL_SUFFIX}")
+        self._pending = []
+        self._needs_snapshot = True
+        self._on_disk = False
+        self._edits_since_snapshot = 0
+        self._bytes_since_snapshot = 0
+
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.timeout.connect(self.flush)
+
+        document = editor.document()
+        document.contentsChange.connect(self._on_contents_change)
+        document.modificationChanged.connect(self._on_modification_changed)
+        if document.isModified():
+            self._flush_timer.start(0)
+
+    def _on_contents_change(self, position, removed, added):
+        document = self.editor.document()
+        if not document.isModified() or self.editor.is_loading():
+            return
+        if not self._needs_snapshot:
+            cursor = QTextCursor(document)
+            cursor.setPosition(position)
+            # Qt can report one character past the end for whole-document changes.
+            cursor.setPosition(min(position + added, document.characterCount() - 1), QTextCursor.KeepAnchor)
+            text = cursor.selectedText().replace("\u2029", "\n")
+            self._pending.append({"t": "e", "p": position, "r": removed, "a": text})
+            self._edits_since_snapshot += 1
+            self._bytes_since_snapshot += len(text) + 32
+        if not self._flush_timer.isActive():
+            self._flush_timer.start(JOURNAL_FLUSH_MS)
+
+    def _on_modification_changed(self, modified):
+        if modified:
+            self._needs_snapshot = True
+            self._flush_timer.start(0)
+        else:
+            # Saved: the file on disk has everything, so the journal is no longer needed.
+            self.discard()
+
+    def flush(self):
+        """Hand the collected edits, or a fresh snapshot, to the writer thread."""
+        self._flush_timer.stop()
+        document = self.editor.document()
+        if not document.isModified():
+            return
+
+        if (self._edits_since_snapshot > JOURNAL_COMPACT_EDITS
+                or self._bytes_since_snapshot > JOURNAL_COMPACT_BYTES):
+            self._needs_snapshot = True
+
+        if self._needs_snapshot:
+            snapshot = {
+                "t": "base",
+                "pid": os.getpid(),
+                "time": time.time(),
+                "path": getattr(self.editor, "_file_path", "") or "",
+                "encoding": getattr(self.editor, "_file_encoding", "utf-8"),
+                "text": self.editor.toPlainText(),
+            }
+            journal_writer().submit("rewrite", self.journal_path, json.dumps(snapshot) + "\n")
+            self._pending = []
+            self._needs_snapshot = False
+            self._on_disk = True
+            self._edits_since_snapshot = 0
+            self._bytes_since_snapshot = 0
+            return
+
+        if self._pending:
+            data = "".join(json.dumps(record) + "\n" for record in self._pending)
+            self._pending = []
+            journal_writer().submit("append", self.journal_path, data)
+
+    def discard(self):
+        """Forget all journaled edits and remove the journal file."""
+        self._flush_timer.stop()
+        self._pending = []
+        self._needs_snapshot = True
+        self._edits_since_snapshot = 0
+        self._bytes_since_snapshot = 0
+        if self._on_disk:
+            self._on_disk = False
+            journal_writer().submit("delete", self.journal_path)
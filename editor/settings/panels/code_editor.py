@@ -155,7 +155,10 @@ def build_code_editor_panel(settings_window):
         lambda state: autosave_interval_spinbox.setEnabled(state == 2)
     )
 
-    autosave_note = QLabel("Automatically save your work at regular intervals.")
+    autosave_note = QLabel(
+        "Unsaved edits are kept in a crash-recovery journal and offered back after a crash. "
+        "Auto-save writes the batched edits to the journal at this interval; your files are only written when you save."
+    )
     autosave_note.setStyleSheet("color: grey;")
     autosave_note.setWordWrap(True)
     autosave_layout.addRow(autosave_note)
@@ -184,6 +187,36 @@ def build_code_editor_panel(settings_window):
     indent_group.setLayout(indent_layout)
     layout.addWidget(indent_group)
 
+    large_file_group = QGroupBox("Large Files")
+    large_file_layout = QFormLayout()
+    large_file_lines_spinbox = QSpinBox()
+    large_file_lines_spinbox.setMinimumHeight(30)
+    large_file_lines_spinbox.setObjectName("large_file_line_threshold")
+    large_file_lines_spinbox.setRange(1000, 1000000)
+    large_file_lines_spinbox.setSingleStep(1000)
+    large_file_lines_spinbox.setValue(20000)
+    large_file_lines_spinbox.setSuffix(" lines")
+    large_file_layout.addRow("Line threshold:", large_file_lines_spinbox)
+
+    large_file_size_spinbox = QSpinBox()
+    large_file_size_spinbox.setMinimumHeight(30)
+    large_file_size_spinbox.setObjectName("large_file_size_threshold_kb")
+    large_file_size_spinbox.setRange(100, 102400)
+    large_file_size_spinbox.setSingleStep(256)
+    large_file_size_spinbox.setValue(2048)
+    large_file_size_spinbox.setSuffix(" KB")
+    large_file_layout.addRow("Size threshold:", large_file_size_spinbox)
+
+    large_file_note = QLabel(
+        "Above either limit the editor switches to large-file mode: simpler highlighting, "
+        "no inline suggestions and viewport-only search highlights."
+    )
+    large_file_note.setStyleSheet("color: grey;")
+    large_file_note.setWordWrap(True)
+    large_file_layout.addRow(large_file_note)
+    large_file_group.setLayout(large_file_layout)
+    layout.addWidget(large_file_group)
+
     def update_preview_font(font):
         preview_editor = getattr(settings_window, "preview_editor", None)
         if not preview_editor:
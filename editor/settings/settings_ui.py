@@ -29,7 +29,8 @@ import re
 import importlib
 import editor.settings.settings_ux
 from editor.settings import settings_ux
-from editor.core import PathFromOS, write_python_file
+from editor.core import PathFromOS, invalidate_settings, write_python_file
+from editor.keymap import find_conflicts
 from editor.settings.panels import (
     build_general_panel,
     build_keyboard_panel,
@@ -505,22 +506,16 @@ class SettingsWindow(QMainWindow):
 
     def check_shortcut_conflicts(self):
         """Check for duplicate shortcuts and warn user"""
-        shortcuts_dict = {}
-        conflicts = []
-
+        shortcuts = []
         for row in range(self.shortcuts_table.rowCount()):
             cmd_name = self.shortcuts_table.item(row, 0).text()
             shortcut_edit = self.shortcuts_table.cellWidget(row, 2)
 
             if shortcut_edit:
-                shortcut = shortcut_edit.keySequence().toString()
-
-                if shortcut and shortcut.strip():  
-                    if shortcut in shortcuts_dict:
-                        conflicts.append((shortcut, shortcuts_dict[shortcut], cmd_name))
-                    else:
-                        shortcuts_dict[shortcut] = cmd_name
+                shortcuts.append((cmd_name, shortcut_edit.keySequence().toString()))
 
+        # Compare parsed bindings so "Ctrl+Enter" and "Ctrl+Return" count as the same key
+        conflicts = find_conflicts(shortcuts)
         if conflicts:
             conflict_text = "⚠️ Shortcut conflicts detected:\n"
             for shortcut, cmd1, cmd2 in conflicts:
@@ -965,6 +960,7 @@ class SettingsWindow(QMainWindow):
     
     def apply_settings(self):
         self.save_settings()
+        invalidate_settings()
         self._apply_runtime_settings()
         self._dirty = False
 
@@ -1013,6 +1009,7 @@ class SettingsWindow(QMainWindow):
 
     def save_and_close(self):
         self.save_settings()
+        invalidate_settings()
         self._dirty = False
         self.close()
 
@@ -12,11 +12,11 @@ importlib.reload(editor.core)
 importlib.reload(editor.nlink)
 importlib.reload(settings_ux)
 from editor.nlink import update_nuke_functions
-from editor.core import PathFromOS, CodeEditorSettings
+from editor.core import PathFromOS, get_settings
 from editor.nodes.crtNode import createNodesCode
 
 pathFromOS = PathFromOS()
-settings = CodeEditorSettings()
+settings = get_settings()
 
 class MainToolbar:
     """
@@ -3,86 +3,146 @@ import re
 import sys
 import subprocess
 from PySide2.QtWidgets import QApplication, QFileDialog, QMessageBox, QInputDialog
-from editor.code_editor import CodeEditor
-from editor.core import write_python_file
+from editor.code_editor import CodeEditor, occurrence_worker
+from editor.file_saver import save_thread
+from editor.recovery import discard_journal_file, journal_writer, pending_recoveries
 
 
 class FileOpsMixin:
-    def autosave_all_modified_files(self):
+    def _code_editors(self):
+        for tab_widget in self._all_tab_widgets():
+            for index in range(tab_widget.count()):
+                editor = tab_widget.widget(index)
+                if isinstance(editor, CodeEditor):
+                    yield editor
+
+    def flush_recovery_journals(self):
+        """Write pending edits of every modified tab to its recovery journal."""
+        for editor in self._code_editors():
+            journal = getattr(editor, "journal", None)
+            if journal is not None:
+                journal.flush()
+
+    def discard_recovery_journals(self):
+        """Drop the recovery journals of all tabs, e.g. when quitting without saving."""
+        for editor in self._code_editors():
+            journal = getattr(editor, "journal", None)
+            if journal is not None:
+                journal.discard()
+
+    def stop_background_writers(self):
         """
-        Auto-save all modified editors without prompting.
-
-        Rules:
-        - If a tab has an existing path, save there.
-        - If it's an untitled tab and a project is open, save into the project.
-        - Otherwise, skip (never opens dialogs).
+        Let queued saves and journal writes reach the disk and stop both workers, e.g.
+        before quitting. Journals of tabs that are still modified are flushed first.
+        The occurrence scanner is stopped as well; it has nothing worth finishing.
         """
-        if not hasattr(self, "_all_tab_widgets"):
-            return 0
+        self.flush_recovery_journals()
+        save_thread().stop()
+        journal_writer().stop()
+        occurrence_worker().stop()
+
+    def _on_journal_write_failed(self, journal_path, error):
+        self.statusBar().showMessage(f"Unsaved changes are not being backed up for crash recovery: {error}", 10000)
+
+    def offer_crash_recovery(self):
+        """Offer to reopen unsaved work left in recovery journals by a crashed session."""
+        recoveries = pending_recoveries()
+        if not recoveries:
+            return
 
-        saved_count = 0
-        for tab_widget in self._all_tab_widgets():
-            try:
-                for index in range(tab_widget.count()):
-                    editor = tab_widget.widget(index)
-                    if not isinstance(editor, CodeEditor):
-                        continue
-                    if not editor.document().isModified():
-                        continue
-                    if self._autosave_editor_tab(tab_widget, index, editor):
-                        saved_count += 1
-            except Exception:
-                continue
-        return saved_count
+        names = [os.path.basename(record.get("path") or "untitled.py") for _journal_path, record in recoveries]
+        message = "The editor did not close normally. Unsaved changes were found for:\n"
+        message += "\n".join(f"- {name}" for name in names)
+        message += "\n\nRestore them?"
+        response = QMessageBox.question(
+            self, "Recover Unsaved Changes", message,
+            QMessageBox.Yes | QMessageBox.No, QMessageBox.Yes
+        )
 
-    def _autosave_editor_tab(self, tab_widget, index, editor):
-        tab_title = tab_widget.tabText(index).replace("*", "").strip()
-        existing_file_path = tab_widget.tabToolTip(index)
+        for journal_path, record in recoveries:
+            if response == QMessageBox.Yes:
+                file_path = record.get("path") or ""
+                if not os.path.isabs(file_path):
+                    file_path = self.tab_widget.get_next_untitled_name()
+                self.add_new_tab(file_path, initial_content=record.get("text", ""), recovered=True)
+                current_editor = self._current_tab_widget().currentWidget()
+                if isinstance(current_editor, CodeEditor):
+                    current_editor._file_encoding = record.get("encoding", "utf-8")
+            discard_journal_file(journal_path)
+
+    def _next_untitled_project_path(self):
+        """First free untitled[_N].py in the project, skipping paths with a save still queued."""
+        pending = {job[1] for job in self._pending_saves().values()}
+        base_name = "untitled"
+        file_extension = ".py"
+        counter = 1
 
-        if existing_file_path:
-            try:
-                file_path = os.path.normpath(existing_file_path)
-                with open(file_path, "w", encoding="utf-8") as file:
-                    file.write(editor.toPlainText())
-                editor.document().setModified(False)
-                tab_widget.setTabText(index, os.path.basename(file_path))
-                if hasattr(self, "statusBar"):
-                    self.statusBar().showMessage(f"Auto-saved: {os.path.basename(file_path)}", 1500)
-                return True
-            except Exception:
-                return False
+        while True:
+            if counter == 1:
+                file_name = f"{base_name}{file_extension}"
+            else:
+                file_name = f"{base_name}_{counter}{file_extension}"
+            file_path = os.path.normpath(os.path.join(self.project_dir, file_name))
+            if not os.path.exists(file_path) and file_path not in pending:
+                return file_path
+            counter += 1
 
-        if tab_title.startswith("untitled") and getattr(self, "project_dir", None):
-            base_name = "untitled"
-            file_extension = ".py"
-            counter = 1
-
-            while True:
-                if counter == 1:
-                    file_name = f"{base_name}{file_extension}"
-                else:
-                    file_name = f"{base_name}_{counter}{file_extension}"
-                file_path = os.path.join(self.project_dir, file_name)
-                if not os.path.exists(file_path):
-                    break
-                counter += 1
+    def _pending_saves(self):
+        if not hasattr(self, "_save_jobs"):
+            self._save_jobs = {}
+        return self._save_jobs
 
-            try:
-                write_python_file(file_path, editor.toPlainText(), mode="w", encoding="utf-8")
-                editor.document().setModified(False)
-                tab_widget.setTabText(index, file_name)
-                tab_widget.setTabToolTip(index, file_path)
-                if hasattr(self, "update_header_tree"):
-                    self.update_header_tree()
-                if hasattr(self, "refresh_workspace"):
-                    self.refresh_workspace()
-                if hasattr(self, "statusBar"):
-                    self.statusBar().showMessage(f"Auto-saved to project: {file_name}", 1500)
-                return True
-            except Exception:
-                return False
+    def _save_editor_to_path(self, editor, file_path, message, blocking=False):
+        """
+        Snapshot `editor` and write it to `file_path` on the save worker.
 
-        return False
+        The document stays modified, and its recovery journal stays on disk, until the
+        write has succeeded; if it fails the error is reported. With `blocking`, the
+        save runs before this returns and the result is returned as a bool.
+        """
+        worker = save_thread()
+        if not getattr(self, "_save_worker_connected", False):
+            worker.saved.connect(self._on_file_saved)
+            self._save_worker_connected = True
+
+        text = editor.toPlainText()
+        encoding = getattr(editor, "_file_encoding", "utf-8")
+        revision = editor.document().revision()
+        if blocking:
+            _job_id, encoding, written, error = worker.save_now(file_path, text, encoding)
+            return self._finish_save(editor, file_path, message, encoding, written, error, revision)
+
+        job_id = worker.submit(file_path, text, encoding)
+        self._pending_saves()[job_id] = (editor, os.path.normpath(file_path), message, revision)
+        return True
+
+    def _on_file_saved(self, job_id, file_path, encoding, written, error):
+        job = self._pending_saves().pop(job_id, None)
+        if job is None:
+            return
+        editor, path, message, revision = job
+        self._finish_save(editor, path, message, encoding, written, error, revision)
+
+    def _finish_save(self, editor, file_path, message, encoding, written, error, revision):
+        if error:
+            QMessageBox.critical(self, "Save Error", f"Failed to save file:\n{error}")
+            return False
+
+        # Edits typed while the write was queued are not on disk yet; keep them modified.
+        document = editor.document()
+        if document.revision() == revision:
+            document.setModified(False)
+        for tab_widget in self._all_tab_widgets():
+            index = tab_widget.indexOf(editor)
+            if index != -1:
+                name = os.path.basename(file_path)
+                tab_widget.setTabText(index, "*" + name if document.isModified() else name)
+                break
+        editor._file_encoding = encoding
+        self.statusBar().showMessage(message if written else f"{message} (unchanged)", 2000)
+        if written and hasattr(self, "update_workspace_item"):
+            self.update_workspace_item(file_path)
+        return True
 
     def open_file(self):
         """Dosya açma işlemi."""
@@ -106,12 +166,15 @@ class FileOpsMixin:
             self.add_new_tab(file_name)
             print("add_new_tab 1625")
 
-    def save_file(self):
+    def save_file(self, *, blocking=False):
         """Smart save: automatically save to project folder if project is open."""
         target_tabs = self._current_tab_widget()
         current_editor = target_tabs.currentWidget()
         if not current_editor or not isinstance(current_editor, CodeEditor):
             return False
+        if current_editor.is_loading():
+            self.statusBar().showMessage("The file is still loading.", 2000)
+            return False
 
         index = target_tabs.indexOf(current_editor)
         if index == -1:
@@ -124,73 +187,41 @@ class FileOpsMixin:
 
         # Scenario 1: File already has a path (previously saved)
         if existing_file_path and os.path.exists(existing_file_path):
-            try:
-                file_path = os.path.normpath(existing_file_path)
-                with open(file_path, 'w', encoding='utf-8') as file:
-                    file.write(current_editor.toPlainText())
-                current_editor.document().setModified(False)
-                target_tabs.setTabText(index, os.path.basename(file_path))
-                self.statusBar().showMessage(f"Saved: {os.path.basename(file_path)}", 2000)
-
-                # Refresh workspace to show changes
-                if self.project_dir:
-                    self.refresh_workspace()
-                return True
-            except Exception as e:
-                QMessageBox.critical(self, "Save Error", f"Failed to save file:\n{str(e)}")
+            file_path = os.path.normpath(existing_file_path)
+            if not self._save_editor_to_path(current_editor, file_path, f"Saved: {os.path.basename(file_path)}", blocking):
                 return False
+            return True
 
         # Scenario 2: Untitled file + Project is open → Auto-save to project
         if tab_title.startswith("untitled") and self.project_dir:
             # Generate unique filename in project directory
-            base_name = "untitled"
-            file_extension = ".py"
-            counter = 1
+            file_path = self._next_untitled_project_path()
+            file_name = os.path.basename(file_path)
 
-            while True:
-                if counter == 1:
-                    file_name = f"{base_name}{file_extension}"
-                else:
-                    file_name = f"{base_name}_{counter}{file_extension}"
-
-                file_path = os.path.join(self.project_dir, file_name)
-                if not os.path.exists(file_path):
-                    break
-                counter += 1
-
-            try:
-                # Save file to project directory
-                write_python_file(file_path, current_editor.toPlainText(), mode="w", encoding="utf-8")
-
-                current_editor.document().setModified(False)
-
-                # Update tab with new name
-                target_tabs.setTabText(index, file_name)
-                target_tabs.setTabToolTip(index, file_path)
-
-                # Show success message
-                self.statusBar().showMessage(f"Auto-saved to: {file_name}", 3000)
-
-                # Update HEADER to show new filename
-                self.update_header_tree()
+            # Save file to project directory
+            if not self._save_editor_to_path(current_editor, file_path, f"Auto-saved to: {file_name}", blocking):
+                return False
 
-                # Refresh workspace to show new file
-                self.refresh_workspace()
-                return True
+            # The tab takes the new name once the save has succeeded (see _finish_save)
+            target_tabs.setTabToolTip(index, file_path)
+            current_editor._file_path = file_path
 
-            except Exception as e:
-                QMessageBox.critical(self, "Save Error", f"Failed to auto-save file:\n{str(e)}")
-                return False
+            # Update HEADER to show new filename
+            self.update_header_tree()
+            return True
 
         # Scenario 3: No project or user wants to choose location → Save As
-        return self.save_file_as()
+        return self.save_file_as(blocking=blocking)
 
-    def save_file_as(self):
+    def save_file_as(self, *, blocking=False):
         """Dosyayı farklı bir yola kaydeder."""
         target_tabs = self._current_tab_widget()
         current_editor = target_tabs.currentWidget()
         if not current_editor or not isinstance(current_editor, CodeEditor):
             return False
+        if current_editor.is_loading():
+            self.statusBar().showMessage("The file is still loading.", 2000)
+            return False
 
         # Get current file name as default
         index = target_tabs.indexOf(current_editor)
@@ -206,36 +237,22 @@ class FileOpsMixin:
         )
 
         if file_name:
-            try:
-                # Normalize path for cross-platform compatibility
-                file_name = os.path.normpath(file_name)
-
-                with open(file_name, 'w', encoding='utf-8') as file:
-                    file.write(current_editor.toPlainText())
-
-                current_editor.document().setModified(False)
+            # Normalize path for cross-platform compatibility
+            file_name = os.path.normpath(file_name)
 
-                # Update tab name and tooltip
-                target_tabs.setTabText(index, os.path.basename(file_name))
-                target_tabs.setTabToolTip(index, file_name)
-
-                # Add to recent files
-                self.add_to_recent_files(file_name)
-
-                # Show status message
-                self.statusBar().showMessage(f"Saved as: {os.path.basename(file_name)}", 3000)
+            if not self._save_editor_to_path(current_editor, file_name, f"Saved as: {os.path.basename(file_name)}", blocking):
+                return False
 
-                # Update HEADER to show new filename
-                self.update_header_tree()
+            # Update tooltip; the tab takes the new name once the save has succeeded
+            target_tabs.setTabToolTip(index, file_name)
+            current_editor._file_path = file_name
 
-                # Refresh workspace if file is within project directory
-                if self.project_dir and file_name.startswith(self.project_dir):
-                    self.refresh_workspace()
-                return True
+            # Add to recent files
+            self.add_to_recent_files(file_name)
 
-            except Exception as e:
-                QMessageBox.critical(self, "Save Error", f"Failed to save file:\n{str(e)}")
-                return False
+            # Update HEADER to show new filename
+            self.update_header_tree()
+            return True
         return False
 
     def copy_file_path(self):
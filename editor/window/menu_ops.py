@@ -9,6 +9,7 @@ from editor.settings.settings_ui import SettingsWindow
 from editor.ui.dialogs.goToLineDialogs import GoToLineDialog
 from editor.ui.dialogs.searchDialogs import SearchDialog
 from editor.code_editor import CodeEditor
+from editor.keymap import get_keymap
 
 
 class MenuOpsMixin:
@@ -33,7 +34,7 @@ class MenuOpsMixin:
         file_menu = menubar.addMenu('File')
         self.new_project_action = QAction(QIcon(os.path.join(PathFromOS().icons_path, 'new_project.png')),
                                           'New Project', self)
-        self.new_project_action.setShortcut(QKeySequence(self.settings.get_shortcut("New Project")))
+        self.new_project_action.setShortcut(get_keymap().key_sequence("New Project"))
 
         # New Project alt menüleri (Nuke ve Custom projeler)
         new_project_menu = QMenu('New Project', self)
@@ -51,19 +52,19 @@ class MenuOpsMixin:
         open_project_action = QAction(icon('welcome_open_project.svg', QStyle.SP_DirOpenIcon), 'Open Project',
                                       self)
         new_file_action = QAction(QIcon(os.path.join(PathFromOS().icons_path, 'new_file.png')), 'New File', self)
-        new_file_action.setShortcut(QKeySequence(self.settings.get_shortcut("New File")))
+        new_file_action.setShortcut(get_keymap().key_sequence("New File"))
         open_action = QAction(icon(None, QStyle.SP_DialogOpenButton), 'Open File', self)
-        open_action.setShortcut(QKeySequence(self.settings.get_shortcut("Open File")))
+        open_action.setShortcut(get_keymap().key_sequence("Open File"))
 
         save_action = QAction(QIcon(os.path.join(PathFromOS().icons_path, 'save.svg')), 'Save', self)
-        save_action.setShortcut(QKeySequence(self.settings.get_shortcut("Save")))
+        save_action.setShortcut(get_keymap().key_sequence("Save"))
         save_as_action = QAction(icon(None, QStyle.SP_DialogSaveButton), 'Save As', self)
-        save_as_action.setShortcut(QKeySequence(self.settings.get_shortcut("Save As")))
+        save_as_action.setShortcut(get_keymap().key_sequence("Save As"))
         save_all_action = QAction(icon('save.svg', QStyle.SP_DialogSaveButton), 'Save All', self)
         save_all_action.setShortcut(QKeySequence('Ctrl+K, S'))
 
         close_tab_action = QAction(icon('close_01.svg', QStyle.SP_DockWidgetCloseButton), 'Close Tab', self)
-        close_tab_action.setShortcut(QKeySequence(self.settings.get_shortcut("Close Tab")))
+        close_tab_action.setShortcut(get_keymap().key_sequence("Close Tab"))
         close_all_action = QAction(icon('close_01.svg', QStyle.SP_DockWidgetCloseButton), 'Close All Tabs', self)
         close_all_action.setShortcut(QKeySequence('Ctrl+Shift+W'))
         close_other_action = QAction(icon('close_01.svg', QStyle.SP_DockWidgetCloseButton), 'Close Other Tabs', self)
@@ -73,7 +74,7 @@ class MenuOpsMixin:
         show_explorer_action = QAction(icon('folder_tree.svg', QStyle.SP_DirOpenIcon), 'Show in Explorer', self)
 
         exit_action = QAction(QIcon(os.path.join(PathFromOS().icons_path, 'exit.png')), 'Exit', self)
-        exit_action.setShortcut(QKeySequence(self.settings.get_shortcut("Exit")))
+        exit_action.setShortcut(get_keymap().key_sequence("Exit"))
 
         # Preferences öğesi
         preferences_action = QAction(QIcon(os.path.join(PathFromOS().icons_path, 'settings.png')), 'Preferences', self)
@@ -112,26 +113,26 @@ class MenuOpsMixin:
         # 2. Edit Menüsü
         edit_menu = menubar.addMenu('Edit')
         undo_action = QAction(icon(None, QStyle.SP_ArrowBack), 'Undo', self)
-        undo_action.setShortcut(QKeySequence(self.settings.get_shortcut("Undo")))
+        undo_action.setShortcut(get_keymap().key_sequence("Undo"))
         redo_action = QAction(icon(None, QStyle.SP_ArrowForward), 'Redo', self)
-        redo_action.setShortcut(QKeySequence(self.settings.get_shortcut("Redo")))
+        redo_action.setShortcut(get_keymap().key_sequence("Redo"))
 
         # Go To Line öğesi
         go_to_line_action = QAction(icon('goto_line.svg', QStyle.SP_FileDialogDetailedView), 'Go To Line', self)
-        go_to_line_action.setShortcut(QKeySequence(self.settings.get_shortcut("Go to Line")))
+        go_to_line_action.setShortcut(get_keymap().key_sequence("Go to Line"))
 
         find_action = QAction(QIcon(os.path.join(PathFromOS().icons_path, 'search.svg')), 'Search && Replace', self)
-        find_action.setShortcut(QKeySequence(self.settings.get_shortcut("Find")))
+        find_action.setShortcut(get_keymap().key_sequence("Find"))
         clear_action = QAction(QIcon(os.path.join(PathFromOS().icons_path, 'clear.svg')), 'Clear Output', self)
 
         cut_action = QAction(QIcon(os.path.join(PathFromOS().icons_path, 'cut.png')), 'Cut', self)
-        cut_action.setShortcut(QKeySequence(self.settings.get_shortcut("Cut")))
+        cut_action.setShortcut(get_keymap().key_sequence("Cut"))
         copy_action = QAction(QIcon(os.path.join(PathFromOS().icons_path, 'copy.png')), 'Copy', self)
-        copy_action.setShortcut(QKeySequence(self.settings.get_shortcut("Copy")))
+        copy_action.setShortcut(get_keymap().key_sequence("Copy"))
         paste_action = QAction(QIcon(os.path.join(PathFromOS().icons_path, 'paste.png')), 'Paste', self)
-        paste_action.setShortcut(QKeySequence(self.settings.get_shortcut("Paste")))
+        paste_action.setShortcut(get_keymap().key_sequence("Paste"))
         select_all_action = QAction('Select All', self)
-        select_all_action.setShortcut(QKeySequence(self.settings.get_shortcut("Select All")))
+        select_all_action.setShortcut(get_keymap().key_sequence("Select All"))
 
         # Edit menüsüne eklemeler
         edit_menu.addAction(undo_action)
@@ -152,11 +153,11 @@ class MenuOpsMixin:
 
         # Zoom işlemleri
         zoom_in_action = QAction('Zoom In', self)
-        zoom_in_action.setShortcut(QKeySequence(self.settings.get_shortcut("Zoom In")))
+        zoom_in_action.setShortcut(get_keymap().key_sequence("Zoom In"))
         zoom_out_action = QAction('Zoom Out', self)
-        zoom_out_action.setShortcut(QKeySequence(self.settings.get_shortcut("Zoom Out")))
+        zoom_out_action.setShortcut(get_keymap().key_sequence("Zoom Out"))
         reset_zoom_action = QAction('Reset Zoom', self)  # Reset Zoom eklendi
-        reset_zoom_action.setShortcut(QKeySequence(self.settings.get_shortcut("Reset Zoom")))
+        reset_zoom_action.setShortcut(get_keymap().key_sequence("Reset Zoom"))
 
         # View menüsüne eklemeler
         view_menu.addAction(zoom_in_action)
@@ -210,17 +211,17 @@ class MenuOpsMixin:
             'Run (Selection/All)',
             self,
         )
-        self.run_code_action.setShortcut(QKeySequence(self.settings.get_shortcut("Run Code")))
+        self.run_code_action.setShortcut(get_keymap().key_sequence("Run Code"))
 
         self.run_all_code_action = QAction(QIcon(os.path.join(PathFromOS().icons_path, 'run_all.svg')), 'Run All Code', self)
-        self.run_all_code_action.setShortcut(QKeySequence(self.settings.get_shortcut("Execute All Code")))
+        self.run_all_code_action.setShortcut(get_keymap().key_sequence("Execute All Code"))
 
         self.execute_current_line_action = QAction(
             QIcon(os.path.join(PathFromOS().icons_path, 'run_current.svg')),
             'Execute Current Line',
             self,
         )
-        self.execute_current_line_action.setShortcut(QKeySequence(self.settings.get_shortcut("Execute Current Line")))
+        self.execute_current_line_action.setShortcut(get_keymap().key_sequence("Execute Current Line"))
 
         self.stop_execution_action = QAction(
             QIcon(os.path.join(PathFromOS().icons_path, 'close_01.svg')),
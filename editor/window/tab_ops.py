@@ -3,8 +3,10 @@ from PySide2.QtCore import Qt, QEvent
 from PySide2.QtWidgets import QApplication, QMessageBox, QSplitter
 from PySide2.QtCore import QSize
 from editor.code_editor import CodeEditor
+from editor.file_loader import StreamingFileLoader
+from editor.recovery import EditJournal
 from editor.ui.widgets.custom_tab_widget import CustomTabWidget
-from editor.core import CodeEditorSettings
+from editor.core import get_settings
 
 
 class TabOpsMixin:
@@ -92,11 +94,15 @@ class TabOpsMixin:
                 self._set_active_tab_widget(tab_widget)
         return super().eventFilter(obj, event)
 
-    def add_new_tab(self, file_path, initial_content=""):
-        """Yeni bir sekme oluşturur ve dosyayı yükler."""
+    def add_new_tab(self, file_path, initial_content="", recovered=False):
+        """
+        Yeni bir sekme oluşturur ve dosyayı yükler.
+
+        With `recovered`, `initial_content` is unsaved text restored from a recovery
+        journal and is shown instead of the file on disk.
+        """
         target_tabs = self._current_tab_widget()
         editor = CodeEditor()  # QPlainTextEdit yerine CodeEditor kullanıyoruz
-        editor.textChanged.connect(self.update_header_tree)  # Direkt editor widget'ine bağlama yaptık
 
         # Store file path in editor for accurate duplicate detection
         if os.path.exists(file_path):
@@ -104,22 +110,20 @@ class TabOpsMixin:
         else:
             editor._file_path = file_path  # untitled files
 
-        # Dosya içeriği eğer mevcutsa yüklüyoruz, yoksa varsayılan içerik ile açıyoruz
-        if os.path.exists(file_path):
-            with open(file_path, 'r', encoding='utf-8') as file:
-                content = file.read()
-                editor.setPlainText(content)
-                editor.document().setModified(False)  # Mark as not modified after loading
+        # Mevcut dosyalar arka planda parça parça yüklenir; sekme hemen kullanılabilir
+        if os.path.exists(file_path) and not recovered:
+            loader = StreamingFileLoader(editor, file_path)
+            editor._file_loader = loader
+            loader.loaded.connect(lambda encoding: self._on_tab_loaded(editor, encoding))
+            loader.cancelled.connect(lambda: self._close_loading_tab(editor))
+            loader.failed.connect(lambda message: self._on_tab_load_failed(editor, file_path, message))
         else:
-            editor.setPlainText(initial_content)
+            loader = None
+            editor.set_document_text(initial_content)
             # For new untitled files, mark as modified so user knows to save
-            if initial_content:
+            if initial_content or recovered:
                 editor.document().setModified(True)
-
-        # Connect modification tracking
-        editor.document().modificationChanged.connect(
-            lambda modified: self.on_modification_changed(editor, modified)
-        )
+            self._connect_editor_signals(editor)
 
         # Add tab with file name
         tab_index = target_tabs.addTab(editor, self.python_icon, os.path.basename(file_path))
@@ -133,6 +137,42 @@ class TabOpsMixin:
         if hasattr(editor, 'completer') and hasattr(editor.completer, 'completion_popup'):
             editor.completer.completion_popup.popup().hide()
 
+        if loader:
+            loader.start()
+
+    def _connect_editor_signals(self, editor):
+        editor.textChanged.connect(self.update_header_tree)  # Direkt editor widget'ine bağlama yaptık
+        editor.journal = EditJournal(editor)
+
+        # Connect modification tracking
+        editor.document().modificationChanged.connect(
+            lambda modified: self.on_modification_changed(editor, modified)
+        )
+
+    def _on_tab_loaded(self, editor, encoding):
+        editor._file_loader = None
+        editor._file_encoding = encoding
+        self._connect_editor_signals(editor)
+        self.update_header_tree()
+
+    def _on_tab_load_failed(self, editor, file_path, message):
+        self._close_loading_tab(editor)
+        QMessageBox.critical(self, "Open Error", f"Failed to open file:\n{file_path}\n\n{message}")
+
+    def _close_loading_tab(self, editor):
+        editor._file_loader = None
+        for tab_widget in self._all_tab_widgets():
+            index = tab_widget.indexOf(editor)
+            if index != -1:
+                tab_widget.removeTab(index)
+                self._cleanup_split_layout(tab_widget)
+                break
+
+    def _cancel_tab_load(self, editor):
+        loader = getattr(editor, "_file_loader", None)
+        if loader is not None:
+            loader.cancel()
+
     def close_tab(self, index, tab_widget=None):
         """Bir sekmeyi kapatmadan önce kontrol eder."""
         target_tabs = tab_widget or self.tab_widget
@@ -147,17 +187,24 @@ class TabOpsMixin:
             return True
 
         print("istemci kapatildi")
+        # A half-loaded file has nothing to save; cancelling the load closes the tab
+        if widget.is_loading():
+            self._cancel_tab_load(widget)
+            return True
+
         if widget.document().isModified():
             # Eğer sekmede kaydedilmemiş değişiklikler varsa kullanıcıya soralım
             response = self.prompt_save_changes(widget)
             if response == QMessageBox.Save:
                 target_tabs.setCurrentIndex(index)
                 self._set_active_tab_widget(target_tabs)
-                if self.save_file():
+                if self.save_file(blocking=True):
                     target_tabs.removeTab(index)  # Dosya kaydedildiyse tabı kapat
                 else:
                     return False
             elif response == QMessageBox.Discard:
+                if getattr(widget, "journal", None):
+                    widget.journal.discard()
                 target_tabs.removeTab(index)  # Kaydetmeden kapat
             elif response == QMessageBox.Cancel:
                 return False  # İptal edildiğinde hiçbir işlem yapma
@@ -270,7 +317,7 @@ class TabOpsMixin:
         )
         return response
 
-    def save_all_files(self):
+    def save_all_files(self, *, blocking=False):
         """Tüm açık sekmelerdeki dosyaları kaydeder."""
         active_tabs = self._current_tab_widget()
         for tab_widget in self._all_tab_widgets():
@@ -283,7 +330,7 @@ class TabOpsMixin:
                     # Switch to this tab and save
                     tab_widget.setCurrentIndex(i)
                     self._set_active_tab_widget(tab_widget)
-                    self.save_file()
+                    self.save_file(blocking=blocking)
 
             # Restore original tab
             if current_index >= 0 and current_index < tab_widget.count():
@@ -324,7 +371,7 @@ class TabOpsMixin:
     def add_new_untitled_tab(self):
         """Add a new untitled tab with auto-incrementing number"""
         untitled_name = self.tab_widget.get_next_untitled_name()
-        self.add_new_tab(untitled_name, initial_content=CodeEditorSettings().temp_codes)
+        self.add_new_tab(untitled_name, initial_content=get_settings().temp_codes)
 
         # Hide completer popup
         current_editor = self.tab_widget.currentWidget()
@@ -44,6 +44,7 @@ from editor.core import (
     get_unique_python_path,
 )
 from editor.code_editor import CodeEditor
+from editor import introspection
 
 
 class WorkplaceTreeWidget(QTreeWidget):
@@ -174,19 +175,22 @@ class WorkspaceOpsMixin:
 
         # Add files
         for file_name in files:
-            file_path = os.path.join(directory, file_name)
-            file_item = QTreeWidgetItem(parent_item)
-            file_item.setText(0, file_name)
-            file_item.setData(0, Qt.UserRole, file_path)
-            file_item.setFlags(file_item.flags() | Qt.ItemIsDragEnabled)
+            parent_item.addChild(self._make_file_item(os.path.join(directory, file_name)))
 
-            # Get file extension
-            _, extension = os.path.splitext(file_name)
+    def _make_file_item(self, file_path):
+        file_item = QTreeWidgetItem()
+        file_item.setText(0, os.path.basename(file_path))
+        file_item.setData(0, Qt.UserRole, file_path)
+        file_item.setFlags(file_item.flags() | Qt.ItemIsDragEnabled)
 
-            # Get icon with fallback
-            icon = self.get_file_icon(extension.lower())
-            if icon:
-                file_item.setIcon(0, icon)
+        # Get file extension
+        _, extension = os.path.splitext(file_path)
+
+        # Get icon with fallback
+        icon = self.get_file_icon(extension.lower())
+        if icon:
+            file_item.setIcon(0, icon)
+        return file_item
 
     def get_file_icon(self, file_type):
         """Get icon for file type with fallback"""
@@ -341,6 +345,57 @@ class WorkspaceOpsMixin:
             self.populate_workplace(self.project_dir)
             self.statusBar().showMessage("Workspace refreshed", 2000)
 
+    def update_workspace_item(self, file_path):
+        """Add a newly saved file to the workspace tree without rebuilding the whole tree."""
+        root_item = self.workplace_tree.topLevelItem(0)
+        if not self.project_dir or root_item is None:
+            return
+
+        file_path = os.path.normpath(file_path)
+        project_path = os.path.normpath(root_item.data(0, Qt.UserRole))
+        try:
+            relative_path = os.path.relpath(file_path, project_path)
+        except ValueError:
+            return  # Different drive on Windows
+        if relative_path.startswith(os.pardir):
+            return  # Not part of the project
+
+        parts = relative_path.split(os.sep)
+        if any(part.startswith('.') and part not in ['.gitignore', '.env', '.nuke', '.git'] for part in parts):
+            return  # Hidden in the tree anyway
+
+        parent_item = root_item
+        current_path = project_path
+        for folder_name in parts[:-1]:
+            current_path = os.path.join(current_path, folder_name)
+            parent_item = self._find_child_item(parent_item, current_path)
+            if parent_item is None:
+                # A new folder appeared as well; rebuild once
+                self.refresh_workspace()
+                return
+
+        if self._find_child_item(parent_item, file_path) is not None:
+            return  # Existing file, the tree is already correct
+
+        # Keep the folders-first, case-insensitive order used by add_items_to_tree
+        file_name = parts[-1].lower()
+        insert_index = parent_item.childCount()
+        for index in range(parent_item.childCount()):
+            child = parent_item.child(index)
+            child_path = child.data(0, Qt.UserRole)
+            if child_path and not os.path.isdir(child_path) and child.text(0).lower() > file_name:
+                insert_index = index
+                break
+        parent_item.insertChild(insert_index, self._make_file_item(file_path))
+
+    def _find_child_item(self, parent_item, path):
+        for index in range(parent_item.childCount()):
+            child = parent_item.child(index)
+            child_path = child.data(0, Qt.UserRole)
+            if child_path and os.path.normpath(child_path) == path:
+                return child
+        return None
+
     def workspace_new_file(self, item):
         """Create new file in workspace"""
         if not self.project_dir:
@@ -557,7 +612,7 @@ class WorkspaceOpsMixin:
                         if response == QMessageBox.Save:
                             tab_widget.setCurrentIndex(index)
                             self._set_active_tab_widget(tab_widget)
-                            if not self.save_file():
+                            if not self.save_file(blocking=True):
                                 return
 
         try:
@@ -837,21 +892,8 @@ class WorkspaceOpsMixin:
             print(f"Error: {file_path} dosyası bulunamadı!")
             return []
 
-        # Dosya içeriğini okuyor ve AST'ye dönüştürüyoruz
-        with open(file_path, 'r') as file:
-            file_content = file.read()
-        tree = ast.parse(file_content)
-        classes = []
-
-        # AST üzerinde gezinerek sınıf ve metodları buluyoruz
-        for node in ast.walk(tree):
-            if isinstance(node, ast.ClassDef):
-                class_name = node.name
-                # Sınıf içinde, __init__ gibi özel metodları filtreliyoruz
-                methods = [n.name for n in node.body if isinstance(n, ast.FunctionDef) and not n.name.startswith('__')]
-                classes.append((class_name, methods))
-
-        return classes
+        # AST sonucu dosya değişmediği sürece süreç genelinde önbellekte tutuluyor
+        return introspection.file_classes(file_path)
 
     def update_header_tree(self):
         """QPlainTextEdit içindeki metni analiz edip sınıf ve fonksiyonları HEADER'a ekler."""
@@ -875,6 +917,13 @@ class WorkspaceOpsMixin:
         if not hasattr(current_editor, 'toPlainText'):
             return
 
+        symbols = getattr(current_editor, "symbol_table", None)
+        if symbols is not None and getattr(current_editor, "large_file_mode", False):
+            # Parsing the whole file every few keystrokes is what large-file mode avoids;
+            # the symbol table already knows every def/class line.
+            self._add_symbol_table_items(symbols)
+            return
+
         code = current_editor.toPlainText()
 
         try:
@@ -885,6 +934,9 @@ class WorkspaceOpsMixin:
             error_item.setText(0, f"⚠ Syntax Error (line {getattr(e, 'lineno', '?')})")
             error_item.setForeground(0, QColor(255, 100, 100))
             error_item.setData(0, Qt.UserRole, getattr(e, 'lineno', None))
+            # Keep the definitions navigable while the code is half typed.
+            if symbols is not None:
+                self._add_symbol_table_items(symbols)
             return
 
         # Icon paths
@@ -923,6 +975,22 @@ class WorkspaceOpsMixin:
         # Expand all by default
         self.header_tree.expandAll()
 
+    def _add_symbol_table_items(self, symbols):
+        """List the def/class statements known to the editor's symbol table, flat."""
+        class_icon = QIcon(os.path.join(PathFromOS().icons_path, "C_logo.svg"))
+        def_icon = QIcon(os.path.join(PathFromOS().icons_path, "def.svg"))
+        for line, kind, name in symbols.definitions():
+            item = QTreeWidgetItem(self.header_tree)
+            item.setText(0, name)
+            item.setIcon(0, class_icon if kind == "class" else def_icon)
+            item.setData(0, Qt.UserRole, line + 1)
+            item.setData(0, Qt.UserRole + 1, "class" if kind == "class" else "function")
+            item.setData(0, Qt.UserRole + 2, name)
+            item.setForeground(0, QColor(100, 200, 255) if kind == "class" else QColor(180, 220, 180))
+            item.setSizeHint(0, QSize(200, 24))
+            item.setText(1, f":{line + 1}")
+            item.setForeground(1, QColor(120, 120, 120))
+
     def _make_bold_font(self):
         """Create bold font for headers."""
         font = QFont()
@@ -992,6 +1060,7 @@ class WorkspaceOpsMixin:
         class_item.setIcon(0, QIcon(class_icon_path))
         class_item.setData(0, Qt.UserRole, node.lineno)
         class_item.setData(0, Qt.UserRole + 1, "class")
+        class_item.setData(0, Qt.UserRole + 2, node.name)
         class_item.setForeground(0, QColor(100, 200, 255))
         class_item.setFont(0, self._make_bold_font())
         class_item.setSizeHint(0, QSize(200, 26))
@@ -1047,6 +1116,7 @@ class WorkspaceOpsMixin:
         method_item.setIcon(0, QIcon(def_icon_path))
         method_item.setData(0, Qt.UserRole, node.lineno)
         method_item.setData(0, Qt.UserRole + 1, "method")
+        method_item.setData(0, Qt.UserRole + 2, node.name)
         method_item.setForeground(0, color)
         method_item.setSizeHint(0, QSize(200, 24))
 
@@ -1075,6 +1145,7 @@ class WorkspaceOpsMixin:
         func_item.setIcon(0, QIcon(def_icon_path))
         func_item.setData(0, Qt.UserRole, node.lineno)
         func_item.setData(0, Qt.UserRole + 1, "function")
+        func_item.setData(0, Qt.UserRole + 2, node.name)
         func_item.setForeground(0, QColor(255, 200, 100) if is_async else QColor(180, 220, 180))
         func_item.setSizeHint(0, QSize(200, 24))
 
@@ -1096,6 +1167,19 @@ class WorkspaceOpsMixin:
             if not hasattr(current_editor, 'textCursor'):
                 return  # textCursor metodu yoksa çık
 
+            # The tree is rebuilt on a debounce; if lines moved since, follow the definition.
+            name = item.data(0, Qt.UserRole + 2)
+            symbols = getattr(current_editor, "symbol_table", None)
+            if name and symbols is not None:
+                defined_here = any(
+                    line == line_number - 1 and defined == name
+                    for line, _kind, defined in symbols.definitions()
+                )
+                if not defined_here:
+                    line = symbols.definition_line(name)
+                    if line >= 0:
+                        line_number = line + 1
+
             cursor = current_editor.textCursor()
             cursor.movePosition(QTextCursor.Start)
             cursor.movePosition(QTextCursor.Down, QTextCursor.MoveAnchor, line_number - 1)  # Satıra gitme
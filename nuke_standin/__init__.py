@@ -0,0 +1,76 @@
+"""
+Offline stand-in for Nuke's `nuke` and `nukescripts` modules.
+
+Built from the reference stubs in assets/, so the editor can be imported, exercised and
+profiled on a machine without Nuke:
+
+    import nuke_standin
+    nuke_standin.install(profile="heavy", script_nodes=2000)
+
+    import nuke
+    blur = nuke.createNode("Blur", "size 12")
+    print(blur["size"].value(), len(nuke.allNodes()))
+
+`install()` must run before anything imports `nuke`. Latencies can be changed at any
+time with `configure()`; see nuke_standin.latency for the operations and profiles.
+"""
+import sys
+
+from nuke_standin.latency import LATENCY_PROFILES, configure, current_latencies
+from nuke_standin.runtime import NUKE_VERSION, build_modules, populate
+
+__all__ = [
+    "LATENCY_PROFILES",
+    "NUKE_VERSION",
+    "configure",
+    "current_latencies",
+    "install",
+    "is_installed",
+    "populate",
+    "uninstall",
+]
+
+_installed = {}
+
+
+def install(profile=None, script_nodes=0, seed=0, **latencies):
+    """
+    Register the stand-in modules as `nuke` and `nukescripts`.
+
+    Does nothing if a real (or another) `nuke` module is already imported. `profile`
+    and `latencies` are passed to `configure()`; `script_nodes` pre-populates the
+    script with that many connected nodes. Returns a dict describing the installed
+    modules, e.g. for a benchmark report.
+    """
+    if "nuke" in sys.modules and not is_installed():
+        return {"source": "preloaded", "module": getattr(sys.modules["nuke"], "__file__", "")}
+
+    configure(profile, **latencies)
+    if not is_installed():
+        nuke, nukescripts, degraded = build_modules()
+        _installed.update(nuke=nuke, nukescripts=nukescripts)
+        sys.modules["nuke"] = nuke
+        sys.modules["nukescripts"] = nukescripts
+        _installed["degraded"] = degraded
+    if script_nodes:
+        populate(script_nodes, seed=seed)
+    return {
+        "source": "nuke_standin",
+        "version": sys.modules["nuke"].env["NukeVersionString"],
+        "latencies": current_latencies(),
+        "script_nodes": len(sys.modules["nuke"].allNodes()),
+        "degraded_classes": _installed["degraded"],
+    }
+
+
+def is_installed():
+    nuke = _installed.get("nuke")
+    return nuke is not None and sys.modules.get("nuke") is nuke
+
+
+def uninstall():
+    """Remove the stand-in modules from `sys.modules`."""
+    for name in ("nuke", "nukescripts"):
+        if name in _installed and sys.modules.get(name) is _installed[name]:
+            del sys.modules[name]
+    _installed.clear()
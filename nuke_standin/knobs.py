@@ -0,0 +1,450 @@
+"""
+Working knobs for the stand-in `nuke` module, and the knob sets of common node classes.
+
+The classes here are mixins: `loader.overlay_classes` puts them in front of the stub
+knob classes, so `nuke.Double_Knob` is still a subclass of `nuke.Knob` and keeps every
+stub method, but values can actually be read and written.
+"""
+from nuke_standin.latency import delay
+
+
+class KnobImpl:
+    """Value storage and the common `Knob` API."""
+    default = ""
+
+    def __new__(cls, *args, **kwargs):
+        return object.__new__(cls)
+
+    def __init__(self, name="", label=None, value=None):
+        self._name = name
+        self._label = label or ""
+        self._tooltip = ""
+        self._flags = 0
+        self._visible = True
+        self._enabled = True
+        self._node = None
+        self._value = self.coerce(self.default if value is None else value)
+
+    def __repr__(self):
+        return f"<{self.Class()} knob {self._name!r}>"
+
+    __str__ = __repr__
+
+    def coerce(self, value):
+        return value
+
+    def Class(self):
+        return type(self).__name__
+
+    def name(self):
+        return self._name
+
+    def label(self):
+        return self._label
+
+    def setLabel(self, label):
+        self._label = label
+
+    def tooltip(self):
+        return self._tooltip
+
+    def setTooltip(self, tooltip):
+        self._tooltip = tooltip
+
+    def flags(self):
+        return self._flags
+
+    def setFlag(self, flag):
+        self._flags |= flag
+
+    def clearFlag(self, flag):
+        self._flags &= ~flag
+
+    def getFlag(self, flag):
+        return bool(self._flags & flag)
+
+    def visible(self):
+        return self._visible
+
+    def setVisible(self, visible):
+        self._visible = bool(visible)
+
+    def enabled(self):
+        return self._enabled
+
+    def setEnabled(self, enabled):
+        self._enabled = bool(enabled)
+
+    def node(self):
+        return self._node
+
+    def value(self):
+        delay("knob_read")
+        return self._value
+
+    def getValue(self):
+        return self.value()
+
+    def setValue(self, value):
+        delay("knob_write")
+        self._value = self.coerce(value)
+        return True
+
+    def isAnimated(self):
+        return False
+
+    def hasExpression(self):
+        return False
+
+    def toScript(self):
+        return str(self._value)
+
+    def fromScript(self, text):
+        return self.setValue(text)
+
+
+class StringKnobImpl(KnobImpl):
+    def coerce(self, value):
+        return "" if value is None else str(value)
+
+    def getText(self):
+        return self.value()
+
+    def setText(self, text):
+        return self.setValue(text)
+
+
+class ArrayKnobImpl(KnobImpl):
+    """Numeric knobs; several values for XY, WH, colour and box knobs."""
+    default = 0.0
+
+    def coerce(self, value):
+        if isinstance(value, str):
+            parts = value.strip("{} ").split()
+            value = [float(part) for part in parts] if len(parts) > 1 else float(parts[0] if parts else 0)
+        if isinstance(value, (list, tuple)):
+            return [self.coerce_item(item) for item in value]
+        return self.coerce_item(value)
+
+    def coerce_item(self, value):
+        return float(value)
+
+    def arraySize(self):
+        return len(self._value) if isinstance(self._value, list) else 1
+
+    def value(self, index=None):
+        delay("knob_read")
+        if isinstance(self._value, list):
+            return list(self._value) if index is None else self._value[index]
+        return self._value
+
+    def setValue(self, value, index=None):
+        delay("knob_write")
+        if index is not None and isinstance(self._value, list):
+            self._value[index] = self.coerce_item(value)
+        else:
+            self._value = self.coerce(value)
+        return True
+
+    def toScript(self):
+        if isinstance(self._value, list):
+            return "{" + " ".join(f"{item:g}" for item in self._value) + "}"
+        return f"{self._value:g}"
+
+
+class IntKnobImpl(ArrayKnobImpl):
+    default = 0
+
+    def coerce_item(self, value):
+        return int(float(value))
+
+
+class BooleanKnobImpl(ArrayKnobImpl):
+    default = False
+
+    def coerce_item(self, value):
+        if isinstance(value, str):
+            return value.strip().lower() not in ("", "0", "false")
+        return bool(value)
+
+    def toScript(self):
+        return "true" if self._value else "false"
+
+
+class EnumerationKnobImpl(KnobImpl):
+    """`value()` is the current item, `getValue()` its index."""
+
+    def __init__(self, name="", label=None, values=(), value=None):
+        self._values = [str(item) for item in values]
+        super().__init__(name, label, value if value is not None else (self._values[0] if self._values else ""))
+
+    def coerce(self, value):
+        if isinstance(value, (int, float)) and not isinstance(value, bool) and self._values:
+            return self._values[int(value)]
+        value = str(value)
+        if self._values and value not in self._values:
+            raise ValueError(f"Bad value for {self._name}: {value}")
+        return value
+
+    def values(self):
+        return list(self._values)
+
+    def setValues(self, values):
+        self._values = [str(item) for item in values]
+
+    def numValues(self):
+        return len(self._values)
+
+    def enumName(self, index):
+        return self._values[index]
+
+    def getValue(self):
+        delay("knob_read")
+        return float(self._values.index(self._value)) if self._value in self._values else 0.0
+
+
+KNOB_IMPLEMENTATIONS = {
+    "Knob": KnobImpl,
+    "String_Knob": StringKnobImpl,
+    "Array_Knob": ArrayKnobImpl,
+    "Int_Knob": IntKnobImpl,
+    "Unsigned_Knob": IntKnobImpl,
+    "Boolean_Knob": BooleanKnobImpl,
+    "Enumeration_Knob": EnumerationKnobImpl,
+}
+
+# Knob specs are (name, knob class, default) or (name, "Enumeration_Knob", default, values).
+FILTERS = ("impulse", "cubic", "keys", "simon", "rifman", "mitchell", "parzen", "notch", "lanczos4", "lanczos6", "sinc4")
+MERGE_OPERATIONS = (
+    "atop", "average", "color-burn", "color-dodge", "conjoint-over", "copy", "difference",
+    "disjoint-over", "divide", "exclusion", "from", "geometric", "hard-light", "hypot", "in",
+    "mask", "matte", "max", "min", "minus", "multiply", "out", "over", "overlay", "plus",
+    "screen", "soft-light", "stencil", "under", "xor",
+)
+COLORSPACES = ("default", "linear", "sRGB", "rec709", "Cineon", "Gamma1.8", "Gamma2.2", "Panalog", "REDLog", "ViperLog", "AlexaV3LogC")
+
+COMMON_KNOBS = (
+    ("name", "String_Knob", ""),
+    ("label", "Multiline_Eval_String_Knob", ""),
+    ("note_font", "Font_Knob", "Verdana"),
+    ("note_font_size", "Int_Knob", 11),
+    ("note_font_color", "ColorChip_Knob", 0),
+    ("selected", "Boolean_Knob", False),
+    ("xpos", "Int_Knob", 0),
+    ("ypos", "Int_Knob", 0),
+    ("hide_input", "Boolean_Knob", False),
+    ("cached", "Boolean_Knob", False),
+    ("disable", "Disable_Knob", False),
+    ("dope_sheet", "Boolean_Knob", False),
+    ("bookmark", "Boolean_Knob", False),
+    ("postage_stamp", "Boolean_Knob", False),
+    ("lifetimeStart", "Int_Knob", 0),
+    ("lifetimeEnd", "Int_Knob", 100),
+    ("useLifetime", "Boolean_Knob", False),
+    ("tile_color", "ColorChip_Knob", 0),
+    ("gl_color", "ColorChip_Knob", 0),
+    ("icon", "File_Knob", ""),
+)
+MASK_KNOBS = (
+    ("maskChannelMask", "Channel_Knob", "none"),
+    ("maskChannelInput", "Channel_Knob", "none"),
+    ("inject", "Boolean_Knob", False),
+    ("invert_mask", "Boolean_Knob", False),
+    ("fringe", "Boolean_Knob", False),
+    ("mix", "Double_Knob", 1.0),
+)
+CHANNELS = (("channels", "ChannelMask_Knob", "rgba"),)
+
+NODE_KNOBS = {
+    "Blur": CHANNELS + (
+        ("size", "WH_Knob", [0.0, 0.0]),
+        ("filter", "Enumeration_Knob", "gaussian", ("box", "triangle", "quadratic", "gaussian")),
+        ("quality", "Int_Knob", 15),
+        ("crop", "Boolean_Knob", True),
+    ) + MASK_KNOBS,
+    "Grade": CHANNELS + (
+        ("blackpoint", "AColor_Knob", [0.0, 0.0, 0.0, 0.0]),
+        ("whitepoint", "AColor_Knob", [1.0, 1.0, 1.0, 1.0]),
+        ("black", "AColor_Knob", [0.0, 0.0, 0.0, 0.0]),
+        ("white", "AColor_Knob", [1.0, 1.0, 1.0, 1.0]),
+        ("multiply", "AColor_Knob", [1.0, 1.0, 1.0, 1.0]),
+        ("add", "AColor_Knob", [0.0, 0.0, 0.0, 0.0]),
+        ("gamma", "AColor_Knob", [1.0, 1.0, 1.0, 1.0]),
+        ("reverse", "Boolean_Knob", False),
+        ("black_clamp", "Boolean_Knob", True),
+        ("white_clamp", "Boolean_Knob", False),
+        ("unpremult", "Channel_Knob", "none"),
+        ("invert_unpremult", "Boolean_Knob", False),
+    ) + MASK_KNOBS,
+    "ColorCorrect": CHANNELS + (
+        ("saturation", "AColor_Knob", [1.0, 1.0, 1.0, 1.0]),
+        ("contrast", "AColor_Knob", [1.0, 1.0, 1.0, 1.0]),
+        ("gamma", "AColor_Knob", [1.0, 1.0, 1.0, 1.0]),
+        ("gain", "AColor_Knob", [1.0, 1.0, 1.0, 1.0]),
+        ("offset", "AColor_Knob", [0.0, 0.0, 0.0, 0.0]),
+        ("shadows.saturation", "AColor_Knob", [1.0, 1.0, 1.0, 1.0]),
+        ("shadows.gain", "AColor_Knob", [1.0, 1.0, 1.0, 1.0]),
+        ("midtones.saturation", "AColor_Knob", [1.0, 1.0, 1.0, 1.0]),
+        ("midtones.gain", "AColor_Knob", [1.0, 1.0, 1.0, 1.0]),
+        ("highlights.saturation", "AColor_Knob", [1.0, 1.0, 1.0, 1.0]),
+        ("highlights.gain", "AColor_Knob", [1.0, 1.0, 1.0, 1.0]),
+        ("unpremult", "Channel_Knob", "none"),
+    ) + MASK_KNOBS,
+    "Merge2": (
+        ("operation", "Enumeration_Knob", "over", MERGE_OPERATIONS),
+        ("bbox", "Enumeration_Knob", "union", ("union", "intersection", "A", "B")),
+        ("metainput", "Enumeration_Knob", "All", ("All", "A", "B")),
+        ("Achannels", "ChannelMask_Knob", "rgba"),
+        ("Bchannels", "ChannelMask_Knob", "rgba"),
+        ("output", "ChannelMask_Knob", "rgba"),
+        ("also_merge", "ChannelMask_Knob", "none"),
+        ("screen_alpha", "Boolean_Knob", False),
+    ) + MASK_KNOBS,
+    "Transform": (
+        ("translate", "XY_Knob", [0.0, 0.0]),
+        ("rotate", "Double_Knob", 0.0),
+        ("scale", "Scale_Knob", [1.0, 1.0]),
+        ("skewX", "Double_Knob", 0.0),
+        ("skewY", "Double_Knob", 0.0),
+        ("skew_order", "Enumeration_Knob", "XY", ("XY", "YX")),
+        ("center", "XY_Knob", [960.0, 540.0]),
+        ("invert_matrix", "Boolean_Knob", False),
+        ("filter", "Enumeration_Knob", "cubic", FILTERS),
+        ("clamp", "Boolean_Knob", False),
+        ("black_outside", "Boolean_Knob", True),
+        ("motionblur", "Double_Knob", 0.0),
+        ("shutter", "Double_Knob", 0.5),
+        ("shutteroffset", "Enumeration_Knob", "start", ("centred", "start", "end", "custom")),
+    ),
+    "Read": (
+        ("file", "File_Knob", ""),
+        ("proxy", "File_Knob", ""),
+        ("format", "Format_Knob", "HD_1080"),
+        ("first", "Int_Knob", 1),
+        ("last", "Int_Knob", 1),
+        ("before", "Enumeration_Knob", "hold", ("hold", "loop", "bounce", "black")),
+        ("after", "Enumeration_Knob", "hold", ("hold", "loop", "bounce", "black")),
+        ("origfirst", "Int_Knob", 1),
+        ("origlast", "Int_Knob", 1),
+        ("frame_mode", "Enumeration_Knob", "expression", ("expression", "start at", "offset")),
+        ("frame", "String_Knob", ""),
+        ("colorspace", "Enumeration_Knob", "default", COLORSPACES),
+        ("premultiplied", "Boolean_Knob", False),
+        ("raw", "Boolean_Knob", False),
+        ("auto_alpha", "Boolean_Knob", False),
+        ("on_error", "Enumeration_Knob", "error", ("error", "black", "checkerboard", "nearest frame")),
+    ),
+    "Write": (
+        ("channels", "ChannelMask_Knob", "rgb"),
+        ("file", "File_Knob", ""),
+        ("proxy", "File_Knob", ""),
+        ("file_type", "Enumeration_Knob", "exr", ("exr", "dpx", "jpeg", "mov", "png", "tiff")),
+        ("colorspace", "Enumeration_Knob", "default", COLORSPACES),
+        ("premultiplied", "Boolean_Knob", False),
+        ("raw", "Boolean_Knob", False),
+        ("views", "OneView_Knob", "main", ("main",)),
+        ("create_directories", "Boolean_Knob", False),
+        ("render_order", "Int_Knob", 1),
+        ("first", "Int_Knob", 1),
+        ("last", "Int_Knob", 100),
+        ("use_limit", "Boolean_Knob", False),
+        ("reading", "Boolean_Knob", False),
+        ("checkHashOnRead", "Boolean_Knob", False),
+        ("on_error", "Enumeration_Knob", "error", ("error", "black", "checkerboard", "nearest frame")),
+    ),
+    "Roto": (
+        ("output", "ChannelMask_Knob", "alpha"),
+        ("premultiply", "ChannelMask_Knob", "none"),
+        ("cliptype", "Enumeration_Knob", "bbox", ("no clip", "bbox", "format", "union bbox+format")),
+        ("replace", "Boolean_Knob", False),
+        ("invert", "Boolean_Knob", False),
+        ("format", "Format_Knob", "HD_1080"),
+        ("motionblur", "Double_Knob", 0.0),
+        ("curves", "String_Knob", ""),
+    ),
+    "Defocus": CHANNELS + (
+        ("defocus", "Double_Knob", 1.0),
+        ("ratio", "Double_Knob", 1.0),
+        ("scale", "Double_Knob", 1.0),
+        ("quality", "Int_Knob", 10),
+        ("method", "Enumeration_Knob", "accurate", ("fast", "accurate")),
+    ) + MASK_KNOBS,
+    "Shuffle2": (
+        ("in1", "Channel_Knob", "rgba"),
+        ("in2", "Channel_Knob", "none"),
+        ("out1", "Channel_Knob", "rgba"),
+        ("out2", "Channel_Knob", "none"),
+        ("fromInput1", "Enumeration_Knob", "B", ("B", "A")),
+        ("fromInput2", "Enumeration_Knob", "B", ("B", "A")),
+    ),
+    "Crop": (
+        ("box", "BBox_Knob", [0.0, 0.0, 1920.0, 1080.0]),
+        ("softness", "Double_Knob", 0.0),
+        ("reformat", "Boolean_Knob", False),
+        ("intersect", "Boolean_Knob", False),
+        ("crop", "Boolean_Knob", True),
+    ),
+    "Reformat": (
+        ("type", "Enumeration_Knob", "to format", ("to format", "to box", "scale")),
+        ("format", "Format_Knob", "HD_1080"),
+        ("scale", "WH_Knob", [1.0, 1.0]),
+        ("resize", "Enumeration_Knob", "width", ("none", "width", "height", "fit", "fill", "distort")),
+        ("center", "Boolean_Knob", True),
+        ("flip", "Boolean_Knob", False),
+        ("flop", "Boolean_Knob", False),
+        ("turn", "Boolean_Knob", False),
+        ("black_outside", "Boolean_Knob", False),
+        ("pbb", "Boolean_Knob", False),
+        ("filter", "Enumeration_Knob", "cubic", FILTERS),
+    ),
+    "Constant": (
+        ("channels", "ChannelMask_Knob", "rgba"),
+        ("color", "AColor_Knob", [0.0, 0.0, 0.0, 0.0]),
+        ("format", "Format_Knob", "HD_1080"),
+        ("first", "Int_Knob", 1),
+        ("last", "Int_Knob", 1),
+    ),
+    "Switch": (("which", "Double_Knob", 0.0),),
+    "TimeOffset": (
+        ("time_offset", "Int_Knob", 0),
+        ("reverse_input", "Boolean_Knob", False),
+    ),
+    "Dot": (),
+    "NoOp": (),
+    "Group": (),
+    "BackdropNode": (
+        ("bdwidth", "Int_Knob", 300),
+        ("bdheight", "Int_Knob", 200),
+        ("z_order", "Double_Knob", 0.0),
+        ("appearance", "Enumeration_Knob", "Fill", ("Fill", "Border")),
+    ),
+}
+# Classes without a table entry get a typical channels + mask layout.
+DEFAULT_KNOBS = CHANNELS + MASK_KNOBS
+ROOT_KNOBS = (
+    ("name", "File_Knob", ""),
+    ("project_directory", "String_Knob", ""),
+    ("frame", "Int_Knob", 1),
+    ("first_frame", "Int_Knob", 1),
+    ("last_frame", "Int_Knob", 100),
+    ("lock_range", "Boolean_Knob", False),
+    ("fps", "Double_Knob", 24.0),
+    ("format", "Format_Knob", "HD_1080"),
+    ("proxy", "Boolean_Knob", False),
+    ("colorManagement", "Enumeration_Knob", "Nuke", ("Nuke", "OCIO")),
+    ("OCIO_config", "Enumeration_Knob", "nuke-default", ("nuke-default", "aces_1.2", "custom")),
+)
+
+
+def knob_specs(node_class):
+    """The knob specs of a new `node_class` node: its own knobs, then the node tab."""
+    return tuple(NODE_KNOBS.get(node_class, DEFAULT_KNOBS)) + COMMON_KNOBS
+
+
+def make_knob(module, spec):
+    """Instantiate the knob described by `spec` from `module`'s knob classes."""
+    name, class_name, default = spec[:3]
+    knob_class = getattr(module, class_name, None) or module.Knob
+    if issubclass(knob_class, EnumerationKnobImpl):
+        return knob_class(name, values=spec[3] if len(spec) > 3 else (), value=default)
+    return knob_class(name, value=default)
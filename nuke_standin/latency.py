@@ -0,0 +1,57 @@
+"""
+Artificial latencies for the stand-in `nuke` API.
+
+Inside Nuke, calls such as `createNode` or `allNodes` cost far more than a dict lookup
+once a script holds thousands of nodes. Each stand-in entry point calls `delay()` with
+its operation name, which sleeps for the configured number of seconds, so code can be
+load-tested against something closer to a heavy production script.
+"""
+import os
+import time
+
+LATENCY_PROFILES = {
+    "none": {},
+    # Rough timings of a comp with a few thousand nodes on a workstation.
+    "heavy": {
+        "createNode": 0.015,
+        "node_constructor": 0.010,
+        "delete": 0.004,
+        "allNodes": 0.002,
+        "allNodes_per_node": 0.00002,
+        "toNode": 0.0005,
+        "knob_read": 0.00005,
+        "knob_write": 0.0002,
+        "executeInMainThread": 0.002,
+        "pluginPath": 0.001,
+    },
+}
+PROFILE_ENV_VAR = "NUKE_STANDIN_PROFILE"
+
+_latencies = {}
+
+
+def configure(profile=None, **latencies):
+    """
+    Set the latencies in seconds, per operation.
+
+    `profile` names an entry of LATENCY_PROFILES to start from (default: the
+    NUKE_STANDIN_PROFILE environment variable, else "none"); keyword arguments
+    override single operations, e.g. `configure("heavy", createNode=0.1)`.
+    """
+    if profile is None:
+        profile = os.environ.get(PROFILE_ENV_VAR) or "none"
+    if profile not in LATENCY_PROFILES:
+        raise ValueError(f"Unknown latency profile: {profile!r}")
+    _latencies.clear()
+    _latencies.update(LATENCY_PROFILES[profile])
+    _latencies.update(latencies)
+
+
+def current_latencies():
+    return dict(_latencies)
+
+
+def delay(operation, count=1):
+    seconds = _latencies.get(operation, 0.0) * count
+    if seconds > 0:
+        time.sleep(seconds)
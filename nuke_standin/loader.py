@@ -0,0 +1,87 @@
+"""
+Turn the reference stubs in assets/ into importable modules.
+
+The stubs are generated API listings rather than real modules: some classes are
+declared before their base class and a few derive from names the stub never defines
+(Qt classes, `threading` internals). They are executed one top-level statement at a
+time, statements that hit a NameError are retried once the rest of the module exists,
+and classes whose bases still cannot be resolved are kept with `object` as their base
+so their methods stay introspectable.
+"""
+import ast
+import types
+
+
+def load_stub_module(name, path):
+    """
+    Execute the stub at `path` into a new module called `name`.
+
+    Returns (module, degraded), where `degraded` names the classes that lost their
+    unresolvable base classes.
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        source = file.read()
+
+    module = types.ModuleType(name)
+    module.__file__ = path
+    pending = ast.parse(source, path).body
+    degraded = []
+    while pending:
+        deferred = []
+        for node in pending:
+            try:
+                _exec_statement(node, path, module)
+            except NameError:
+                deferred.append(node)
+        if len(deferred) == len(pending):
+            # Nothing resolved this pass, so a base is missing from the stub altogether.
+            stuck = next((node for node in deferred if isinstance(node, ast.ClassDef) and node.bases), None)
+            if stuck is None:
+                break
+            deferred.remove(stuck)
+            stuck.bases = []
+            try:
+                _exec_statement(stuck, path, module)
+                degraded.append(stuck.name)
+            except NameError:
+                pass
+        pending = deferred
+    return module, degraded
+
+
+def _exec_statement(node, path, module):
+    code = compile(ast.Module(body=[node], type_ignores=[]), path, "exec")
+    exec(code, module.__dict__)
+
+
+def overlay_classes(module, root_name, implementations):
+    """
+    Give the stub class `root_name` and all its subclasses in `module` working behaviour.
+
+    Each class is rebuilt as a subclass of its stub, with the implementation mixin
+    registered under its name (if any) and the rebuilt parent in front, so the
+    implementations win over the empty stub methods while every stub method and
+    docstring stays available for introspection. The rebuilt classes replace the stubs
+    in `module`; returns them by name.
+    """
+    stub_root = getattr(module, root_name)
+    stub_classes = [
+        value for value in vars(module).values()
+        if isinstance(value, type) and issubclass(value, stub_root)
+    ]
+    # Parents before children.
+    stub_classes.sort(key=lambda cls: len(cls.__mro__))
+
+    rebuilt = {}
+    for stub in stub_classes:
+        bases = []
+        if stub.__name__ in implementations:
+            bases.append(implementations[stub.__name__])
+        parent = next((base for base in stub.__bases__ if base in rebuilt), None)
+        if parent is not None:
+            bases.append(rebuilt[parent])
+        bases.append(stub)
+        cls = type(stub.__name__, tuple(bases), {"__module__": module.__name__, "__doc__": stub.__doc__})
+        rebuilt[stub] = cls
+        setattr(module, stub.__name__, cls)
+    return {cls.__name__: cls for cls in rebuilt.values()}
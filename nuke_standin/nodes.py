@@ -0,0 +1,222 @@
+"""
+Working nodes for the stand-in `nuke` module.
+
+Like the knobs, these are mixins that `loader.overlay_classes` puts in front of the stub
+`Node` class and its subclasses (`Group`, `Root`, `Viewer`, ...).
+"""
+from nuke_standin.latency import delay
+
+
+class NodeImpl:
+    """Knobs, inputs and DAG position of one node."""
+
+    def __new__(cls, *args, **kwargs):
+        return object.__new__(cls)
+
+    def __init__(self, node_class="", knobs=(), group=None):
+        self._class = node_class or type(self).__name__
+        self._knobs = {}
+        self._inputs = []
+        self._group = group
+        for knob in knobs:
+            self.addKnob(knob)
+
+    def __repr__(self):
+        return f"<{self._class} node {self.name()!r}>"
+
+    __str__ = __repr__
+    __reduce_ex__ = object.__reduce_ex__
+
+    def __len__(self):
+        return len(self._knobs)
+
+    def __getitem__(self, name):
+        knob = self._knobs.get(name)
+        if knob is None:
+            raise NameError(f"knob {name} does not exist")
+        return knob
+
+    def __contains__(self, name):
+        return name in self._knobs
+
+    def Class(self):
+        return self._class
+
+    def name(self):
+        knob = self._knobs.get("name")
+        return knob._value if knob is not None else ""
+
+    def setName(self, name, uncollide=True, updateExpressions=False):
+        self["name"].setValue(name)
+
+    def fullName(self):
+        parent = self._group
+        if parent is None or parent._group is None:
+            return self.name()
+        return f"{parent.fullName()}.{self.name()}"
+
+    def knob(self, name):
+        return self._knobs.get(name)
+
+    def knobs(self):
+        return dict(self._knobs)
+
+    def allKnobs(self):
+        return list(self._knobs.values())
+
+    def numKnobs(self):
+        return len(self._knobs)
+
+    def addKnob(self, knob):
+        knob._node = self
+        self._knobs[knob.name()] = knob
+
+    def removeKnob(self, knob):
+        self._knobs.pop(knob.name(), None)
+        knob._node = None
+
+    def writeKnobs(self, flags=0):
+        return "\n".join(f"{name} {knob.toScript()}" for name, knob in self._knobs.items())
+
+    def readKnobs(self, text):
+        for line in text.splitlines():
+            name, _, value = line.strip().partition(" ")
+            if name in self._knobs:
+                self._knobs[name].fromScript(value)
+
+    def input(self, index):
+        return self._inputs[index] if index < len(self._inputs) else None
+
+    def inputs(self):
+        return len(self._inputs)
+
+    def maxInputs(self):
+        return 10000 if self._class in ("Merge2", "Switch") else 1
+
+    def setInput(self, index, node):
+        while len(self._inputs) <= index:
+            self._inputs.append(None)
+        self._inputs[index] = node
+        while self._inputs and self._inputs[-1] is None:
+            self._inputs.pop()
+        return True
+
+    def connectInput(self, index, node):
+        return self.setInput(index, node)
+
+    def dependencies(self, what=None):
+        return [node for node in self._inputs if node is not None]
+
+    def dependent(self, what=None, forceEvaluate=True):
+        group = self._group
+        siblings = group._children if group is not None else []
+        return [node for node in siblings if self in node._inputs]
+
+    def xpos(self):
+        return self["xpos"]._value
+
+    def ypos(self):
+        return self["ypos"]._value
+
+    def setXpos(self, x):
+        self["xpos"].setValue(x)
+
+    def setYpos(self, y):
+        self["ypos"].setValue(y)
+
+    def setXYpos(self, x, y):
+        self["xpos"].setValue(x)
+        self["ypos"].setValue(y)
+
+    def screenWidth(self):
+        return 80
+
+    def screenHeight(self):
+        return 18
+
+    def isSelected(self):
+        knob = self._knobs.get("selected")
+        return bool(knob._value) if knob is not None else False
+
+    def setSelected(self, selected):
+        knob = self._knobs.get("selected")
+        if knob is not None:
+            knob.setValue(selected)
+
+    def parent(self):
+        return self._group
+
+    def error(self):
+        return False
+
+    def hasError(self):
+        return False
+
+    def showControlPanel(self, forceFloat=False):
+        pass
+
+    def hideControlPanel(self):
+        pass
+
+    def shown(self):
+        return False
+
+    def firstFrame(self):
+        knob = self._knobs.get("first")
+        return knob._value if knob is not None else 1
+
+    def lastFrame(self):
+        knob = self._knobs.get("last")
+        return knob._value if knob is not None else 100
+
+
+class GroupImpl(NodeImpl):
+    """A node that holds other nodes; `with group:` makes it the current group."""
+
+    def __init__(self, node_class="", knobs=(), group=None):
+        super().__init__(node_class, knobs, group)
+        self._children = []
+
+    def __enter__(self):
+        from nuke_standin import runtime
+        runtime.enter_group(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        from nuke_standin import runtime
+        runtime.exit_group(self)
+        return False
+
+    def begin(self):
+        return self.__enter__()
+
+    def end(self):
+        self.__exit__(None, None, None)
+
+    def nodes(self):
+        delay("allNodes")
+        return list(self._children)
+
+    def node(self, name):
+        return next((node for node in self._children if node.name() == name), None)
+
+    def numNodes(self):
+        return len(self._children)
+
+    def selectedNodes(self):
+        return [node for node in self._children if node.isSelected()]
+
+
+class RootImpl(GroupImpl):
+    def name(self):
+        return "Root"
+
+    def fullName(self):
+        return "root"
+
+
+NODE_IMPLEMENTATIONS = {
+    "Node": NodeImpl,
+    "Group": GroupImpl,
+    "Root": RootImpl,
+}
@@ -0,0 +1,384 @@
+"""
+The stand-in `nuke` and `nukescripts` modules.
+
+`build_modules()` loads the stubs from assets/, rebuilds their knob and node classes
+with working behaviour and replaces the script-level functions the editor relies on
+(`createNode`, `nuke.nodes`, `allNodes`, `toNode`, `delete`, `root`, `pluginPath`,
+`env`, `executeInMainThreadWithResult`, ...) with versions backed by an in-memory node
+graph. Everything else keeps the stub's signature and docstring and returns None.
+"""
+import os
+import platform
+import random
+import re
+import sys
+import threading
+
+from nuke_standin.knobs import KNOB_IMPLEMENTATIONS, ROOT_KNOBS, knob_specs, make_knob
+from nuke_standin.latency import delay
+from nuke_standin.loader import load_stub_module, overlay_classes
+from nuke_standin.nodes import NODE_IMPLEMENTATIONS
+
+NUKE_VERSION = (15, 1, 1)
+_TCL_TOKEN_RE = re.compile(r'\{([^{}]*)\}|"((?:[^"\\]|\\.)*)"|(\S+)')
+
+_nuke = None
+_root = None
+_group_stack = []
+_name_counters = {}
+_plugin_paths = []
+# Serializes calls that Nuke would run on its main thread.
+_main_thread_lock = threading.RLock()
+
+
+def _stub_root():
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(project_root, "assets")
+
+
+def build_modules():
+    """Create the stand-in modules; returns (nuke, nukescripts, degraded class names)."""
+    global _nuke
+    assets = _stub_root()
+    nuke, degraded = load_stub_module("nuke", os.path.join(assets, "nuke.py"))
+    nukescripts, nukescripts_degraded = load_stub_module("nukescripts", os.path.join(assets, "nukescripts.py"))
+
+    overlay_classes(nuke, "Knob", KNOB_IMPLEMENTATIONS)
+    overlay_classes(nuke, "Node", NODE_IMPLEMENTATIONS)
+    node_classes = sorted(name for name in vars(nuke.nodes) if not name.startswith("_"))
+    nuke.nodes = NodeConstructors(node_classes)
+    nuke.env = _environment()
+    nuke.GUI = False
+    for function in _API:
+        stub = getattr(nuke, function.__name__, None)
+        function.__doc__ = getattr(stub, "__doc__", None) or function.__doc__
+        setattr(nuke, function.__name__, function)
+
+    _nuke = nuke
+    _plugin_paths[:] = _default_plugin_paths()
+    scriptClear()
+    return nuke, nukescripts, {"nuke": degraded, "nukescripts": nukescripts_degraded}
+
+
+def _environment():
+    major, minor, release = NUKE_VERSION
+    system = platform.system()
+    return {
+        "NukeVersionMajor": major,
+        "NukeVersionMinor": minor,
+        "NukeVersionRelease": release,
+        "NukeVersionPhase": "",
+        "NukeVersionPhaseNumber": 0,
+        "NukeVersionDate": "",
+        "NukeVersionString": f"{major}.{minor}v{release}",
+        "ExecutablePath": sys.executable,
+        "ExternalPython": True,
+        "PluginExtension": {"Windows": "dll", "Darwin": "dylib"}.get(system, "so"),
+        "LINUX": system == "Linux",
+        "MACOS": system == "Darwin",
+        "WIN32": system == "Windows",
+        "64bit": sys.maxsize > 2 ** 32,
+        "gui": False,
+        "nc": False,
+        "nukex": False,
+        "studio": False,
+        "indie": False,
+        "hiero": False,
+        "assist": False,
+        "ple": False,
+        "numCPUs": os.cpu_count() or 1,
+        "threads": os.cpu_count() or 1,
+    }
+
+
+def _default_plugin_paths():
+    paths = [path for path in os.environ.get("NUKE_PATH", "").split(os.pathsep) if path]
+    paths.append(os.path.join(os.path.expanduser("~"), ".nuke"))
+    return paths
+
+
+class NodeConstructors:
+    """`nuke.nodes`: one constructor per node class known to the stub."""
+
+    def __init__(self, node_classes):
+        self._classes = tuple(node_classes)
+        for node_class in self._classes:
+            setattr(self, node_class, _node_constructor(node_class))
+
+    def __dir__(self):
+        return list(self._classes)
+
+    def __contains__(self, node_class):
+        return node_class in self._classes
+
+
+def _node_constructor(node_class):
+    def constructor(**knobs):
+        delay("node_constructor")
+        inputs = knobs.pop("inputs", ())
+        node = _create(node_class)
+        for index, upstream in enumerate(inputs):
+            node.setInput(index, upstream)
+        for name, value in knobs.items():
+            node[name].setValue(value)
+        return node
+    constructor.__name__ = constructor.__qualname__ = node_class
+    constructor.__doc__ = f"{node_class}(**kwargs) -> Node. Create a {node_class} node, setting knobs from the keyword arguments."
+    return constructor
+
+
+def _current_group():
+    return _group_stack[-1] if _group_stack else _root
+
+
+def enter_group(group):
+    _group_stack.append(group)
+
+
+def exit_group(group):
+    if _group_stack and _group_stack[-1] is group:
+        _group_stack.pop()
+
+
+def _unique_name(node_class, group):
+    existing = {node.name() for node in group._children}
+    base = re.sub(r"\d+$", "", node_class) or node_class
+    counter = _name_counters.get(base, 0)
+    while True:
+        counter += 1
+        name = f"{base}{counter}"
+        if name not in existing:
+            _name_counters[base] = counter
+            return name
+
+
+def _create(node_class):
+    group = _current_group()
+    node_type = getattr(_nuke, node_class, None)
+    if not (isinstance(node_type, type) and issubclass(node_type, _nuke.Node)):
+        node_type = _nuke.Group if node_class in ("Group", "Gizmo", "LiveGroup") else _nuke.Node
+    node = node_type(node_class, [make_knob(_nuke, spec) for spec in knob_specs(node_class)], group)
+    node["name"].setValue(_unique_name(node_class, group))
+    group._children.append(node)
+    return node
+
+
+def _tcl_pairs(args):
+    values = [brace or quoted or bare for brace, quoted, bare in _TCL_TOKEN_RE.findall(args or "")]
+    return list(zip(values[::2], values[1::2]))
+
+
+# Replacements for the stub's script-level functions; each keeps the stub's docstring.
+
+def createNode(node, args="", inpanel=True):
+    delay("createNode")
+    if node not in _nuke.nodes:
+        raise RuntimeError(f"{node}: unknown command")
+    group = _current_group()
+    selected = [candidate for candidate in group._children if candidate.isSelected()]
+    created = _create(node)
+    if selected:
+        upstream = selected[-1]
+        created.setInput(0, upstream)
+        created.setXYpos(upstream.xpos(), upstream.ypos() + 60)
+        for candidate in selected:
+            candidate.setSelected(False)
+    created.setSelected(True)
+    for name, value in _tcl_pairs(args):
+        if name in created:
+            created[name].fromScript(value)
+    return created
+
+
+def allNodes(filter=None, group=None, recurseGroups=False):
+    if group is None:
+        group = _current_group()
+    found = []
+    pending = list(group._children)
+    for node in pending:
+        if filter is None or node.Class() == filter:
+            found.append(node)
+        if recurseGroups and hasattr(node, "_children"):
+            pending.extend(node._children)
+    delay("allNodes")
+    delay("allNodes_per_node", len(found))
+    return found
+
+
+def toNode(s):
+    delay("toNode")
+    group = _current_group()
+    node = group
+    for part in s.split("."):
+        if part == "root" and node is _root:
+            continue
+        children = getattr(node, "_children", ())
+        node = next((child for child in children if child.name() == part), None)
+        if node is None:
+            return None
+    return node
+
+
+def selectedNode():
+    selected = selectedNodes()
+    if not selected:
+        raise ValueError("no node selected")
+    return selected[-1]
+
+
+def selectedNodes(filter=None):
+    return [node for node in _current_group()._children
+            if node.isSelected() and (filter is None or node.Class() == filter)]
+
+
+def selectAll():
+    for node in _current_group()._children:
+        node.setSelected(True)
+
+
+def clearSelection():
+    for node in _current_group()._children:
+        node.setSelected(False)
+
+
+def delete(node):
+    delay("delete")
+    group = node._group or _root
+    if node in group._children:
+        group._children.remove(node)
+    for other in group._children:
+        for index, upstream in enumerate(other._inputs):
+            if upstream is node:
+                other._inputs[index] = None
+    node._group = None
+
+
+def root():
+    return _root
+
+
+def thisGroup():
+    return _current_group()
+
+
+def thisNode():
+    return _current_group()
+
+
+def scriptClear():
+    global _root
+    _group_stack.clear()
+    _name_counters.clear()
+    _root = _nuke.Root("Root", [make_knob(_nuke, spec) for spec in ROOT_KNOBS], None)
+
+
+def scriptName():
+    name = _root["name"].value()
+    if not name:
+        raise RuntimeError("no script name set")
+    return name
+
+
+def pluginPath():
+    delay("pluginPath")
+    return list(_plugin_paths)
+
+
+def pluginAddPath(args, addToSysPath=True):
+    paths = args if isinstance(args, (list, tuple)) else [args]
+    for path in reversed(paths):
+        if path in _plugin_paths:
+            _plugin_paths.remove(path)
+        _plugin_paths.insert(0, path)
+        if addToSysPath and path not in sys.path:
+            sys.path.insert(0, path)
+
+
+def pluginAppendPath(args, addToSysPath=True):
+    paths = args if isinstance(args, (list, tuple)) else [args]
+    for path in paths:
+        if path not in _plugin_paths:
+            _plugin_paths.append(path)
+        if addToSysPath and path not in sys.path:
+            sys.path.append(path)
+
+
+def executeInMainThreadWithResult(call, args=(), kwargs=None):
+    # There is no second thread to hand over to; calls are serialized instead, and each
+    # pays the configured round-trip latency.
+    delay("executeInMainThread")
+    if not isinstance(args, tuple):
+        args = (args,)
+    with _main_thread_lock:
+        return call(*args, **(kwargs or {}))
+
+
+def executeInMainThread(call, args=(), kwargs=None):
+    executeInMainThreadWithResult(call, args, kwargs)
+
+
+def message(prompt):
+    print(prompt)
+
+
+def warning(message):
+    print(f"Warning: {message}", file=sys.stderr)
+
+
+def error(message):
+    print(f"Error: {message}", file=sys.stderr)
+
+
+def debug(message):
+    print(message)
+
+
+def tprint(*args, **kwargs):
+    print(*args, **kwargs)
+
+
+def ask(prompt):
+    return False
+
+
+_API = (
+    createNode, allNodes, toNode, selectedNode, selectedNodes, selectAll, clearSelection,
+    delete, root, thisGroup, thisNode, scriptClear, scriptName, pluginPath, pluginAddPath,
+    pluginAppendPath, executeInMainThreadWithResult, executeInMainThread, message, warning,
+    error, debug, tprint, ask,
+)
+
+
+def populate(count, seed=0):
+    """
+    Fill the script with `count` connected nodes of common classes, like a heavy comp.
+
+    The nodes are built in short branches merged back into a main line, so graph walks
+    such as `dependencies()` or `allNodes()` have realistic work to do.
+    """
+    from nuke_standin.knobs import NODE_KNOBS
+
+    rng = random.Random(seed)
+    classes = [name for name in NODE_KNOBS if name not in ("Group", "Dot", "BackdropNode", "NoOp")]
+    main = None
+    created = 0
+    while created < count:
+        branch = _create("Read")
+        branch.setXYpos(created * 110, 0)
+        created += 1
+        for depth in range(rng.randint(2, 8)):
+            if created >= count:
+                break
+            node = _create(rng.choice(classes))
+            node.setInput(0, branch)
+            node.setXYpos(branch.xpos(), branch.ypos() + 60)
+            branch = node
+            created += 1
+        if main is not None and created < count:
+            merge = _create("Merge2")
+            merge.setInput(0, main)
+            merge.setInput(1, branch)
+            branch = merge
+            created += 1
+        main = branch
+    return created
@@ -0,0 +1,67 @@
+from editor.fold_index import FoldIndex
+
+SOURCE = [
+    "class Tool:",          # 0
+    "    def run(self):",   # 1
+    "        if ready:",    # 2
+    "            go()",     # 3
+    "",                     # 4
+    "        # done",       # 5
+    "        return 1",     # 6
+    "",                     # 7
+    "def main():",          # 8
+    "    pass",             # 9
+]
+
+
+def _index(lines):
+    index = FoldIndex()
+    index.rebuild(lines)
+    return index
+
+
+def test_regions_nest_and_skip_blank_lines():
+    index = _index(SOURCE)
+    assert index.fold_end(0) == 7
+    assert index.fold_end(1) == 7
+    assert index.fold_end(2) == 5
+    assert index.fold_end(8) == 9
+    assert not index.is_foldable(3)
+    assert index.fold_end(3) == 3
+
+
+def test_inserted_lines_extend_the_enclosing_region_and_shift_later_ones():
+    index = _index(SOURCE)
+    index.fold_end(8)
+    assert index.update_lines(3, 1, ["            go()", "            stop()"])
+    assert index.fold_end(2) == 6
+    assert index.fold_end(0) == 8
+    assert index.is_header(9)
+    assert index.fold_end(9) == 10
+
+
+def test_removed_lines_shrink_the_enclosing_region():
+    index = _index(SOURCE)
+    assert index.update_lines(2, 4, [])
+    assert index.fold_end(1) == 3
+    assert index.fold_end(4) == 5
+
+
+def test_dedented_line_closes_the_region():
+    index = _index(SOURCE)
+    assert index.update_lines(6, 1, ["x = 1"])
+    assert index.fold_end(0) == 5
+    assert index.fold_end(2) == 5
+
+
+def test_unchanged_lines_report_no_change():
+    index = _index(SOURCE)
+    assert not index.update_lines(3, 1, ["            go()"])
+
+
+def test_folded_regions_hide_their_lines():
+    index = _index(SOURCE)
+    index.set_folded({2, 8})
+    assert [line for line in range(len(index)) if index.is_hidden(line)] == [3, 4, 5, 9]
+    index.set_folded({0, 2})
+    assert [line for line in range(len(index)) if index.is_hidden(line)] == list(range(1, 8))
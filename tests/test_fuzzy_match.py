@@ -0,0 +1,105 @@
+from editor import fuzzy_match
+from editor.fuzzy_match import IncrementalMatcher, TypoIndex, boundary_mask, match_score
+
+NAMES = ("createNode", "allNodes", "toNode", "nodes", "selectedNode", "cancel")
+
+
+def _names(results):
+    return [name for name, _indices, _distance in results]
+
+
+def _texts(results):
+    return [text for text, _indices, _score in results]
+
+
+def test_short_pattern_with_swapped_start():
+    assert _names(TypoIndex(["createNode"]).search("rce")) == ["createNode"]
+    assert _names(TypoIndex(["toNode", "allNodes"]).search("otn")) == ["toNode"]
+
+
+def test_short_pattern_with_swapped_inner_letters():
+    assert _names(TypoIndex(["createNode"]).search("cer")) == ["createNode"]
+    assert _names(TypoIndex(["createNode"]).search("cre")) == ["createNode"]
+
+
+def test_short_pattern_with_substitution():
+    index = TypoIndex(["createNode", "delete"])
+    assert _names(index.search("cxe")) == ["createNode"]
+    assert _names(index.search("crx")) == ["createNode"]
+    assert _names(index.search("dxl")) == ["delete"]
+
+
+def test_distance_and_indices_for_swapped_start():
+    [(name, indices, distance)] = TypoIndex(["createNode"]).search("rce")
+    assert (name, distance) == ("createNode", 1)
+    assert sorted(indices) == [0, 1, 2]
+
+
+def test_first_letter_is_trusted():
+    assert TypoIndex(["createNode"]).search("xre") == []
+
+
+def test_boundary_mask():
+    assert boundary_mask("createNode") == 0b1000001
+    assert boundary_mask("QWidget") == 0b11
+    assert boundary_mask("set_value2x") == 0b11000010001
+
+
+def test_match_score_kinds():
+    assert match_score("cre", "createNode") == ((0, 1, 2), 1000.0)
+    assert match_score("node", "toNode") == ((2, 3, 4, 5), 846.0)
+    indices, score = match_score("cn", "createNode")
+    assert indices == (0, 6) and 700.0 < score < 1000.0
+    assert match_score("xyz", "createNode") == ((), 0.0)
+    assert match_score("", "createNode") == ((), 450.0)
+
+
+def test_single_character_matches_prefixes_only():
+    assert _texts(IncrementalMatcher().match("n", NAMES)) == ["nodes"]
+
+
+def test_narrowing_matches_a_fresh_matcher():
+    matcher = IncrementalMatcher()
+    for pattern in ("n", "no", "nod", "node", "nodx", "nod", "c", "ca", ""):
+        assert matcher.match(pattern, NAMES) == IncrementalMatcher().match(pattern, NAMES), pattern
+
+
+def test_narrowing_rescores_only_survivors(monkeypatch):
+    matcher = IncrementalMatcher()
+    matcher.match("no", NAMES)
+    scored = []
+    original = fuzzy_match._score
+
+    def counting_score(pattern, p, text, lower, boundaries):
+        scored.append(text)
+        return original(pattern, p, text, lower, boundaries)
+
+    monkeypatch.setattr(fuzzy_match, "_score", counting_score)
+    assert _texts(matcher.match("nod", NAMES)) == ["createNode", "allNodes", "toNode", "nodes", "selectedNode"]
+    assert "cancel" not in scored
+
+
+def test_universe_changes_apply_while_narrowing():
+    matcher = IncrementalMatcher()
+    matcher.match("no", NAMES)
+    changed = ("createNode", "nodeGraph", "cancel")
+    assert _texts(matcher.match("nod", changed)) == ["createNode", "nodeGraph"]
+
+
+def test_reset_forgets_the_previous_pattern():
+    # Passing the same object again skips the universe diff; reset() starts over.
+    names = ["createNode", "cancel"]
+    matcher = IncrementalMatcher()
+    matcher.match("no", names)
+    names.append("nodeGraph")
+    assert _texts(matcher.match("nod", names)) == ["createNode"]
+    matcher.reset()
+    assert _texts(matcher.match("nod", names)) == ["createNode", "nodeGraph"]
+
+
+def test_approximate_follows_universe_changes():
+    matcher = IncrementalMatcher()
+    matcher.match("cr", ("createNode",))
+    assert _texts(matcher.approximate("rce")) == ["createNode"]
+    matcher.match("cr", ("createRead",))
+    assert _texts(matcher.approximate("rce")) == ["createRead"]
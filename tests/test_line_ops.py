@@ -0,0 +1,59 @@
+from editor.line_ops import dedent_lines, indent_lines, move_lines, remap_line_position, toggle_comment_lines
+
+
+def test_toggle_comment_round_trip():
+    lines = ["def run():", "    return 1", ""]
+    commented = toggle_comment_lines(lines)
+    assert commented == ["# def run():", "#     return 1", "# "]
+    assert toggle_comment_lines(commented) == lines
+
+
+def test_uncomment_keeps_indentation():
+    assert toggle_comment_lines(["    # x = 1", "    #y"]) == ["    x = 1", "    y"]
+
+
+def test_indent_skips_empty_lines():
+    assert indent_lines(["a", "", "  b"], "    ") == ["    a", "", "      b"]
+
+
+def test_dedent_spaces_and_tabs():
+    assert dedent_lines(["      a", "  b", "c"], 4, True) == ["  a", "b", "c"]
+    assert dedent_lines(["\ta", "    b"], 4, False) == ["a", "b"]
+
+
+def test_move_lines_rotates_the_range():
+    assert move_lines(["above", "a", "b"], -1) == ["a", "b", "above"]
+    assert move_lines(["a", "b", "below"], 1) == ["below", "a", "b"]
+
+
+def test_cursors_keep_their_place_when_commenting():
+    old = ["a = 1", "    b = 2", "c = 3"]
+    new = toggle_comment_lines(old)
+    # One cursor per line, as left by a column selection or Ctrl+click.
+    assert remap_line_position(0, 3, old, new) == (0, 5)
+    assert remap_line_position(1, 6, old, new) == (1, 8)
+    assert remap_line_position(2, 0, old, new) == (2, 0)
+
+
+def test_cursor_columns_clamped_when_uncommenting():
+    old = ["# a", "#"]
+    new = toggle_comment_lines(old)
+    assert new == ["a", ""]
+    assert remap_line_position(0, 3, old, new) == (0, 1)
+    assert remap_line_position(1, 1, old, new) == (1, 0)
+
+
+def test_cursors_follow_lines_moved_up():
+    # The line above the selection rotates to the end of the range.
+    old = ["above", "first", "second"]
+    new = move_lines(old, -1)
+    assert remap_line_position(1, 2, old, new, line_shift=-1) == (0, 2)
+    assert remap_line_position(2, 6, old, new, line_shift=-1) == (1, 6)
+    assert remap_line_position(0, 4, old, new, line_shift=-1) == (2, 4)
+
+
+def test_cursors_follow_lines_moved_down():
+    old = ["first", "second", "below"]
+    new = move_lines(old, 1)
+    assert remap_line_position(0, 5, old, new, line_shift=1) == (1, 5)
+    assert remap_line_position(2, 3, old, new, line_shift=1) == (0, 3)
@@ -0,0 +1,54 @@
+from editor.symbol_table import SymbolTable
+
+
+def _table(lines):
+    table = SymbolTable()
+    table.rebuild(lines)
+    return table
+
+
+def test_definitions_with_lines():
+    table = _table(["import os", "class Tool:", "    def run(self):", "        pass", "async def main():"])
+    assert table.definitions() == [(1, "class", "Tool"), (2, "def", "run"), (4, "def", "main")]
+    assert table.definition_line("run") == 2
+    assert table.definition_line("missing") == -1
+
+
+def test_inserted_lines_shift_later_definitions():
+    table = _table(["def first():", "    pass", "def second():", "    pass"])
+    table.update_lines(1, 1, ["    x = 1", "    y = 2", "    return x + y"])
+    assert table.definitions() == [(0, "def", "first"), (4, "def", "second")]
+    assert table.definition_line("second") == 4
+    assert {"x", "y", "return"} <= set(table.names())
+    assert "pass" in table.names()
+
+
+def test_removed_lines_shift_and_drop_names():
+    table = _table(["def first():", "    helper = 1", "    return helper", "def second():", "    pass"])
+    table.update_lines(1, 2, [])
+    assert table.definitions() == [(0, "def", "first"), (1, "def", "second")]
+    assert "helper" not in table.names()
+
+
+def test_renamed_definition():
+    table = _table(["def old_name():", "    pass"])
+    version = table.version
+    assert table.update_lines(0, 1, ["def new_name():"])
+    assert table.definitions() == [(0, "def", "new_name")]
+    assert "old_name" not in table.names()
+    assert table.version > version
+
+
+def test_unchanged_lines_report_no_change():
+    table = _table(["def run():", "    pass"])
+    names = table.names()
+    assert not table.update_lines(1, 1, ["    pass"])
+    assert table.names() is names
+
+
+def test_names_counted_per_line():
+    table = _table(["value = 1", "value += value"])
+    table.update_lines(0, 1, ["other = 1"])
+    assert "value" in table.names()
+    table.update_lines(1, 1, ["other += 1"])
+    assert "value" not in table.names()